@@ -476,6 +476,9 @@ class DataProcessor:
 
 # Previous code from Steps 1-3:
 # (All imports, MemoryProfiler, __slots__ classes, and generator functions from above)
+import threading
+import time
+from collections import OrderedDict
 
 class Parent:
     """Parent class that can create circular references."""
@@ -629,37 +632,210 @@ def demonstrate_weak_reference_solution():
     print(f"Memory used with weak references: {format_bytes(stats_with_weak['memory_used'])}")
 
 class CacheWithWeakRefs:
-    """Cache implementation using weak references."""
-    
-    def __init__(self):
+    """Hybrid cache: a bounded LRU of strong references in front of weak ones.
+
+    A pure ``WeakValueDictionary`` forgets an object the moment the last
+    caller drops it, so short-lived request handlers almost never hit.
+    Here the ``strong_size`` most recently used values are pinned; values
+    that fall out of the LRU are demoted to the weak layer and stay
+    reachable for as long as anything else still uses them.
+
+    Values that cannot be weakly referenced (ints, strings, tuples, ...)
+    live in the strong layer only and are dropped when evicted.
+    ``strong_size=0`` gives the plain weak-reference cache.
+    """
+
+    def __init__(self, strong_size: int = 128):
+        if strong_size < 0:
+            raise ValueError("strong_size must be >= 0")
+        self.strong_size = strong_size
         self._cache = weakref.WeakValueDictionary()
+        self._strong = OrderedDict()
         self._access_count = {}
-    
+        self._finalizers = {}
+        # Finalizers only append here; the lock holder drains the queue so a
+        # collection triggered inside a locked section never re-enters it
+        self._dead_keys = deque()
+        self._lock = threading.RLock()
+        self._hits = 0
+        self._strong_hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._dropped = 0
+        self._collected = 0
+
     def get(self, key: str, factory_func=None):
-        """Get item from cache or create it."""
-        obj = self._cache.get(key)
+        """Get item from cache or create it with ``factory_func``."""
+        with self._lock:
+            self._purge_dead()
+            obj = self._lookup(key)
+            if obj is not None:
+                return obj
+            self._misses += 1
+
+        if factory_func is None:
+            return None
+
+        # Build outside the lock so a slow factory does not block other keys
+        obj = factory_func()
+        with self._lock:
+            existing = self._lookup(key, count_hit=False)
+            if existing is not None:
+                # Another thread filled the key first; keep a single instance
+                return existing
+            self._record(key, self._store(key, obj), 1)
+        return obj
+
+    def put(self, key: str, value):
+        """Insert or replace a value."""
+        with self._lock:
+            self._purge_dead()
+            self._record(key, self._store(key, value), 0)
+
+    def invalidate(self, key: str) -> bool:
+        """Remove a key from both layers. Returns True if it was cached."""
+        with self._lock:
+            value = self._strong.pop(key, None)
+            present = self._cache.pop(key, None) is not None or value is not None
+            self._forget(key)
+            del value
+            return present
+
+    def clear(self):
+        """Drop every entry but keep the counters."""
+        with self._lock:
+            for finalizer in self._finalizers.values():
+                finalizer.detach()
+            self._finalizers.clear()
+            self._access_count.clear()
+            self._dead_keys.clear()
+            strong, self._strong = self._strong, OrderedDict()
+            self._cache.clear()
+        del strong
+
+    def _lookup(self, key: str, count_hit: bool = True):
+        obj = self._strong.get(key)
         if obj is not None:
+            self._strong.move_to_end(key)
+            in_strong = True
+        else:
+            obj = self._cache.get(key)
+            if obj is None:
+                return None
+            in_strong = False
+            self._promote(key, obj)
+        if count_hit:
+            self._hits += 1
+            self._strong_hits += in_strong
             self._access_count[key] = self._access_count.get(key, 0) + 1
-            return obj
-        
-        if factory_func:
-            obj = factory_func()
+        return obj
+
+    def _record(self, key: str, stored: bool, count: int):
+        # An unstored key has no finalizer or LRU slot to clean up after it,
+        # so counting it would leak one entry per distinct key
+        if stored:
+            self._access_count[key] = count
+        else:
+            self._access_count.pop(key, None)
+
+    def _store(self, key: str, obj) -> bool:
+        """Put ``obj`` in the layers that can hold it; False if none can."""
+        old = self._finalizers.pop(key, None)
+        if old is not None:
+            old.detach()
+        try:
             self._cache[key] = obj
-            self._access_count[key] = 1
-            return obj
-        
-        return None
-    
+        except TypeError:
+            # Not weakly referenceable: it can only live in the strong layer
+            self._cache.pop(key, None)
+        else:
+            finalizer = weakref.finalize(obj, self._dead_keys.append, key)
+            finalizer.atexit = False
+            self._finalizers[key] = finalizer
+        self._promote(key, obj)
+        return key in self._finalizers or key in self._strong
+
+    def _promote(self, key: str, obj):
+        if self.strong_size == 0:
+            return
+        self._strong[key] = obj
+        self._strong.move_to_end(key)
+        while len(self._strong) > self.strong_size:
+            evicted_key, evicted = self._strong.popitem(last=False)
+            self._evictions += 1
+            if evicted_key not in self._finalizers:
+                self._dropped += 1
+                self._access_count.pop(evicted_key, None)
+            # Dropping the last reference may run a finalizer right here;
+            # it only queues the key, which is purged on the next call
+            del evicted
+
+    def _forget(self, key: str):
+        finalizer = self._finalizers.pop(key, None)
+        if finalizer is not None:
+            finalizer.detach()
+        self._access_count.pop(key, None)
+
+    def _purge_dead(self) -> int:
+        purged = 0
+        while self._dead_keys:
+            key = self._dead_keys.popleft()
+            if key in self._cache or key in self._strong:
+                # The key was filled again before its old value died
+                continue
+            self._finalizers.pop(key, None)
+            self._access_count.pop(key, None)
+            purged += 1
+        self._collected += purged
+        return purged
+
+    def access_count(self, key: str) -> int:
+        """Hits plus the initial creation recorded for ``key``."""
+        with self._lock:
+            self._purge_dead()
+            return self._access_count.get(key, 0)
+
     def size(self) -> int:
-        """Get current cache size."""
-        return len(self._cache)
-    
-    def cleanup(self):
-        """Clean up access counts for dead objects."""
-        live_keys = set(self._cache.keys())
-        dead_keys = set(self._access_count.keys()) - live_keys
-        for key in dead_keys:
-            del self._access_count[key]
+        """Get current cache size (live entries in either layer)."""
+        with self._lock:
+            self._purge_dead()
+            return len(self._cache) + sum(1 for key in self._strong if key not in self._cache)
+
+    def __len__(self) -> int:
+        return self.size()
+
+    def __contains__(self, key) -> bool:
+        with self._lock:
+            return key in self._strong or key in self._cache
+
+    def cleanup(self) -> int:
+        """Purge bookkeeping for collected objects.
+
+        Finalizers already queue dead keys and every call drains the queue,
+        so this is only needed to release the memory without another lookup.
+        Returns the number of keys purged.
+        """
+        with self._lock:
+            return self._purge_dead()
+
+    def stats(self) -> dict:
+        """Hit, miss and eviction counters plus current layer sizes."""
+        with self._lock:
+            self._purge_dead()
+            lookups = self._hits + self._misses
+            return {
+                'hits': self._hits,
+                'strong_hits': self._strong_hits,
+                'weak_hits': self._hits - self._strong_hits,
+                'misses': self._misses,
+                'hit_rate': self._hits / lookups if lookups else 0.0,
+                'evictions': self._evictions,
+                'dropped': self._dropped,
+                'collected': self._collected,
+                'strong_entries': len(self._strong),
+                'weak_entries': len(self._cache),
+                'tracked_keys': len(self._access_count),
+            }
 
 class ExpensiveObject:
     """Simulate an expensive-to-create object."""
@@ -675,7 +851,7 @@ def demonstrate_weak_cache():
     """Demonstrate cache with weak references."""
     print("\n=== Weak Reference Cache Demo ===")
     
-    cache = CacheWithWeakRefs()
+    cache = CacheWithWeakRefs(strong_size=2)
     
     # Create objects through cache
     obj1 = cache.get("key1", lambda: ExpensiveObject("data1"))
@@ -685,20 +861,77 @@ def demonstrate_weak_cache():
     print(f"obj1 is obj3: {obj1 is obj3}")
     print(f"Cache size: {cache.size()}")
     
-    # Delete references
-    del obj1, obj3
+    # Delete references: the strong LRU still keeps both objects alive
+    del obj1, obj2, obj3
     gc.collect()
-    
     print(f"Cache size after deletion: {cache.size()}")
+    print(f"Getting released object: {cache.get('key1')}")
+    
+    # Two new keys push key1 and key2 out of the strong layer; nothing else
+    # references them, so they are collected and their counts go with them
+    cache.get("key3", lambda: ExpensiveObject("data3"))
+    cache.get("key4", lambda: ExpensiveObject("data4"))
+    gc.collect()
     
-    # Try to get deleted object
     obj4 = cache.get("key1")
-    print(f"Getting deleted object: {obj4}")
+    print(f"Getting evicted object: {obj4}")
     
     # Create new object with same key
     obj5 = cache.get("key1", lambda: ExpensiveObject("new_data1"))
     print(f"New object: {obj5}")
-
+    print(f"Stats: {cache.stats()}")
+
+def benchmark_weak_cache(requests: int = 200_000, keys: int = 5_000,
+                         strong_sizes=(0, 64, 256, 1024), threads: int = 4):
+    """Hit rate and lookup cost for a request-handler access pattern.
+    
+    Each simulated request looks an object up, uses it and drops it, so a
+    purely weak cache only hits while another request still holds the same
+    object. Keys follow a skewed (Zipf-like) distribution.
+    """
+    import random
+    
+    print("\n=== Hybrid Weak Cache Benchmark ===")
+    rng = random.Random(7)
+    weights = [1.0 / (rank + 1) for rank in range(keys)]
+    stream = [f"obj{index}" for index in rng.choices(range(keys), weights=weights, k=requests)]
+    
+    print(f"{requests:,} lookups over {keys:,} keys, {threads} threads")
+    print(f"{'strong_size':>11} {'hit rate':>9} {'creations':>10} {'evictions':>10} "
+          f"{'tracked':>8} {'us/lookup':>10}")
+    
+    results = {}
+    for strong_size in strong_sizes:
+        cache = CacheWithWeakRefs(strong_size=strong_size)
+        created = itertools.count()
+        
+        def factory(key):
+            next(created)
+            return ExpensiveObject(key)
+        
+        def worker(part):
+            for key in part:
+                obj = cache.get(key, lambda: factory(key))
+                obj.data  # "handle" the request, then release the object
+        
+        parts = [stream[i::threads] for i in range(threads)]
+        workers = [threading.Thread(target=worker, args=(part,)) for part in parts]
+        start = time.perf_counter()
+        for thread in workers:
+            thread.start()
+        for thread in workers:
+            thread.join()
+        elapsed = time.perf_counter() - start
+        
+        stats = cache.stats()
+        creations = next(created)
+        results[strong_size] = {'elapsed': elapsed, 'creations': creations, **stats}
+        print(f"{strong_size:>11} {stats['hit_rate']:>8.1%} {creations:>10,} "
+              f"{stats['evictions']:>10,} {stats['tracked_keys']:>8,} "
+              f"{elapsed / requests * 1e6:>10.2f}")
+    
+    print("tracked = access-count entries left; they follow live objects, no cleanup() needed")
+    return results
 
 # Step 5: Memory-efficient data structures
 # ===============================================================================
@@ -944,7 +1177,14 @@ def demonstrate_string_interning():
 
 from threading import Lock
 from queue import Queue
+from contextlib import contextmanager
+import asyncio
+import itertools
+import sqlite3
+import threading
 import time
+import traceback
+import warnings
 
 class ExpensiveResource:
     """Simulate an expensive-to-create resource."""
@@ -966,49 +1206,358 @@ class ExpensiveResource:
         self.usage_count = 0
         # Reset any state that needs to be clean for reuse
 
-class ObjectPool:
-    """Generic object pool implementation."""
+class PoolTimeout(TimeoutError):
+    """Raised when no pooled object or connection frees up within the timeout."""
+
+class PoolLease:
+    """Context manager that returns a leased object to its pool on exit."""
+    
+    __slots__ = ('pool', 'obj')
+    
+    def __init__(self, pool, obj):
+        self.pool = pool
+        self.obj = obj
+    
+    def __enter__(self):
+        return self.obj
     
-    def __init__(self, factory_func, max_size: int = 10):
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.pool.release(self.obj)
+    
+    async def __aenter__(self):
+        return self.obj
+    
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        self.pool.release(self.obj)
+
+class ObjectPool:
+    """Generic object pool usable from threads and from asyncio.
+    
+    - acquire(timeout) / await acquire_async(timeout) raise PoolTimeout
+      instead of blocking forever once max_size objects are out
+    - lease() / lease_async() return a context manager that always releases
+    - acquire_many(n) / release_many(objs) amortize locking in hot loops
+    - min_idle objects are created up front and kept through idle eviction;
+      other objects idle longer than idle_timeout are destroyed
+    - leases held longer than leak_timeout are reported by check_leaks()
+      (with the acquiring stack when capture_stacks=True)
+    """
+    
+    def __init__(self, factory_func, max_size: int = 10, min_idle: int = 0,
+                 timeout: Optional[float] = 30.0, idle_timeout: Optional[float] = None,
+                 leak_timeout: Optional[float] = None, capture_stacks: bool = False,
+                 reset_func=None, destroy_func=None):
         self._factory_func = factory_func
         self._max_size = max_size
-        self._pool = Queue(maxsize=max_size)
-        self._created_count = 0
+        self._min_idle = min(min_idle, max_size)
+        self._timeout = timeout
+        self._idle_timeout = idle_timeout
+        self._leak_timeout = leak_timeout
+        self._capture_stacks = capture_stacks
+        self._reset_func = reset_func
+        self._destroy_func = destroy_func
+        
+        self._idle = deque()            # (obj, idle_since); hot end on the right
+        self._leased = {}               # id(obj) -> (obj, leased_at, stack)
+        self._created_count = 0         # objects currently alive
+        self._ids = itertools.count()
         self._lock = Lock()
+        self._available = threading.Condition(self._lock)
+        self._async_waiters = deque()   # (loop, future)
+        self._last_eviction = time.monotonic()
+        self._stats = defaultdict(int)
+        
+        self.prewarm()
+    
+    # -- creation and destruction ------------------------------------------
     
-    def acquire(self):
-        """Get an object from the pool."""
+    def _create(self):
+        """Create an object for a slot that was already reserved under the lock."""
         try:
-            # Try to get from pool first
-            obj = self._pool.get_nowait()
+            return self._factory_func(next(self._ids))
+        except BaseException:
+            with self._lock:
+                self._free_slots(1)
+            raise
+    
+    def _free_slots(self, count: int):
+        """Give up `count` object slots (lock held).
+        
+        Each freed slot is reserved for the oldest async waiter, which creates
+        its object in its own event loop; slots left over wake blocked threads.
+        """
+        self._created_count -= count
+        while count and self._async_waiters:
+            loop, future = self._async_waiters.popleft()
+            self._created_count += 1
+            loop.call_soon_threadsafe(self._deliver_created, future)
+            count -= 1
+        if count:
+            self._available.notify(count)
+    
+    def prewarm(self):
+        """Create objects until min_idle are waiting in the pool."""
+        while True:
+            with self._lock:
+                if len(self._idle) >= self._min_idle or self._created_count >= self._max_size:
+                    return
+                self._created_count += 1
+            obj = self._create()
+            with self._lock:
+                self._stats['created'] += 1
+                self._idle.append((obj, time.monotonic()))
+    
+    def evict_idle(self) -> int:
+        """Destroy objects idle longer than idle_timeout, keeping min_idle."""
+        if self._idle_timeout is None:
+            return 0
+        now = time.monotonic()
+        evicted = []
+        with self._lock:
+            self._last_eviction = now
+            # The left end holds the objects that have been idle the longest
+            while (len(self._idle) > self._min_idle
+                   and now - self._idle[0][1] > self._idle_timeout):
+                evicted.append(self._idle.popleft()[0])
+            self._stats['evicted'] += len(evicted)
+            self._free_slots(len(evicted))
+        if self._destroy_func is not None:
+            for obj in evicted:
+                self._destroy_func(obj)
+        return len(evicted)
+    
+    # -- acquire -------------------------------------------------------------
+    
+    def _checkout(self, obj):
+        """Record a lease (lock held)."""
+        stack = traceback.format_stack(limit=8)[:-2] if self._capture_stacks else None
+        self._leased[id(obj)] = (obj, time.monotonic(), stack)
+        self._stats['acquired'] += 1
+        if len(self._leased) > self._stats['peak_leased']:
+            self._stats['peak_leased'] = len(self._leased)
+    
+    def _try_acquire(self):
+        """Take an idle object or reserve a slot (lock held).
+        
+        Returns (obj, False) for a reused object, (None, True) when the caller
+        must create one, or (None, False) when the pool is exhausted.
+        """
+        if self._idle:
+            obj = self._idle.pop()[0]
+            self._checkout(obj)
+            self._stats['reused'] += 1
+            return obj, False
+        if self._created_count < self._max_size:
+            self._created_count += 1
+            return None, True
+        return None, False
+    
+    def _finish_create(self):
+        obj = self._create()
+        with self._lock:
+            self._stats['created'] += 1
+            self._checkout(obj)
+        return obj
+    
+    def acquire(self, timeout: Optional[float] = None):
+        """Get an object from the pool, waiting at most `timeout` seconds."""
+        timeout = self._timeout if timeout is None else timeout
+        with self._lock:
+            obj, create = self._try_acquire()
+            if obj is None and not create:
+                deadline = None if timeout is None else time.monotonic() + timeout
+                self._stats['waits'] += 1
+                while obj is None and not create:
+                    remaining = None if deadline is None else deadline - time.monotonic()
+                    if remaining is not None and remaining <= 0:
+                        self._stats['timeouts'] += 1
+                        raise PoolTimeout(f"no object available after {timeout:.2f}s "
+                                          f"({self._max_size} leased)")
+                    self._available.wait(remaining)
+                    obj, create = self._try_acquire()
+        if create:
+            obj = self._finish_create()
+        if self._idle_timeout is not None and time.monotonic() - self._last_eviction > self._idle_timeout:
+            self.evict_idle()
+        return obj
+    
+    async def acquire_async(self, timeout: Optional[float] = None):
+        """Like acquire(), but waits without blocking the event loop."""
+        timeout = self._timeout if timeout is None else timeout
+        with self._lock:
+            obj, create = self._try_acquire()
+            if obj is None and not create:
+                loop = asyncio.get_running_loop()
+                future = loop.create_future()
+                waiter = (loop, future)
+                self._async_waiters.append(waiter)
+                self._stats['waits'] += 1
+        if create:
+            return self._finish_create()
+        if obj is not None:
             return obj
-        except:
-            # Pool is empty, create new object
+        
+        try:
+            return await asyncio.wait_for(future, timeout)
+        except asyncio.TimeoutError:
+            with self._lock:
+                try:
+                    self._async_waiters.remove(waiter)
+                except ValueError:
+                    pass
+                self._stats['timeouts'] += 1
+            if future.done() and not future.cancelled() and future.exception() is None:
+                self.release(future.result())   # handed over just as we gave up
+            raise PoolTimeout(f"no object available after {timeout:.2f}s "
+                              f"({self._max_size} leased)") from None
+    
+    def lease(self, timeout: Optional[float] = None) -> PoolLease:
+        """`with pool.lease() as obj:` -- released even if the block raises."""
+        return PoolLease(self, self.acquire(timeout))
+    
+    async def lease_async(self, timeout: Optional[float] = None) -> PoolLease:
+        """`async with await pool.lease_async() as obj:`"""
+        return PoolLease(self, await self.acquire_async(timeout))
+    
+    def acquire_many(self, count: int, timeout: Optional[float] = None) -> list:
+        """Lease `count` objects with one lock round-trip for the idle ones."""
+        if count > self._max_size:
+            raise ValueError(f"cannot lease {count} objects from a pool of {self._max_size}")
+        objs = []
+        with self._lock:
+            while len(objs) < count and self._idle:
+                obj = self._idle.pop()[0]
+                self._checkout(obj)
+                objs.append(obj)
+            self._stats['reused'] += len(objs)
+        try:
+            while len(objs) < count:
+                objs.append(self.acquire(timeout))
+        except BaseException:
+            # Timeout or a failing factory: don't strand what we already hold
+            self.release_many(objs)
+            raise
+        return objs
+    
+    # -- release -------------------------------------------------------------
+    
+    def _reset(self, obj):
+        if self._reset_func is not None:
+            self._reset_func(obj)
+        else:
+            reset = getattr(obj, 'reset', None)
+            if reset is not None:
+                reset()
+    
+    def _deliver(self, future, obj):
+        """Runs in the waiter's event loop."""
+        if future.done():
+            self.release(obj)           # waiter timed out or was cancelled
+        else:
+            future.set_result(obj)
+    
+    def _deliver_created(self, future):
+        """Runs in the waiter's event loop for a slot reserved on its behalf."""
+        if future.done():
             with self._lock:
-                if self._created_count < self._max_size:
-                    obj = self._factory_func(self._created_count)
-                    self._created_count += 1
-                    return obj
+                self._free_slots(1)     # waiter timed out or was cancelled
+            return
+        try:
+            obj = self._create()        # frees the slot again if the factory fails
+        except Exception as e:
+            future.set_exception(e)
+            return
+        with self._lock:
+            self._stats['created'] += 1
+            self._checkout(obj)
+        future.set_result(obj)
+    
+    def _checkin(self, objs):
+        """Reset released objects, then hand them to waiters or the idle list.
+        
+        The leases were already removed under the lock, so a stale or double
+        release is rejected before anything touches an object that may now
+        belong to another caller.
+        """
+        ready, broken = [], 0
+        for obj in objs:
+            try:
+                self._reset(obj)
+            except Exception:
+                broken += 1             # can't trust it: drop it and free the slot
+                if self._destroy_func is not None:
+                    self._destroy_func(obj)
+            else:
+                ready.append(obj)
+        now = time.monotonic()
+        with self._lock:
+            self._stats['reset_failures'] += broken
+            idle = 0
+            for obj in ready:
+                if self._async_waiters:
+                    loop, future = self._async_waiters.popleft()
+                    self._checkout(obj)
+                    loop.call_soon_threadsafe(self._deliver, future, obj)
                 else:
-                    # Wait for an object to be returned
-                    return self._pool.get()
+                    self._idle.append((obj, now))
+                    idle += 1
+            self._available.notify(idle)
+            self._free_slots(broken)
     
     def release(self, obj):
         """Return an object to the pool."""
-        obj.reset()  # Reset object state
-        try:
-            self._pool.put_nowait(obj)
-        except:
-            # Pool is full, object will be garbage collected
-            pass
+        with self._lock:
+            if self._leased.pop(id(obj), None) is None:
+                raise ValueError("object was not leased from this pool")
+        self._checkin((obj,))
+    
+    def release_many(self, objs):
+        """Return several objects with one lock round-trip.
+        
+        All-or-nothing: if any object is not currently leased (or appears
+        twice), ValueError is raised and no lease is released.
+        """
+        objs = list(objs)
+        with self._lock:
+            keys = [id(obj) for obj in objs]
+            if len(set(keys)) != len(keys) or any(key not in self._leased for key in keys):
+                raise ValueError("object was not leased from this pool")
+            for key in keys:
+                del self._leased[key]
+        self._checkin(objs)
+    
+    # -- introspection -------------------------------------------------------
+    
+    def check_leaks(self, warn: bool = True) -> List[dict]:
+        """Report leases held longer than leak_timeout."""
+        if self._leak_timeout is None:
+            return []
+        now = time.monotonic()
+        with self._lock:
+            leaks = [{'object': obj, 'held_for': now - leased_at, 'stack': stack}
+                     for obj, leased_at, stack in self._leased.values()
+                     if now - leased_at > self._leak_timeout]
+            self._stats['leaks_detected'] = len(leaks)
+        if warn:
+            for leak in leaks:
+                where = "".join(leak['stack'][-2:]).rstrip() if leak['stack'] else "(stack not captured)"
+                warnings.warn(f"{leak['object']!r} leased {leak['held_for']:.1f}s ago "
+                              f"and never released:\n{where}", ResourceWarning, stacklevel=2)
+        return leaks
     
     def size(self) -> int:
         """Get current pool size."""
-        return self._pool.qsize()
+        return len(self._idle)
     
     def total_created(self) -> int:
         """Get total number of objects created."""
-        return self._created_count
+        return self._stats['created']
+    
+    def stats(self) -> dict:
+        with self._lock:
+            return dict(self._stats, idle=len(self._idle), leased=len(self._leased),
+                        alive=self._created_count)
+
 
 def compare_with_without_pooling():
     """Compare memory usage with and without object pooling."""
@@ -1053,52 +1602,394 @@ def compare_with_without_pooling():
         savings_percent = (memory_saved / without_pool_stats['memory_used']) * 100
         print(f"Memory saved: {format_bytes(memory_saved)} ({savings_percent:.1f}%)")
 
-class ConnectionPool:
-    """Example of a database connection pool."""
+def benchmark_object_pool(iterations: int = 50000):
+    """Compare plain allocation with the pool's acquire paths (per-use cost)."""
+    print(f"\n=== Object Pool Benchmark ({iterations:,} uses) ===")
+    pool = ObjectPool(ExpensiveResource, max_size=16, min_idle=8)
+    
+    def plain():
+        for i in range(iterations):
+            ExpensiveResource(i).use()
+    
+    def acquire_release():
+        for _ in range(iterations):
+            resource = pool.acquire()
+            resource.use()
+            pool.release(resource)
+    
+    def leased():
+        for _ in range(iterations):
+            with pool.lease() as resource:
+                resource.use()
+    
+    def batched():
+        for _ in range(iterations // 8):
+            resources = pool.acquire_many(8)
+            for resource in resources:
+                resource.use()
+            pool.release_many(resources)
+    
+    async def async_workers():
+        async def worker(n: int):
+            for _ in range(n):
+                async with await pool.lease_async() as resource:
+                    resource.use()
+        await asyncio.gather(*(worker(iterations // 32) for _ in range(32)))
+    
+    results = {}
+    for label, run in (("plain allocation", plain), ("acquire/release", acquire_release),
+                       ("with lease()", leased), ("acquire_many(8)", batched),
+                       ("32 async tasks", lambda: asyncio.run(async_workers()))):
+        start = time.perf_counter()
+        run()
+        elapsed = time.perf_counter() - start
+        results[label] = elapsed / iterations * 1e6
+        print(f"{label:18s}: {results[label]:6.2f} us per use")
+    
+    stats = pool.stats()
+    print(f"Objects created by the pool: {stats['created']} (reused {stats['reused']:,} times)")
+    return results
+
+def demonstrate_object_pool():
+    """Show timeouts, async waiting, idle eviction and leak detection."""
+    print("\n=== Production Object Pool ===")
+    
+    pool = ObjectPool(ExpensiveResource, max_size=2, min_idle=1, timeout=0.1,
+                      idle_timeout=0.05, leak_timeout=0.05, capture_stacks=True)
+    print(f"Prewarmed idle objects: {pool.size()}")
+    
+    first, second = pool.acquire_many(2)
+    try:
+        pool.acquire()
+    except PoolTimeout as e:
+        print(f"Exhausted pool: PoolTimeout ({e})")
+    
+    # An async waiter gets the object as soon as a thread releases it
+    async def wait_for_resource():
+        threading.Timer(0.02, pool.release, args=(second,)).start()
+        async with await pool.lease_async(timeout=1.0) as resource:
+            return resource.resource_id
+    print(f"Async waiter received resource {asyncio.run(wait_for_resource())}")
+    
+    # `first` is never released: report it as a leak
+    time.sleep(0.06)
+    with warnings.catch_warnings(record=True) as caught:
+        warnings.simplefilter("always")
+        leaks = pool.check_leaks()
+    print(f"Leaked leases: {len(leaks)} (held {leaks[0]['held_for']:.2f}s), "
+          f"ResourceWarnings: {len(caught)}")
+    pool.release(first)
+    
+    time.sleep(0.06)
+    print(f"Evicted idle objects: {pool.evict_idle()}, kept min_idle: {pool.size()}")
     
-    def __init__(self, max_connections: int = 5):
+    benchmark_object_pool()
+
+class _PooledConnection:
+    """Bookkeeping for one pooled sqlite3 connection."""
+    
+    __slots__ = ('connection', 'created_at', 'last_used', 'leased')
+    
+    def __init__(self, connection):
+        self.connection = connection
+        self.created_at = self.last_used = time.monotonic()
+        self.leased = False
+
+class ConnectionPool:
+    """Bounded pool of sqlite3 connections to one database file.
+    
+    - get_connection() waits at most `timeout` seconds, then raises PoolTimeout
+    - connections idle longer than `ping_after` are checked with SELECT 1, and
+      connections older than `max_lifetime` are closed and replaced
+    - a thread gets back the connection it used last when that one is idle
+    - stats() reports leases, waits, timeouts and utilization
+    
+    Pass a file path: each sqlite3 ":memory:" connection is a separate
+    database, so pooled connections would not see each other's tables.
+    security/02-sql-injection-prevention.py has a fuller version used by
+    ProductionSecureDatabase.
+    """
+    
+    def __init__(self, database: str, max_connections: int = 5, timeout: float = 5.0,
+                 max_lifetime: float = 3600.0, ping_after: float = 30.0):
+        self._database = database
         self._max_connections = max_connections
-        self._available = Queue(maxsize=max_connections)
-        self._in_use = set()
-        self._created_count = 0
-        self._lock = Lock()
+        self._timeout = timeout
+        self._max_lifetime = max_lifetime
+        self._ping_after = ping_after
+        
+        self._idle: List[_PooledConnection] = []   # LIFO: most recently used last
+        self._records = {}                          # id(connection) -> _PooledConnection
+        self._open = 0
+        self._closed = False
+        self._cond = threading.Condition(threading.Lock())
+        self._local = threading.local()
+        
+        self._started = time.monotonic()
+        self._lease_time = 0.0                      # summed over all leases
+        self._metrics = {'created': 0, 'acquired': 0, 'waits': 0, 'timeouts': 0,
+                         'affinity_hits': 0, 'discarded': 0, 'wait_time': 0.0}
+    
+    def _is_healthy(self, record: _PooledConnection) -> bool:
+        """Max-lifetime and liveness check, run without holding the pool lock."""
+        now = time.monotonic()
+        if now - record.created_at > self._max_lifetime:
+            return False
+        if now - record.last_used > self._ping_after:
+            try:
+                record.connection.execute("SELECT 1").fetchone()
+            except sqlite3.Error:
+                return False
+        return True
     
-    def get_connection(self):
-        """Get a database connection."""
+    def _discard(self, record: _PooledConnection):
+        """Close a connection and free its slot."""
         try:
-            conn = self._available.get_nowait()
-            self._in_use.add(conn)
-            return conn
-        except:
-            with self._lock:
-                if self._created_count < self._max_connections:
-                    conn = self._create_connection()
-                    self._created_count += 1
-                    self._in_use.add(conn)
-                    return conn
+            record.connection.close()
+        except sqlite3.Error:
+            pass
+        with self._cond:
+            self._records.pop(id(record.connection), None)
+            self._open -= 1
+            self._metrics['discarded'] += 1
+            self._cond.notify()
+    
+    def get_connection(self, timeout: Optional[float] = None) -> sqlite3.Connection:
+        """Get a database connection, waiting at most `timeout` seconds."""
+        timeout = self._timeout if timeout is None else timeout
+        start = time.monotonic()
+        deadline = start + timeout
+        waited = False
+        
+        while True:
+            record = None
+            with self._cond:
+                while not self._idle and self._open >= self._max_connections:
+                    if self._closed:
+                        raise RuntimeError("connection pool is closed")
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self._metrics['timeouts'] += 1
+                        raise PoolTimeout(f"no connection available after {timeout:.2f}s")
+                    waited = True
+                    self._cond.wait(remaining)
+                if self._closed:
+                    raise RuntimeError("connection pool is closed")
+                if self._idle:
+                    preferred = getattr(self._local, 'record', None)
+                    if preferred is not None and preferred in self._idle:
+                        self._idle.remove(preferred)
+                        record = preferred
+                        self._metrics['affinity_hits'] += 1
+                    else:
+                        record = self._idle.pop()
+                    record.leased = True
                 else:
-                    # Wait for a connection to be released
-                    conn = self._available.get()
-                    self._in_use.add(conn)
-                    return conn
-    
-    def release_connection(self, conn):
-        """Release a connection back to the pool."""
-        if conn in self._in_use:
-            self._in_use.remove(conn)
-            self._available.put(conn)
+                    self._open += 1             # reserve the slot, connect outside the lock
+            
+            if record is None:
+                try:
+                    record = _PooledConnection(
+                        sqlite3.connect(self._database, check_same_thread=False))
+                except Exception:
+                    with self._cond:
+                        self._open -= 1
+                        self._cond.notify()
+                    raise
+                record.leased = True
+                with self._cond:
+                    self._records[id(record.connection)] = record
+                    self._metrics['created'] += 1
+            elif not self._is_healthy(record):
+                self._discard(record)
+                continue
+            break
+        
+        now = time.monotonic()
+        record.last_used = now
+        self._local.record = record
+        with self._cond:
+            self._metrics['acquired'] += 1
+            self._metrics['wait_time'] += now - start
+            self._metrics['waits'] += waited
+        return record.connection
+    
+    def release_connection(self, conn: sqlite3.Connection):
+        """Return a connection, rolling back any open transaction.
+        
+        Raises ValueError for a connection this pool did not hand out or one
+        that was already released; accepting it twice would put the same
+        connection in the idle list twice and lease it to two callers.
+        """
+        with self._cond:
+            record = self._records.get(id(conn))
+            if record is None or record.connection is not conn:
+                raise ValueError("connection does not belong to this pool")
+            if not record.leased:
+                raise ValueError("connection was already released")
+            record.leased = False
+        
+        healthy = True
+        try:
+            if conn.in_transaction:
+                conn.rollback()         # never hand out a half-finished transaction
+        except sqlite3.Error:
+            healthy = False
+        now = time.monotonic()
+        with self._cond:
+            self._lease_time += now - record.last_used
+            record.last_used = now
+            if healthy and not self._closed:
+                self._idle.append(record)
+                self._cond.notify()
+                return
+        self._discard(record)
+    
+    @contextmanager
+    def connection(self, timeout: Optional[float] = None):
+        """Lease a connection; commit on success, roll back on error."""
+        conn = self.get_connection(timeout)
+        try:
+            yield conn
+            if conn.in_transaction:
+                conn.commit()
+        finally:
+            self.release_connection(conn)
+    
+    def close(self):
+        """Close idle connections now; busy ones are closed when released."""
+        with self._cond:
+            self._closed = True
+            idle, self._idle = self._idle, []
+            self._cond.notify_all()
+        for record in idle:
+            self._discard(record)
+    
+    def __enter__(self):
+        return self
     
-    def _create_connection(self):
-        """Create a new database connection (simulated)."""
-        return f"Connection_{self._created_count}"
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
     
     def stats(self) -> dict:
         """Get pool statistics."""
-        return {
-            'total_created': self._created_count,
-            'available': self._available.qsize(),
-            'in_use': len(self._in_use)
-        }
+        with self._cond:
+            metrics = dict(self._metrics)
+            elapsed = max(time.monotonic() - self._started, 1e-9)
+            wait_time = metrics.pop('wait_time')
+            acquired = metrics['acquired']
+            return {
+                **metrics,
+                'open': self._open,
+                'available': len(self._idle),
+                'avg_wait_ms': wait_time / acquired * 1000 if acquired else 0.0,
+                'utilization': self._lease_time / (elapsed * self._max_connections),
+            }
+
+def benchmark_connection_pool(pool_sizes=(1, 2, 4, 8), threads: int = 8,
+                              requests_per_thread: int = 100, hold_time: float = 0.002):
+    """Measure read throughput of a file-backed database for several pool sizes.
+    
+    Each request runs a real indexed SELECT and then keeps the connection for
+    `hold_time` seconds, like a web handler that does other work inside its
+    transaction. A pool of 1 behaves like one shared connection behind a lock.
+    """
+    import os
+    import random
+    import tempfile
+    from concurrent.futures import ThreadPoolExecutor
+    
+    print(f"\n=== Connection Pool Benchmark "
+          f"({threads} threads x {requests_per_thread} reads, {hold_time * 1000:.0f} ms held) ===")
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "bench.db")
+        setup = sqlite3.connect(path)
+        setup.execute("PRAGMA journal_mode=WAL")
+        setup.execute("CREATE TABLE users (id INTEGER PRIMARY KEY, username TEXT, score INTEGER)")
+        setup.executemany("INSERT INTO users (username, score) VALUES (?, ?)",
+                          ((f"user{i}", i % 100) for i in range(20000)))
+        setup.commit()
+        setup.close()
+        
+        results = {}
+        for size in pool_sizes:
+            with ConnectionPool(path, max_connections=size, timeout=30.0) as pool:
+                def worker(seed: int) -> int:
+                    rng = random.Random(seed)
+                    for _ in range(requests_per_thread):
+                        with pool.connection() as conn:
+                            conn.execute("SELECT username, score FROM users WHERE id = ?",
+                                         (rng.randint(1, 20000),)).fetchone()
+                            time.sleep(hold_time)
+                    return requests_per_thread
+                
+                start = time.perf_counter()
+                with ThreadPoolExecutor(max_workers=threads) as executor:
+                    total = sum(executor.map(worker, range(threads)))
+                elapsed = time.perf_counter() - start
+                stats = pool.stats()
+            
+            results[size] = total / elapsed
+            print(f"pool size {size:2d}: {results[size]:8.0f} reads/s, "
+                  f"avg wait {stats['avg_wait_ms']:6.2f} ms, "
+                  f"utilization {stats['utilization']:.0%}, "
+                  f"connections {stats['created']}")
+    
+    return results
+
+def demonstrate_connection_pool():
+    """Show timeouts, rollback on error and pool metrics."""
+    import os
+    import tempfile
+    
+    print("\n=== SQLite Connection Pool ===")
+    
+    with tempfile.TemporaryDirectory() as tmp, \
+            ConnectionPool(os.path.join(tmp, "items.db"), max_connections=2, timeout=0.2) as pool:
+        with pool.connection() as conn:
+            conn.execute("CREATE TABLE items (id INTEGER PRIMARY KEY, name TEXT)")
+            conn.executemany("INSERT INTO items (name) VALUES (?)",
+                             [(f"item{i}",) for i in range(100)])
+        
+        # Two leases exhaust the pool; both see the same database file
+        first, second = pool.get_connection(), pool.get_connection()
+        count = second.execute("SELECT COUNT(*) FROM items").fetchone()[0]
+        print(f"Second connection sees {count} rows")
+        try:
+            pool.get_connection()
+        except PoolTimeout as e:
+            print(f"Third acquire: PoolTimeout ({e})")
+        pool.release_connection(first)
+        pool.release_connection(second)
+        
+        # A second release must not put the connection in the idle list twice
+        try:
+            pool.release_connection(first)
+        except ValueError as e:
+            print(f"Double release rejected: {e}")
+        a, b = pool.get_connection(), pool.get_connection()
+        assert a is not b, "double release leased one connection twice"
+        print(f"Next two leases are distinct connections: {a is not b}")
+        pool.release_connection(a)
+        pool.release_connection(b)
+        
+        # A failing block is rolled back before the connection is reused
+        try:
+            with pool.connection() as conn:
+                conn.execute("DELETE FROM items")
+                raise RuntimeError("handler failed")
+        except RuntimeError:
+            pass
+        with pool.connection() as conn:
+            count = conn.execute("SELECT COUNT(*) FROM items").fetchone()[0]
+        print(f"Rows after failed delete: {count}")
+        
+        stats = pool.stats()
+        print(f"Stats: acquired={stats['acquired']}, timeouts={stats['timeouts']}, "
+              f"affinity hits={stats['affinity_hits']}, created={stats['created']}")
+    
+    benchmark_connection_pool()
 
 
 # Step 7: Garbage collection optimization
@@ -1110,6 +2001,8 @@ class ConnectionPool:
 
 # Previous code from Steps 1-6:
 # (All imports, MemoryProfiler, __slots__ classes, generators, weak references, data structures, and object pooling from above)
+import time
+from contextlib import contextmanager
 
 def demonstrate_gc_optimization():
     """Demonstrate garbage collection optimization techniques."""
@@ -1260,6 +2153,296 @@ def demonstrate_gc_friendly_patterns():
     print(f"Processed {processed_count} even numbers")
     print("Large data manually cleaned up")
 
+class GCPhaseStats:
+    """Collector activity attributed to one named phase."""
+    __slots__ = ['name', 'calls', 'wall_time', 'gc_time', 'max_pause',
+                 'collections', 'collected', 'uncollectable', 'safe_points']
+    
+    def __init__(self, name: str):
+        self.name = name
+        self.calls = 0
+        self.wall_time = 0.0
+        self.gc_time = 0.0
+        self.max_pause = 0.0
+        self.collections = [0, 0, 0]
+        self.collected = 0
+        self.uncollectable = 0
+        self.safe_points = 0
+    
+    @property
+    def gc_fraction(self) -> float:
+        return self.gc_time / self.wall_time if self.wall_time else 0.0
+    
+    def to_dict(self) -> dict:
+        return {
+            'phase': self.name,
+            'calls': self.calls,
+            'wall_time': self.wall_time,
+            'gc_time': self.gc_time,
+            'gc_fraction': self.gc_fraction,
+            'max_pause': self.max_pause,
+            'collections': list(self.collections),
+            'collected': self.collected,
+            'uncollectable': self.uncollectable,
+            'safe_points': self.safe_points,
+        }
+
+class GCController:
+    """Tune the cyclic collector per phase of a batch job and time its pauses.
+    
+    Pauses are measured with a ``gc.callbacks`` hook and charged to the
+    innermost active phase. Phases can raise the allocation thresholds or
+    disable automatic collection, and ``safe_point()`` collects explicitly
+    where the caller knows the young generations are mostly garbage.
+    ``freeze()`` moves everything alive (modules, config, reference data)
+    into the permanent generation so full collections stop re-scanning it.
+    
+    Usage:
+        controller = GCController()
+        with controller:
+            load_reference_data()
+            controller.freeze()
+            with controller.phase("transform", thresholds=(50_000, 20, 100)):
+                run_batch()
+        controller.print_report()
+    
+    ``phase()`` also works as a decorator. Phases are tracked per controller,
+    not per thread, so use it from the thread that drives the job.
+    """
+    
+    def __init__(self):
+        self._phases = {}
+        self._stack = []
+        self._outside = GCPhaseStats('<no phase>')
+        self._installed = 0
+        self._pause_start = None
+        self._frozen = False
+        self.frozen_objects = 0
+    
+    def _on_gc(self, event: str, info: dict):
+        # Runs inside the collector: no locks, no heavy allocation
+        if event == 'start':
+            self._pause_start = time.perf_counter()
+            return
+        start, self._pause_start = self._pause_start, None
+        if start is None:
+            return
+        pause = time.perf_counter() - start
+        stats = self._stack[-1] if self._stack else self._outside
+        stats.gc_time += pause
+        if pause > stats.max_pause:
+            stats.max_pause = pause
+        stats.collections[info['generation']] += 1
+        stats.collected += info['collected']
+        stats.uncollectable += info['uncollectable']
+    
+    def _install(self):
+        if self._installed == 0:
+            gc.callbacks.append(self._on_gc)
+        self._installed += 1
+    
+    def _uninstall(self):
+        self._installed -= 1
+        if self._installed == 0:
+            gc.callbacks.remove(self._on_gc)
+            self._pause_start = None
+    
+    def start(self) -> 'GCController':
+        """Start recording pauses."""
+        self._install()
+        return self
+    
+    def stop(self):
+        """Stop recording and undo freeze()."""
+        if self._frozen:
+            self.unfreeze()
+        self._uninstall()
+    
+    def __enter__(self):
+        return self.start()
+    
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
+        return False
+    
+    def freeze(self, collect: bool = True) -> int:
+        """Move all currently tracked objects to the permanent generation.
+        
+        Call it once startup data is loaded. With ``collect`` the garbage made
+        during startup is collected first so it is not frozen with the rest.
+        """
+        if collect:
+            gc.collect()
+        gc.freeze()
+        self._frozen = True
+        self.frozen_objects = gc.get_freeze_count()
+        return self.frozen_objects
+    
+    def unfreeze(self):
+        """Return frozen objects to the oldest generation."""
+        gc.unfreeze()
+        self._frozen = False
+        self.frozen_objects = 0
+    
+    def safe_point(self, generation: int = 0, min_pending: int = 0) -> int:
+        """Collect ``generation`` now; returns the number of objects collected.
+        
+        ``min_pending`` makes it cheap to call inside a loop: nothing happens
+        until that many net container allocations have piled up.
+        """
+        if min_pending and gc.get_count()[0] < min_pending:
+            return 0
+        stats = self._stack[-1] if self._stack else self._outside
+        stats.safe_points += 1
+        return gc.collect(generation)
+    
+    @contextmanager
+    def phase(self, name: str, thresholds: Optional[tuple] = None,
+              disable: bool = False, collect_on_exit: Optional[int] = None):
+        """Charge GC pauses to ``name``, optionally with different settings.
+        
+        thresholds: passed to gc.set_threshold() for the duration.
+        disable: turn automatic collection off; pair it with safe_point().
+        collect_on_exit: generation to collect before leaving the phase.
+        Previous thresholds and enabled state are restored on exit.
+        """
+        stats = self._phases.get(name)
+        if stats is None:
+            stats = self._phases[name] = GCPhaseStats(name)
+        saved_thresholds = gc.get_threshold()
+        was_enabled = gc.isenabled()
+        self._install()
+        self._stack.append(stats)
+        if thresholds is not None:
+            gc.set_threshold(*thresholds)
+        if disable:
+            gc.disable()
+        started = time.perf_counter()
+        try:
+            yield stats
+        finally:
+            try:
+                if collect_on_exit is not None:
+                    self.safe_point(collect_on_exit)
+            finally:
+                stats.wall_time += time.perf_counter() - started
+                stats.calls += 1
+                self._stack.pop()
+                gc.set_threshold(*saved_thresholds)
+                if was_enabled:
+                    gc.enable()
+                else:
+                    gc.disable()
+                self._uninstall()
+    
+    def report(self) -> List[dict]:
+        """Per-phase GC time; pauses outside any phase are listed last."""
+        rows = [stats.to_dict() for stats in self._phases.values()]
+        if sum(self._outside.collections):
+            rows.append(self._outside.to_dict())
+        return rows
+    
+    def print_report(self):
+        print(f"{'phase':<14} {'wall':>9} {'in gc':>9} {'gc %':>6} {'max pause':>10} "
+              f"{'gen0/1/2':>14} {'safe pts':>8}")
+        for row in self.report():
+            generations = '/'.join(str(count) for count in row['collections'])
+            if row['calls']:
+                wall, fraction = f"{row['wall_time']:>8.3f}s", f"{row['gc_fraction']:>6.1%}"
+            else:
+                wall, fraction = f"{'-':>9}", f"{'-':>6}"
+            print(f"{row['phase']:<14} {wall} {row['gc_time']:>8.3f}s {fraction} "
+                  f"{row['max_pause'] * 1000:>8.2f}ms {generations:>14} {row['safe_points']:>8}")
+        if self.frozen_objects:
+            print(f"frozen objects: {self.frozen_objects:,}")
+
+def _gc_batch_job(controller: GCController, records: int, reference_size: int,
+                  tuned: bool) -> int:
+    """Allocation-heavy job: load reference data, then build many small dicts."""
+    # Startup only builds long-lived data, so collecting during it is wasted
+    # work; freeze() then takes the result out of every later collection
+    with controller.phase("startup", disable=tuned):
+        reference = {i: {'name': f"item{i}", 'tags': [i % 7, i % 11]}
+                     for i in range(reference_size)}
+    
+    if tuned:
+        with controller.phase("freeze"):
+            controller.freeze()
+        bulk = controller.phase("bulk", thresholds=(50_000, 50, 1000), collect_on_exit=0)
+    else:
+        bulk = controller.phase("bulk")
+    
+    with bulk:
+        output = []
+        for i in range(records):
+            ref = reference[i % reference_size]
+            row = {'id': i, 'name': ref['name'], 'tags': ref['tags'] + [i % 3]}
+            output.append(row)
+            # Temporary per-record work that dies immediately
+            scratch = {'key': i, 'values': [i, i + 1]}
+            del scratch
+    
+    @controller.phase("aggregate")
+    def aggregate(rows):
+        totals = defaultdict(int)
+        for row in rows:
+            totals[row['tags'][-1]] += 1
+        return totals
+    
+    totals = aggregate(output)
+    count = len(output)
+    del output, reference, totals
+    return count
+
+def benchmark_gc_controller(records: int = 1_000_000, reference_size: int = 300_000):
+    """Default collector settings vs freeze + raised thresholds for a batch job."""
+    print("\n=== GC Controller Benchmark ===")
+    print(f"{records:,} output records, {reference_size:,} long-lived reference entries")
+    
+    results = {}
+    for label, tuned in (("default", False), ("tuned", True)):
+        gc.collect()
+        controller = GCController()
+        start = time.perf_counter()
+        with controller:
+            _gc_batch_job(controller, records, reference_size, tuned)
+        elapsed = time.perf_counter() - start
+        gc.collect()
+        
+        gc_time = sum(row['gc_time'] for row in controller.report())
+        results[label] = {'elapsed': elapsed, 'gc_time': gc_time,
+                          'phases': controller.report()}
+        print(f"\n{label}: {elapsed:.2f}s total, {gc_time:.2f}s in GC "
+              f"({gc_time / elapsed:.1%})")
+        controller.print_report()
+    
+    speedup = results['default']['elapsed'] / results['tuned']['elapsed']
+    print(f"\nTuned job is {speedup:.2f}x faster")
+    return results
+
+def demonstrate_gc_controller():
+    """Show phase accounting, safe points and restored settings."""
+    print("\n=== GC Controller Demo ===")
+    thresholds = gc.get_threshold()
+    controller = GCController()
+    
+    with controller:
+        with controller.phase("cyclic", disable=True):
+            for i in range(20000):
+                node = {'id': i}
+                node['self'] = node  # reference cycle, only the collector frees it
+                del node
+                # Bounded memory without letting allocation counts pick the moment
+                controller.safe_point(min_pending=5000)
+        
+        with controller.phase("acyclic", thresholds=(100_000, 50, 1000)):
+            rows = [{'id': i, 'values': [i]} for i in range(200_000)]
+            del rows
+    
+    controller.print_report()
+    print(f"Thresholds restored: {gc.get_threshold() == thresholds}, "
+          f"GC enabled: {gc.isenabled()}")
+
 
 # Step 8: Comprehensive memory optimization demonstration
 # ===============================================================================
@@ -1276,8 +2459,10 @@ class MemoryOptimizedDataProcessor:
     """A comprehensive example combining all memory optimization techniques."""
     __slots__ = ['_data_cache', '_object_pool', '_weak_observers', '_stats']
     
-    def __init__(self, pool_size: int = 50):
-        self._data_cache = weakref.WeakValueDictionary()
+    def __init__(self, pool_size: int = 50, cache_size: int = 256):
+        # Computed results are often ints or tuples, which a bare
+        # WeakValueDictionary rejects; the hybrid cache holds those strongly
+        self._data_cache = CacheWithWeakRefs(strong_size=cache_size)
         self._object_pool = ObjectPool(
             lambda id: ExpensiveResource(id), 
             max_size=pool_size
@@ -1285,38 +2470,37 @@ class MemoryOptimizedDataProcessor:
         self._weak_observers = []
         self._stats = defaultdict(int)
     
-    def process_large_dataset_efficiently(self, data_size: int) -> Generator[dict, None, None]:
+    def process_large_dataset_efficiently(self, data_size: int,
+                                          lease_block: int = 256) -> Generator[dict, None, None]:
         """Process large dataset using memory-efficient techniques."""
         # Use generator to avoid loading all data into memory
-        for i in range(data_size):
-            # Use object pool for expensive resources
-            resource = self._object_pool.acquire()
-            
-            try:
-                # Process data efficiently
-                if i % 2 == 0:  # Only process even numbers
-                    result = {
-                        'id': i,
-                        'processed_value': i * 2,
-                        'resource_id': resource.resource_id
-                    }
-                    self._stats['processed'] += 1
-                    yield result
-                else:
-                    self._stats['skipped'] += 1
-            finally:
-                # Always return resource to pool
-                self._object_pool.release(resource)
+        for block_start in range(0, data_size, lease_block):
+            # Lease one pooled resource per block instead of per element;
+            # the lease is returned even if the consumer stops early
+            with self._object_pool.lease() as resource:
+                for i in range(block_start, min(block_start + lease_block, data_size)):
+                    # Process data efficiently
+                    if i % 2 == 0:  # Only process even numbers
+                        result = {
+                            'id': i,
+                            'processed_value': i * 2,
+                            'resource_id': resource.resource_id
+                        }
+                        self._stats['processed'] += 1
+                        yield result
+                    else:
+                        self._stats['skipped'] += 1
     
     def cache_expensive_computation(self, key: str, compute_func):
         """Cache expensive computations with weak references."""
-        result = self._data_cache.get(key)
-        if result is None:
-            result = compute_func()
-            self._data_cache[key] = result
-            self._stats['cache_miss'] += 1
-        else:
-            self._stats['cache_hit'] += 1
+        computed = []
+        
+        def compute():
+            computed.append(True)
+            return compute_func()
+        
+        result = self._data_cache.get(key, compute)
+        self._stats['cache_miss' if computed else 'cache_hit'] += 1
         return result
     
     def add_observer(self, observer):
@@ -1345,7 +2529,9 @@ class MemoryOptimizedDataProcessor:
 
 class MemoryEfficientObserver:
     """Observer using __slots__ for memory efficiency."""
-    __slots__ = ['name', 'notification_count']
+    # __weakref__ must be listed explicitly, or slotted instances
+    # cannot be observed through weakref.ref
+    __slots__ = ['name', 'notification_count', '__weakref__']
     
     def __init__(self, name: str):
         self.name = name
@@ -1396,8 +2582,8 @@ def comprehensive_memory_optimization_demo():
     print(f"\nProcessing completed!")
     print(f"Total items processed: {stats['processed']}")
     print(f"Items skipped: {stats['skipped']}")
-    print(f"Cache hits: {stats['cache_hit']}")
-    print(f"Cache misses: {stats['cache_miss']}")
+    print(f"Cache hits: {stats.get('cache_hit', 0)}")
+    print(f"Cache misses: {stats.get('cache_miss', 0)}")
     print(f"Memory used: {format_bytes(final_stats['memory_used'])}")
     print(f"Peak memory: {format_bytes(final_stats['peak_usage'])}")
     
@@ -1413,6 +2599,961 @@ def comprehensive_memory_optimization_demo():
     
     print(f"\nMemory optimization demonstration completed!")
 
+# Step 9: Hunting memory leaks with tracemalloc snapshot diffs
+# ===============================================================================
+
+# Explanation:
+# MemoryProfiler tells us *how much* memory grew between start and stop, but a
+# long-running worker that leaks needs to know *where*. tracemalloc can take a
+# snapshot of every live allocation together with the traceback that made it.
+# By taking snapshots periodically (or after every call of a worker function)
+# and grouping them by traceback, we can rank allocation sites by how much they
+# grew and - more importantly - how *consistently* they grew. A cache that
+# fills up once is not a leak; a site that grows in every interval is.
+
+# Previous code from Steps 1-8:
+# (All imports, MemoryProfiler, format_bytes and the optimization examples from above)
+
+import fnmatch
+import functools
+import json
+import os
+import threading
+
+class LeakSite:
+    """One allocation site and how it grew across snapshots."""
+    __slots__ = ['traceback', 'size_diff', 'count_diff', 'size', 'count',
+                 'growth_fraction', 'series']
+
+    def __init__(self, traceback, size_diff: int, count_diff: int, size: int,
+                 count: int, growth_fraction: float, series: List[int]):
+        self.traceback = traceback
+        self.size_diff = size_diff
+        self.count_diff = count_diff
+        self.size = size
+        self.count = count
+        self.growth_fraction = growth_fraction
+        self.series = series
+
+    @property
+    def score(self) -> float:
+        """Growth weighted by how steadily the site grew."""
+        return self.size_diff * self.growth_fraction
+
+    def location(self) -> str:
+        frame = self.traceback[-1] if self.traceback else None
+        return f"{frame.filename}:{frame.lineno}" if frame else "<unknown>"
+
+    def to_dict(self) -> dict:
+        return {
+            'location': self.location(),
+            'traceback': [f"{frame.filename}:{frame.lineno}" for frame in self.traceback],
+            'size_diff': self.size_diff,
+            'count_diff': self.count_diff,
+            'size': self.size,
+            'count': self.count,
+            'growth_fraction': round(self.growth_fraction, 3),
+            'series': self.series,
+        }
+
+
+class LeakHunter:
+    """Periodic tracemalloc snapshots, diffed by traceback to find leaks.
+
+    tracemalloc charges memory to the line that first allocated it. CPython
+    keeps freed dicts, lists, tuples and floats on per-type freelists and
+    hands them out again without a new allocation, so growth can show up
+    at a site that only allocated temporaries of the same type. If the top
+    suspect looks innocent, snapshot the workers separately.
+    """
+
+    def __init__(self, interval: Optional[float] = 1.0, traceback_depth: int = 10,
+                 max_snapshots: int = 60, ignore_files: Optional[List[str]] = None):
+        """
+        Args:
+            interval: Seconds between automatic snapshots; None for manual only.
+            traceback_depth: Frames stored per allocation (more = slower).
+            max_snapshots: Snapshots kept; the first one is always kept as baseline.
+            ignore_files: Extra filename patterns to exclude from the results.
+        """
+        self.interval = interval
+        self.traceback_depth = traceback_depth
+        self._ignore_patterns = [
+            tracemalloc.__file__,
+            "<frozen importlib._bootstrap*>",
+            "<unknown>",
+        ] + list(ignore_files or [])
+        self._ignored_files = {}
+        self._baseline = None
+        self._snapshots = deque(maxlen=max(1, max_snapshots - 1))
+        self._started_tracing = False
+        self._stop_event = threading.Event()
+        self._thread = None
+        self._lock = Lock()
+        self.start_time = None
+        self.end_time = None
+
+    def start(self):
+        """Start tracing (if needed), take the baseline and begin sampling."""
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(self.traceback_depth)
+            self._started_tracing = True
+        self.start_time = time.time()
+        self._baseline = None
+        self._snapshots.clear()
+        self.snapshot("baseline")
+        if self.interval:
+            self._stop_event.clear()
+            self._thread = threading.Thread(target=self._run, name="LeakHunter", daemon=True)
+            self._thread.start()
+        return self
+
+    def _run(self):
+        while not self._stop_event.wait(self.interval):
+            self.snapshot()
+
+    def snapshot(self, label: Optional[str] = None):
+        """Take a snapshot now; call this at safe points in long-running workers."""
+        gc.collect()  # Only count objects that are really still reachable
+        # statistics() allocates inside tracemalloc.py, so ignoring that file
+        # hides the memory the hunter itself uses to keep these results around.
+        # Filtering is deferred to report(): Snapshot.filter_traces() matches
+        # every single trace and is far slower than grouping first.
+        stats = tracemalloc.take_snapshot().statistics('traceback')
+        entry = (time.time(), label, stats)
+        with self._lock:
+            if self._baseline is None:
+                self._baseline = entry
+            else:
+                self._snapshots.append(entry)
+
+    def stop(self):
+        """Take a final snapshot and stop sampling."""
+        if self._thread is not None:
+            self._stop_event.set()
+            self._thread.join()
+            self._thread = None
+        if tracemalloc.is_tracing():
+            self.snapshot("final")
+        if self._started_tracing:
+            tracemalloc.stop()
+            self._started_tracing = False
+        self.end_time = time.time()
+        return self
+
+    def _ignored(self, tb) -> bool:
+        """True when the most recent frame is in an ignored file."""
+        filename = tb[-1].filename if len(tb) else "<unknown>"
+        ignored = self._ignored_files.get(filename)
+        if ignored is None:
+            ignored = any(fnmatch.fnmatch(filename, pattern) for pattern in self._ignore_patterns)
+            self._ignored_files[filename] = ignored
+        return ignored
+
+    @property
+    def snapshot_count(self) -> int:
+        return len(self._snapshots) + (self._baseline is not None)
+
+    def report(self, limit: int = 10, min_growth_fraction: float = 0.0) -> List[LeakSite]:
+        """Rank allocation sites by steady growth since the baseline."""
+        with self._lock:
+            entries = ([self._baseline] if self._baseline else []) + list(self._snapshots)
+        if len(entries) < 2:
+            return []
+
+        tables = [{stat.traceback: stat for stat in stats} for _, _, stats in entries]
+        first, last = tables[0], tables[-1]
+        sites = []
+        for tb, stat in last.items():
+            if self._ignored(tb):
+                continue
+            before = first.get(tb)
+            size_diff = stat.size - (before.size if before else 0)
+            if size_diff <= 0:
+                continue
+            series = [table[tb].size if tb in table else 0 for table in tables]
+            steps = len(series) - 1
+            grew = sum(1 for a, b in zip(series, series[1:]) if b > a)
+            site = LeakSite(tb, size_diff, stat.count - (before.count if before else 0),
+                            stat.size, stat.count, grew / steps, series)
+            if site.growth_fraction >= min_growth_fraction:
+                sites.append(site)
+
+        sites.sort(key=lambda site: site.score, reverse=True)
+        return sites[:limit]
+
+    def to_dict(self, limit: int = 10) -> dict:
+        return {
+            'started': self.start_time,
+            'ended': self.end_time,
+            'snapshots': self.snapshot_count,
+            'interval': self.interval,
+            'sites': [site.to_dict() for site in self.report(limit)],
+        }
+
+    def export_json(self, path: str, limit: int = 25):
+        """Write the ranked sites to a JSON file."""
+        with open(path, 'w') as f:
+            json.dump(self.to_dict(limit), f, indent=2)
+
+    def print_report(self, limit: int = 5, frames: int = 3):
+        """Print the top suspects with their most recent frames."""
+        sites = self.report(limit)
+        print(f"Leak report: {self.snapshot_count} snapshots, top {len(sites)} growing sites")
+        for rank, site in enumerate(sites, 1):
+            print(f"  #{rank} +{format_bytes(site.size_diff)} (+{site.count_diff} blocks), "
+                  f"grew in {site.growth_fraction:.0%} of intervals")
+            for frame in list(site.traceback)[-frames:][::-1]:
+                print(f"      {os.path.basename(frame.filename)}:{frame.lineno}")
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
+        return False
+
+
+def track_leaks(report_every: int = 0, limit: int = 5, json_path: Optional[str] = None):
+    """Decorator: snapshot after every call so growth across calls stands out.
+
+    The hunter is available as `func.leak_hunter`; call `func.leak_hunter.stop()`
+    when done (this also writes json_path if given).
+    """
+    def decorator(func):
+        hunter = LeakHunter(interval=None)
+        calls = 0
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            nonlocal calls
+            if hunter.start_time is None or hunter.end_time is not None:
+                hunter.end_time = None
+                hunter.start()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                calls += 1
+                hunter.snapshot(f"call {calls}")
+                if report_every and calls % report_every == 0:
+                    hunter.print_report(limit)
+
+        original_stop = hunter.stop
+
+        def stop():
+            original_stop()
+            if json_path:
+                hunter.export_json(json_path)
+            return hunter
+
+        hunter.stop = stop
+        wrapper.leak_hunter = hunter
+        return wrapper
+    return decorator
+
+# Example usage of leak hunting
+_request_log = []  # Module-level list that a "worker" forgets to trim
+
+def handle_request_leaky(request_id: int) -> int:
+    """Worker that leaks: every request is appended to a global log."""
+    payload = {'id': request_id, 'body': 'x' * 200}
+    _request_log.append(payload)
+    return len(payload['body'])
+
+def handle_request_clean(request_id: int) -> int:
+    """Worker that only allocates temporaries."""
+    # A tuple, not a dict: a freed dict goes on the dict freelist, and the
+    # leaky worker's next dict would reuse it. tracemalloc would then charge
+    # the leaked dicts to this line, where that memory was first allocated.
+    payload = (request_id, 'x' * 200)
+    return len(payload[1])
+
+def demonstrate_leak_hunting():
+    """Find a leaking allocation site with periodic snapshots."""
+    print("\n=== Leak Hunting with Snapshot Diffs ===")
+
+    # Context manager with manual snapshots at batch boundaries
+    with LeakHunter(interval=None) as hunter:
+        for batch in range(5):
+            for i in range(2000):
+                handle_request_leaky(batch * 2000 + i)
+                handle_request_clean(i)
+            hunter.snapshot(f"batch {batch}")
+    hunter.print_report(limit=3)
+
+    top = hunter.report(limit=1)
+    if top:
+        print(f"Top suspect: {os.path.basename(top[0].location())} "
+              f"series {[format_bytes(s) for s in top[0].series]}")
+
+    # Decorator: one snapshot per call of a worker function
+    @track_leaks()
+    def run_batch(start: int):
+        for i in range(start, start + 1000):
+            handle_request_leaky(i)
+
+    for start in range(0, 4000, 1000):
+        run_batch(start)
+    run_batch.leak_hunter.stop()
+    site = run_batch.leak_hunter.report(limit=1)[0]
+    print(f"Decorator found +{format_bytes(site.size_diff)} at "
+          f"{os.path.basename(site.location())}, JSON keys: {list(site.to_dict())[:4]}")
+
+    _request_log.clear()
+
+# Step 10: Columnar record store for millions of small records
+# ===============================================================================
+
+# Explanation:
+# Even with __slots__, every SlottedCoordinate is a ~56-byte object holding
+# three pointers to separate 24-byte float objects, plus an 8-byte slot in
+# the list that holds it - over 140 bytes for 24 bytes of actual data.
+# A columnar store keeps one typed array per field instead (array.array, or
+# NumPy when available), so a record costs exactly its raw field bytes:
+# - a schema maps field names to array typecodes ('d' = float64, 'i' = int32...)
+# - row views look like the slotted classes (coord.x, coord.distance_from_origin())
+#   but are created on access and only hold (store, index)
+# - field operations run over whole columns at once (NumPy when available)
+# - save() writes the columns to one file; load() maps it back with mmap, so
+#   opening 50M records costs no parsing and only touched pages are read
+
+# Previous code from Steps 1-9:
+# (All imports, MemoryProfiler, format_bytes and the slotted classes from above)
+
+import math
+import mmap
+from typing import Iterable, Iterator
+
+try:
+    import numpy as np
+    HAS_NUMPY = True
+except ImportError:
+    HAS_NUMPY = False
+
+class RecordView:
+    """A lightweight row of a ColumnarRecords store (attributes are columns)."""
+    __slots__ = ['_store', '_index']
+    
+    def __init__(self, store: 'ColumnarRecords', index: int):
+        self._store = store
+        self._index = index
+    
+    def distance_from_origin(self) -> float:
+        columns = self._store._columns
+        return math.sqrt(sum(columns[name][self._index] ** 2
+                             for name in self._store.spatial_fields))
+    
+    def as_tuple(self) -> tuple:
+        return tuple(column[self._index] for column in self._store._columns.values())
+    
+    def __repr__(self):
+        fields = ", ".join(f"{name}={column[self._index]!r}"
+                           for name, column in self._store._columns.items())
+        return f"{type(self).__name__}({fields})"
+
+def _column_property(name: str) -> property:
+    def getter(view):
+        return view._store._columns[name][view._index]
+    
+    def setter(view, value):
+        view._store._columns[name][view._index] = value
+    
+    return property(getter, setter, doc=f"Column '{name}' of this row")
+
+class ColumnarRecords:
+    """Typed, growable column store: one array per field, rows as views.
+    
+    schema: field name -> array typecode, e.g. {'x': 'd', 'y': 'd', 'z': 'd'}
+    """
+    
+    MAGIC = b"COLREC01"
+    ALIGNMENT = 64
+    
+    def __init__(self, schema: dict, name: str = "Record"):
+        for field_name, typecode in schema.items():
+            if typecode not in array.typecodes or typecode == 'u':
+                raise ValueError(f"unsupported typecode {typecode!r} for field {field_name!r}")
+        self.schema = dict(schema)
+        self.name = name
+        self._columns = {field_name: array.array(typecode)
+                         for field_name, typecode in self.schema.items()}
+        self._mapping = None
+        # Fields that distance_from_origin() treats as coordinates
+        self.spatial_fields = [f for f in ('x', 'y', 'z') if f in self.schema]
+        # Row class with one property per field, so views read like slotted objects
+        self.view_class = type(f"{name}View", (RecordView,), {
+            '__slots__': (),
+            **{field_name: _column_property(field_name) for field_name in self.schema},
+        })
+    
+    # -- building --------------------------------------------------------------
+    
+    def _check_growable(self):
+        if self._mapping is not None:
+            raise TypeError("a memory-mapped store has a fixed size")
+    
+    def _truncate(self, size: int):
+        """Undo a partial write so every column has `size` entries again."""
+        for column in self._columns.values():
+            del column[size:]
+    
+    def append(self, *values):
+        """Append one record given field values in schema order.
+        
+        The record is added completely or not at all: a wrong field count
+        raises ValueError, and a value the column type rejects raises
+        without leaving the columns at different lengths.
+        """
+        self._check_growable()
+        if len(values) != len(self._columns):
+            raise ValueError(f"expected {len(self._columns)} values "
+                             f"({', '.join(self.schema)}), got {len(values)}")
+        size = len(self)
+        try:
+            for column, value in zip(self._columns.values(), values):
+                column.append(value)
+        except BaseException:
+            self._truncate(size)
+            raise
+    
+    def extend(self, rows: Iterable[tuple], chunk_size: int = 65536):
+        """Append many records given as tuples in schema order.
+        
+        All or nothing: rows are staged in per-column arrays, and if any row
+        is rejected the store is left as it was before the call.
+        """
+        self._check_growable()
+        width = len(self._columns)
+        columns = list(self._columns.values())
+        size = len(self)
+        rows = iter(rows)
+        try:
+            while True:
+                chunk = list(itertools.islice(rows, chunk_size))
+                if not chunk:
+                    break
+                staged = [array.array(column.typecode) for column in columns]
+                for row in chunk:
+                    if len(row) != width:
+                        raise ValueError(f"expected {width} values "
+                                         f"({', '.join(self.schema)}), got {len(row)}")
+                    for part, value in zip(staged, row):
+                        part.append(value)
+                for column, part in zip(columns, staged):
+                    column.extend(part)
+        except BaseException:
+            self._truncate(size)
+            raise
+    
+    def extend_columns(self, **columns):
+        """Append whole columns at once.
+        
+        Each column may be any iterable (lists, arrays, NumPy arrays or
+        generators); every column is converted to the field's type before
+        anything is appended, so a bad value or a length mismatch leaves the
+        store unchanged.
+        """
+        self._check_growable()
+        if set(columns) != set(self.schema):
+            raise ValueError(f"expected columns {sorted(self.schema)}")
+        converted = {}
+        for field_name, values in columns.items():
+            typecode = self._columns[field_name].typecode
+            if HAS_NUMPY and isinstance(values, np.ndarray):
+                # Raw bytes copy instead of boxing every element
+                part = array.array(typecode)
+                part.frombytes(np.ascontiguousarray(values, dtype=typecode).tobytes())
+            else:
+                part = array.array(typecode, values)
+            converted[field_name] = part
+        if len({len(part) for part in converted.values()}) > 1:
+            raise ValueError("all columns must have the same length")
+        for field_name, part in converted.items():
+            self._columns[field_name].extend(part)
+    
+    # -- access ----------------------------------------------------------------
+    
+    def __len__(self) -> int:
+        return len(next(iter(self._columns.values()))) if self._columns else 0
+    
+    def __getitem__(self, index: int) -> RecordView:
+        size = len(self)
+        if index < 0:
+            index += size
+        if not 0 <= index < size:
+            raise IndexError("record index out of range")
+        return self.view_class(self, index)
+    
+    def __iter__(self) -> Iterator[RecordView]:
+        view_class = self.view_class
+        for index in range(len(self)):
+            yield view_class(self, index)
+    
+    def column(self, field_name: str):
+        """A whole column: a zero-copy NumPy view if NumPy is installed."""
+        column = self._columns[field_name]
+        if HAS_NUMPY:
+            return np.frombuffer(column, dtype=self.schema[field_name])
+        return column
+    
+    # -- vectorized field operations ---------------------------------------------
+    
+    def distance_from_origin(self):
+        """distance_from_origin() of every row, computed column-wise."""
+        if HAS_NUMPY:
+            total = np.zeros(len(self))
+            for field_name in self.spatial_fields:
+                values = self.column(field_name).astype(np.float64, copy=False)
+                total += values * values
+            return np.sqrt(total)
+        columns = [self._columns[field_name] for field_name in self.spatial_fields]
+        return array.array('d', map(math.hypot, *columns))
+    
+    def where(self, field_name: str, low, high) -> List[int]:
+        """Row indexes with low <= field < high."""
+        if HAS_NUMPY:
+            values = self.column(field_name)
+            return np.flatnonzero((values >= low) & (values < high)).tolist()
+        return [i for i, value in enumerate(self._columns[field_name]) if low <= value < high]
+    
+    # -- memory and persistence ----------------------------------------------------
+    
+    @property
+    def nbytes(self) -> int:
+        """Bytes used by the column data."""
+        return sum(len(column) * array.array(self.schema[name]).itemsize
+                   for name, column in self._columns.items())
+    
+    def save(self, path: str):
+        """Write a header plus each column's raw bytes, 64-byte aligned."""
+        count = len(self)
+        offsets, offset = {}, 0
+        for field_name, typecode in self.schema.items():
+            offsets[field_name] = offset
+            size = count * array.array(typecode).itemsize
+            offset += size + (-size % self.ALIGNMENT)
+        header = json.dumps({'name': self.name, 'count': count,
+                             'schema': list(self.schema.items()),
+                             'offsets': offsets}).encode()
+        data_start = len(self.MAGIC) + 8 + len(header)
+        data_start += -data_start % self.ALIGNMENT
+        
+        with open(path, 'wb') as f:
+            f.write(self.MAGIC)
+            f.write(len(header).to_bytes(8, 'little'))
+            f.write(header)
+            for field_name in self.schema:
+                f.seek(data_start + offsets[field_name])
+                column = self._columns[field_name]
+                f.write(column)
+            f.truncate(data_start + offset)
+    
+    @classmethod
+    def load(cls, path: str, writable: bool = False) -> 'ColumnarRecords':
+        """Map a saved store into memory without reading it.
+        
+        With writable=True, assignments through views or column() go straight
+        to the file (records cannot be appended to a mapped store).
+        """
+        with open(path, 'r+b' if writable else 'rb') as f:
+            magic = f.read(len(cls.MAGIC))
+            if magic != cls.MAGIC:
+                raise ValueError(f"{path} is not a ColumnarRecords file")
+            header_size = int.from_bytes(f.read(8), 'little')
+            header = json.loads(f.read(header_size))
+            data_start = len(cls.MAGIC) + 8 + header_size
+            data_start += -data_start % cls.ALIGNMENT
+            access = mmap.ACCESS_WRITE if writable else mmap.ACCESS_READ
+            mapping = mmap.mmap(f.fileno(), 0, access=access) if header['count'] else None
+        
+        store = cls(dict(header['schema']), header['name'])
+        store._mapping = mapping
+        count = header['count']
+        if mapping is None:
+            return store
+        # Typed memoryviews: element access returns plain Python numbers and
+        # column() wraps them in NumPy arrays without copying
+        for field_name, typecode in store.schema.items():
+            start = data_start + header['offsets'][field_name]
+            size = count * array.array(typecode).itemsize
+            store._columns[field_name] = memoryview(mapping)[start:start + size].cast(typecode)
+        return store
+    
+    def flush(self):
+        """Write changes made to a writable mapping back to the file."""
+        if self._mapping is not None and not self._mapping.closed:
+            self._mapping.flush()
+
+def compare_columnar_records(size: int = 1_000_000):
+    """Compare slotted objects with the columnar store: memory and speed."""
+    import tempfile
+    
+    print(f"\n=== Columnar Records vs Slotted Objects ({size:,} coordinates) ===")
+    profiler = MemoryProfiler()
+    
+    profiler.start_profiling()
+    slotted = [SlottedCoordinate(i * 0.5, i * 0.25, i * 0.125) for i in range(size)]
+    slotted_stats = profiler.stop_profiling()
+    
+    profiler.start_profiling()
+    store = ColumnarRecords({'x': 'd', 'y': 'd', 'z': 'd'}, name="Coordinate")
+    if HAS_NUMPY:
+        index = np.arange(size, dtype=np.float64)
+        store.extend_columns(x=index * 0.5, y=index * 0.25, z=index * 0.125)
+        del index
+    else:
+        store.extend((i * 0.5, i * 0.25, i * 0.125) for i in range(size))
+    columnar_stats = profiler.stop_profiling()
+    
+    print(f"Slotted objects: {format_bytes(slotted_stats['memory_used'])} "
+          f"({slotted_stats['memory_used'] / size:.0f} bytes/record)")
+    print(f"Columnar store:  {format_bytes(columnar_stats['memory_used'])} "
+          f"({columnar_stats['memory_used'] / size:.0f} bytes/record, "
+          f"raw fields are {store.nbytes / size:.0f})")
+    
+    start = time.perf_counter()
+    slotted_distances = [math.sqrt(c.x ** 2 + c.y ** 2 + c.z ** 2) for c in slotted]
+    loop_time = time.perf_counter() - start
+    start = time.perf_counter()
+    distances = store.distance_from_origin()
+    vector_time = time.perf_counter() - start
+    assert abs(distances[-1] - slotted_distances[-1]) < 1e-6
+    print(f"distance_from_origin, object loop: {loop_time * 1000:7.1f} ms")
+    print(f"distance_from_origin, columnar:    {vector_time * 1000:7.1f} ms "
+          f"({loop_time / vector_time:.0f}x, {'NumPy' if HAS_NUMPY else 'array + math.hypot'})")
+    
+    view = store[size // 2]
+    print(f"Row view: {view}, distance {view.distance_from_origin():.2f}")
+    del slotted, slotted_distances
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "coordinates.colrec")
+        start = time.perf_counter()
+        store.save(path)
+        save_time = time.perf_counter() - start
+        
+        start = time.perf_counter()
+        mapped = ColumnarRecords.load(path)
+        load_time = time.perf_counter() - start
+        print(f"Saved {format_bytes(os.path.getsize(path))} in {save_time * 1000:.1f} ms, "
+              f"mapped back in {load_time * 1000:.2f} ms")
+        print(f"Mapped row {size // 2}: {mapped[size // 2]}")
+        del mapped
+    
+    return store
+
+def demonstrate_columnar_records():
+    """Build, query, update and persist a small columnar store."""
+    print("\n=== Columnar Record Store ===")
+    points = ColumnarRecords({'x': 'd', 'y': 'd', 'label': 'i'}, name="Point")
+    points.extend([(3.0, 4.0, 1), (6.0, 8.0, 2), (0.5, 0.5, 3)])
+    
+    first = points[0]
+    print(f"{first} -> distance {first.distance_from_origin()}")
+    first.x = 5.0                       # writes straight into the 'x' column
+    print(f"After update: {points[0]}")
+    print(f"All distances: {[round(float(d), 3) for d in points.distance_from_origin()]}")
+    print(f"Rows with 1 <= label < 3: {points.where('label', 1, 3)}")
+    
+    compare_columnar_records(1_000_000)
+
+# Step 11: Approximate counting with sketches
+# ===============================================================================
+
+# Explanation:
+# MemoryEfficientCounter and RegularCounter keep one dict entry (~100+ bytes
+# with the key string) per distinct key, so a day of URLs or user agents needs
+# gigabytes. Sketches trade exactness for a fixed, tiny memory footprint with
+# provable error bounds:
+# - CountMinSketch: depth rows of width counters. A key's count is the minimum
+#   of its cells, which never underestimates and overestimates by at most
+#   epsilon * total with probability 1 - delta. Conservative update only raises
+#   the cells that are below the new minimum, which makes estimates tighter.
+# - HyperLogLog: 2**p one-byte registers estimate the number of distinct keys
+#   with ~1.04 / sqrt(2**p) relative standard error (p=14: 16 KB, ~0.8%).
+# - SpaceSavingTopK: k monitored keys; every key seen more than total / k times
+#   is guaranteed to be among them, and each count is off by at most its
+#   recorded error.
+# Count-min and HyperLogLog hash keys with blake2b (stable across processes,
+# unlike hash()), so all three can be built per shard and merged afterwards.
+
+# Previous code from Steps 1-10:
+# (All imports, MemoryProfiler, format_bytes and the counters from Step 5)
+
+import hashlib
+import heapq
+
+def _hash64(key, seed: int = 0) -> int:
+    """Stable 64-bit hash of a key (str or bytes)."""
+    data = key if isinstance(key, bytes) else str(key).encode()
+    return int.from_bytes(hashlib.blake2b(data, digest_size=8,
+                                          salt=seed.to_bytes(8, 'little')).digest(), 'little')
+
+class CountMinSketch:
+    """Count-min sketch with optional conservative update; mergeable."""
+    __slots__ = ['width', 'depth', 'seed', 'conservative', 'total', '_table']
+    
+    def __init__(self, width: int = 2719, depth: int = 5, seed: int = 0,
+                 conservative: bool = True):
+        if not 1 <= depth <= 16:
+            raise ValueError("depth must be between 1 and 16")
+        self.width = width
+        self.depth = depth
+        self.seed = seed
+        self.conservative = conservative
+        self.total = 0
+        self._table = array.array('Q', bytes(8 * width * depth))
+    
+    @classmethod
+    def from_error(cls, epsilon: float, delta: float, **kwargs) -> 'CountMinSketch':
+        """Size the sketch so that error <= epsilon * total with probability >= 1 - delta."""
+        return cls(width=math.ceil(math.e / epsilon),
+                   depth=math.ceil(math.log(1 / delta)), **kwargs)
+    
+    def _cells(self, key) -> List[int]:
+        # One blake2b digest split into an independent 32-bit hash per row
+        # (double hashing would make some key pairs collide in every row)
+        data = key if isinstance(key, bytes) else str(key).encode()
+        digest = hashlib.blake2b(data, digest_size=4 * self.depth,
+                                 salt=self.seed.to_bytes(8, 'little')).digest()
+        width = self.width
+        return [row * width + h % width
+                for row, h in enumerate(memoryview(digest).cast('I'))]
+    
+    def increment(self, key, count: int = 1):
+        table = self._table
+        cells = self._cells(key)
+        self.total += count
+        if self.conservative:
+            target = min(table[cell] for cell in cells) + count
+            for cell in cells:
+                if table[cell] < target:
+                    table[cell] = target
+        else:
+            for cell in cells:
+                table[cell] += count
+    
+    def get_count(self, key) -> int:
+        """Estimated count: never below the true count."""
+        table = self._table
+        return min(table[cell] for cell in self._cells(key))
+    
+    def error_bound(self) -> float:
+        """Overestimate bound (holds with probability 1 - e**-depth)."""
+        return math.e / self.width * self.total
+    
+    def merge(self, other: 'CountMinSketch') -> 'CountMinSketch':
+        """Add another shard's counts (same width, depth and seed) into this one."""
+        if (self.width, self.depth, self.seed) != (other.width, other.depth, other.seed):
+            raise ValueError("can only merge sketches with the same width, depth and seed")
+        # Sums of conservative-update cells still never underestimate and stay
+        # below the plain count-min cells, so the same bound applies
+        self._table = array.array('Q', map(int.__add__, self._table, other._table))
+        self.total += other.total
+        return self
+    
+    def get_size(self) -> int:
+        """Bytes used by the counters."""
+        return len(self._table) * self._table.itemsize
+
+class HyperLogLog:
+    """HyperLogLog distinct counter with 2**p one-byte registers; mergeable."""
+    __slots__ = ['p', 'seed', '_registers']
+    
+    def __init__(self, p: int = 14, seed: int = 0):
+        if not 4 <= p <= 18:
+            raise ValueError("p must be between 4 and 18")
+        self.p = p
+        self.seed = seed
+        self._registers = bytearray(1 << p)
+    
+    def add(self, key):
+        h = _hash64(key, self.seed)
+        index = h >> (64 - self.p)
+        rest = h & ((1 << (64 - self.p)) - 1)
+        # Position of the first 1-bit in the remaining 64 - p bits
+        rank = (64 - self.p) - rest.bit_length() + 1
+        if rank > self._registers[index]:
+            self._registers[index] = rank
+    
+    def count(self) -> int:
+        m = len(self._registers)
+        alpha = 0.7213 / (1 + 1.079 / m)
+        estimate = alpha * m * m / sum(2.0 ** -r for r in self._registers)
+        zeros = self._registers.count(0)
+        if estimate <= 2.5 * m and zeros:
+            estimate = m * math.log(m / zeros)     # linear counting for small sets
+        return round(estimate)
+    
+    def relative_error(self) -> float:
+        """Relative standard error of count()."""
+        return 1.04 / math.sqrt(len(self._registers))
+    
+    def merge(self, other: 'HyperLogLog') -> 'HyperLogLog':
+        if (self.p, self.seed) != (other.p, other.seed):
+            raise ValueError("can only merge HyperLogLogs with the same p and seed")
+        self._registers = bytearray(map(max, self._registers, other._registers))
+        return self
+    
+    def get_size(self) -> int:
+        return len(self._registers)
+
+class SpaceSavingTopK:
+    """Space-saving heavy hitters: k monitored keys with per-key error bounds."""
+    __slots__ = ['k', 'total', '_counts', '_errors', '_heap']
+    
+    def __init__(self, k: int = 100):
+        self.k = k
+        self.total = 0
+        self._counts = {}
+        self._errors = {}
+        self._heap = []         # (count, key), lazily invalidated
+    
+    def _min_entry(self) -> tuple:
+        heap, counts = self._heap, self._counts
+        while True:
+            count, key = heap[0]
+            if counts.get(key) == count:
+                return count, key
+            heapq.heappop(heap)   # stale: the key was incremented or evicted
+    
+    def increment(self, key, count: int = 1):
+        self.total += count
+        counts = self._counts
+        if key in counts:
+            counts[key] += count
+        elif len(counts) < self.k:
+            counts[key] = count
+            self._errors[key] = 0
+        else:
+            # Replace the minimum; the newcomer inherits its count as error
+            min_count, min_key = self._min_entry()
+            heapq.heappop(self._heap)
+            del counts[min_key], self._errors[min_key]
+            counts[key] = min_count + count
+            self._errors[key] = min_count
+        heapq.heappush(self._heap, (counts[key], key))
+        if len(self._heap) > 8 * self.k:
+            self._heap = [(c, k) for k, c in counts.items()]
+            heapq.heapify(self._heap)
+    
+    def get_count(self, key) -> int:
+        """Upper bound on the key's count (0 if not monitored)."""
+        return self._counts.get(key, 0)
+    
+    def top(self, n: int = 10) -> List[tuple]:
+        """[(key, count, error)] by count; true count is in [count - error, count]."""
+        best = heapq.nlargest(n, self._counts.items(), key=lambda item: item[1])
+        return [(key, count, self._errors[key]) for key, count in best]
+    
+    def guaranteed_threshold(self) -> float:
+        """Every key with a true count above this is monitored."""
+        return self.total / self.k
+    
+    def merge(self, other: 'SpaceSavingTopK') -> 'SpaceSavingTopK':
+        """Mergeable summaries: keys missing on one side get its minimum as count and error."""
+        def floor(summary):
+            return min(summary._counts.values()) if len(summary._counts) >= summary.k else 0
+        
+        floor_self, floor_other = floor(self), floor(other)
+        merged = {}
+        for key in self._counts.keys() | other._counts.keys():
+            count = self._counts.get(key, floor_self) + other._counts.get(key, floor_other)
+            error = self._errors.get(key, floor_self) + other._errors.get(key, floor_other)
+            merged[key] = (count, error)
+        kept = heapq.nlargest(self.k, merged.items(), key=lambda item: item[1][0])
+        self._counts = {key: count for key, (count, _) in kept}
+        self._errors = {key: error for key, (_, error) in kept}
+        self._heap = [(count, key) for key, count in self._counts.items()]
+        heapq.heapify(self._heap)
+        self.total += other.total
+        return self
+    
+    def get_size(self) -> int:
+        return get_object_size(self._counts) + get_object_size(self._errors) + \
+            get_object_size(self._heap)
+
+def compare_sketches_with_exact_counters(events: int = 300_000, distinct: int = 50_000):
+    """Memory and accuracy of the sketches against MemoryEfficientCounter."""
+    import random
+    
+    print(f"\n=== Sketches vs Exact Counter ({events:,} events, {distinct:,} keys) ===")
+    rng = random.Random(42)
+    # Zipf-like traffic: a few hot URLs and a long tail
+    weights = [1 / (rank + 1) for rank in range(distinct)]
+    stream = [f"/page/{i}" for i in rng.choices(range(distinct), weights, k=events)]
+    
+    profiler = MemoryProfiler()
+    profiler.start_profiling()
+    exact = MemoryEfficientCounter()
+    for key in stream:
+        exact.increment(key)
+    exact_stats = profiler.stop_profiling()
+    
+    cms = CountMinSketch.from_error(epsilon=0.001, delta=0.01)
+    hll = HyperLogLog(p=14)
+    topk = SpaceSavingTopK(k=500)
+    start = time.perf_counter()
+    for key in stream:
+        cms.increment(key)
+        hll.add(key)
+        topk.increment(key)
+    sketch_time = time.perf_counter() - start
+    
+    true_counts = exact._counts
+    errors = [cms.get_count(key) - count for key, count in true_counts.items()]
+    assert min(errors) >= 0
+    exact_top = sorted(true_counts, key=true_counts.get, reverse=True)[:20]
+    found_top = {key for key, _, _ in topk.top(20)}
+    
+    print(f"Exact counter:   {format_bytes(exact_stats['memory_used'])}")
+    print(f"Count-min:       {format_bytes(cms.get_size())}, "
+          f"max overestimate {max(errors)} (bound {cms.error_bound():.0f}), "
+          f"mean {sum(errors) / len(errors):.2f}")
+    print(f"HyperLogLog:     {format_bytes(hll.get_size())}, "
+          f"{hll.count():,} distinct vs {exact.get_size():,} "
+          f"({abs(hll.count() - exact.get_size()) / exact.get_size():.2%} error, "
+          f"std error {hll.relative_error():.2%})")
+    print(f"Space-saving:    {format_bytes(topk.get_size())}, "
+          f"top-20 recall {len(found_top & set(exact_top)) / 20:.0%}")
+    print(f"Sketch updates:  {sketch_time / events * 1e6:.1f} us per event (all three)")
+    
+    # Sharded counting: two halves merged give the same HyperLogLog as one pass
+    half = events // 2
+    shard_a, shard_b = HyperLogLog(p=14), HyperLogLog(p=14)
+    cms_a = CountMinSketch.from_error(0.001, 0.01)
+    cms_b = CountMinSketch.from_error(0.001, 0.01)
+    for key in stream[:half]:
+        shard_a.add(key)
+        cms_a.increment(key)
+    for key in stream[half:]:
+        shard_b.add(key)
+        cms_b.increment(key)
+    shard_a.merge(shard_b)
+    cms_a.merge(cms_b)
+    hot = exact_top[0]
+    print(f"Merged shards:   HLL {shard_a.count():,} (single pass {hll.count():,}), "
+          f"count of {hot!r}: {cms_a.get_count(hot)} (true {true_counts[hot]})")
+
+def demonstrate_sketches():
+    """Show the three sketches on a tiny stream, then benchmark them."""
+    print("\n=== Counting Sketches ===")
+    words = "the quick brown fox jumps over the lazy dog the end".split()
+    
+    cms = CountMinSketch(width=64, depth=4)
+    hll = HyperLogLog(p=10)
+    topk = SpaceSavingTopK(k=3)
+    for word in words:
+        cms.increment(word)
+        hll.add(word)
+        topk.increment(word)
+    print(f"Count-min 'the': {cms.get_count('the')} (true {words.count('the')})")
+    print(f"HyperLogLog distinct: {hll.count()} (true {len(set(words))})")
+    print(f"Top-3 (key, count, error): {topk.top(3)}")
+    
+    compare_sketches_with_exact_counters()
+
+
 def run_all_demonstrations():
     """Run all memory optimization demonstrations."""
     print("PYTHON MEMORY OPTIMIZATION BEST PRACTICES")
@@ -1434,6 +3575,7 @@ def run_all_demonstrations():
         demonstrate_circular_reference_problem()
         demonstrate_weak_reference_solution()
         demonstrate_weak_cache()
+        benchmark_weak_cache()
         
         # Step 5: Memory-efficient data structures
         compare_data_structure_memory()
@@ -1444,15 +3586,28 @@ def run_all_demonstrations():
         
         # Step 6: Object pooling
         compare_with_without_pooling()
+        demonstrate_object_pool()
+        demonstrate_connection_pool()
         
         # Step 7: Garbage collection optimization
         demonstrate_gc_optimization()
         demonstrate_gc_generations()
         demonstrate_gc_friendly_patterns()
+        demonstrate_gc_controller()
+        benchmark_gc_controller()
         
         # Step 8: Comprehensive demonstration
         comprehensive_memory_optimization_demo()
         
+        # Step 9: Leak hunting
+        demonstrate_leak_hunting()
+        
+        # Step 10: Columnar record store
+        demonstrate_columnar_records()
+        
+        # Step 11: Counting sketches
+        demonstrate_sketches()
+        
     except Exception as e:
         print(f"Error during demonstration: {e}")
         import traceback
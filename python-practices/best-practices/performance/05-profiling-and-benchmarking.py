@@ -935,10 +935,1175 @@ def step6_example():
     print("4. Leverage set operations for intersection/union tasks")
     print("5. Always profile before and after optimization!")
 
+# Step 7: Fit empirical complexity with least-squares regression
+# ===============================================================================
+
+# Explanation:
+# The growth-ratio heuristic in Step 5 averages noisy time ratios and maps them
+# onto fixed buckets, so a linear function measured at doubling sizes can land in
+# "O(n log n)" after one slow run. A sturdier approach is to fit the timings
+# against every candidate model t(n) = a * g(n) + b with least squares and keep
+# the model with the smallest relative error. We also:
+# - estimate the exponent directly from the slope of log(t) against log(n)
+# - auto-range tiny functions so every sample lasts long enough to time reliably
+# - take the median of repeated samples so one noisy run cannot swing the fit
+# - bootstrap the repeats to report how often the winning model wins (confidence)
+# The same fitter is exposed as a command-line check so CI can fail a build when
+# a function's measured complexity grows beyond an agreed bound.
+
+# All imports from previous steps plus argparse, importlib and random
+import argparse
+import importlib
+import importlib.util
+import math
+import os
+import random
+import sys
+
+# New in Step 7: candidate models, ordered from cheapest to most expensive
+COMPLEXITY_MODELS: List[Tuple[str, Callable[[float], float]]] = [
+    ("O(1)", lambda n: 1.0),
+    ("O(log n)", lambda n: math.log2(n)),
+    ("O(n)", lambda n: float(n)),
+    ("O(n log n)", lambda n: n * math.log2(n)),
+    ("O(n²)", lambda n: float(n) ** 2),
+    ("O(2ⁿ)", lambda n: 2.0 ** n),
+]
+
+COMPLEXITY_ALIASES = {
+    "1": "O(1)", "logn": "O(log n)", "n": "O(n)", "nlogn": "O(n log n)",
+    "n^2": "O(n²)", "n2": "O(n²)", "2^n": "O(2ⁿ)", "2n": "O(2ⁿ)",
+}
+
+# Sizes above this overflow 2**n as a float, so the exponential model is skipped
+MAX_EXPONENTIAL_SIZE = 1000
+
+
+def normalize_complexity(name: str) -> str:
+    """Map spellings such as 'nlogn' or 'O(n^2)' onto a model name."""
+    key = name.strip().replace(" ", "").replace("*", "")
+    if key.startswith("O(") and key.endswith(")"):
+        key = key[2:-1]
+    key = key.replace("²", "^2").replace("ⁿ", "^n")
+    if key in COMPLEXITY_ALIASES:
+        return COMPLEXITY_ALIASES[key]
+    raise ValueError(f"Unknown complexity '{name}'; expected one of "
+                     f"{', '.join(model for model, _ in COMPLEXITY_MODELS)}")
+
+
+def complexity_rank(name: str) -> int:
+    """Position of a model in COMPLEXITY_MODELS (higher is more expensive)."""
+    name = normalize_complexity(name)
+    for rank, (model, _) in enumerate(COMPLEXITY_MODELS):
+        if model == name:
+            return rank
+    raise ValueError(f"Unknown complexity '{name}'")
+
+
+def _fit_model(sizes: List[int], times: List[float],
+               g: Callable[[float], float]) -> Tuple[float, float, float]:
+    """Fit t = a*g(n) + b (a, b >= 0) minimizing relative error; return (a, b, rmse)."""
+    # Weighting every residual by 1/t turns absolute error into relative error,
+    # so the large sizes do not drown out the small ones.
+    xs = [g(n) / t for n, t in zip(sizes, times)]
+    ws = [1.0 / t for t in times]
+    k = len(times)
+
+    def rmse(a: float, b: float) -> float:
+        return math.sqrt(sum((a * x + b * w - 1.0) ** 2 for x, w in zip(xs, ws)) / k)
+
+    sxx = sum(x * x for x in xs)
+    sww = sum(w * w for w in ws)
+    sxw = sum(x * w for x, w in zip(xs, ws))
+    sx = sum(xs)
+    sw = sum(ws)
+
+    candidates = []
+    det = sxx * sww - sxw * sxw
+    if abs(det) > 1e-12 * sxx * sww:
+        a = (sx * sww - sw * sxw) / det
+        b = (sw * sxx - sx * sxw) / det
+        if a >= 0 and b >= 0:
+            candidates.append((a, b))
+    # Boundary solutions: pure scaling (b = 0) or pure constant (a = 0)
+    if sxx > 0:
+        candidates.append((sx / sxx, 0.0))
+    candidates.append((0.0, sw / sww))
+
+    a, b = min(candidates, key=lambda ab: rmse(*ab))
+    return a, b, rmse(a, b)
+
+
+def _loglog_slope(sizes: List[int], times: List[float]) -> float:
+    """Slope of log(t) against log(n): the empirical polynomial exponent."""
+    lx = [math.log(n) for n in sizes]
+    ly = [math.log(t) for t in times]
+    mx = statistics.mean(lx)
+    my = statistics.mean(ly)
+    sxx = sum((x - mx) ** 2 for x in lx)
+    if sxx == 0:
+        return 0.0
+    return sum((x - mx) * (y - my) for x, y in zip(lx, ly)) / sxx
+
+
+class ComplexityFit:
+    """Result of fitting timings against the candidate complexity models."""
+
+    def __init__(self, function_name: str, sizes: List[int], samples: List[List[float]],
+                 models: Dict[str, Dict[str, float]], best: str,
+                 exponent: float, confidence: float):
+        self.function_name = function_name
+        self.sizes = sizes
+        self.samples = samples
+        self.times = [statistics.median(s) for s in samples]
+        self.models = models
+        self.best = best
+        self.exponent = exponent
+        self.confidence = confidence
+
+    @property
+    def r_squared(self) -> float:
+        """Coefficient of determination of the best model on the raw timings."""
+        fit = self.models[self.best]
+        g = dict(COMPLEXITY_MODELS)[self.best]
+        mean_t = statistics.mean(self.times)
+        ss_tot = sum((t - mean_t) ** 2 for t in self.times)
+        ss_res = sum((fit['a'] * g(n) + fit['b'] - t) ** 2
+                     for n, t in zip(self.sizes, self.times))
+        return 1.0 - ss_res / ss_tot if ss_tot > 0 else 1.0
+
+    def exceeds(self, max_complexity: str) -> bool:
+        """True when the fitted model is more expensive than max_complexity."""
+        return complexity_rank(self.best) > complexity_rank(max_complexity)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'function_name': self.function_name,
+            'best': self.best,
+            'confidence': self.confidence,
+            'exponent': self.exponent,
+            'r_squared': self.r_squared,
+            'sizes': self.sizes,
+            'median_times': self.times,
+            'models': self.models,
+        }
+
+    def __str__(self):
+        lines = [
+            f"Complexity fit for {self.function_name}:",
+            f"  Best model: {self.best} "
+            f"(confidence {self.confidence:.0%}, R² {self.r_squared:.4f})",
+            f"  Log-log exponent: {self.exponent:.2f}",
+            "  Model               rel. RMSE",
+        ]
+        for name, fit in sorted(self.models.items(), key=lambda kv: kv[1]['rmse']):
+            marker = " <" if name == self.best else ""
+            lines.append(f"    {name:<16} {fit['rmse']:>9.4f}{marker}")
+        return "\n".join(lines)
+
+
+class ComplexityFitter:
+    """Measure a function at several input sizes and fit its growth model."""
+
+    def __init__(self, repeats: int = 5, min_sample_time: float = 0.005,
+                 bootstrap_rounds: int = 200, parsimony: float = 0.10,
+                 seed: Optional[int] = None):
+        """
+        Args:
+            repeats: Samples per input size; the fit uses their median.
+            min_sample_time: Calls are looped until a sample lasts this long.
+            bootstrap_rounds: Resamples used to estimate the confidence.
+            parsimony: A more expensive model must cut the error by this
+                fraction before it replaces a cheaper one.
+            seed: Seed for the bootstrap, for reproducible reports.
+        """
+        if repeats < 1:
+            raise ValueError("repeats must be at least 1")
+        self.repeats = repeats
+        self.min_sample_time = min_sample_time
+        self.bootstrap_rounds = bootstrap_rounds
+        self.parsimony = parsimony
+        self.rng = random.Random(seed)
+
+    def _calibrate(self, func: Callable, args: tuple) -> int:
+        """Find a loop count that makes one sample last min_sample_time."""
+        number = 1
+        while True:
+            start = time.perf_counter()
+            for _ in range(number):
+                func(*args)
+            elapsed = time.perf_counter() - start
+            if elapsed >= self.min_sample_time or number >= 1 << 20:
+                return number
+            number *= 2 if elapsed == 0 else max(2, int(self.min_sample_time / elapsed * 1.2))
+
+    def measure(self, func: Callable, sizes: List[int],
+                setup: Optional[Callable[[int], tuple]] = None,
+                repeats: Optional[int] = None) -> List[List[float]]:
+        """Return `repeats` (default: self.repeats) per-call timings for every size.
+
+        `setup(n)` builds the arguments outside the timed region; by default
+        the function is called as func(n) like analyze_scaling() does.
+        """
+        repeats = self.repeats if repeats is None else repeats
+        samples = []
+        for n in sizes:
+            args = tuple(setup(n)) if setup else (n,)
+            number = self._calibrate(func, args)
+            per_size = []
+            for _ in range(repeats):
+                start = time.perf_counter()
+                for _ in range(number):
+                    func(*args)
+                per_size.append((time.perf_counter() - start) / number)
+            samples.append(per_size)
+        return samples
+
+    def _select(self, sizes: List[int], times: List[float],
+                noise: float = 0.0) -> Tuple[str, Dict[str, Dict[str, float]]]:
+        """Fit every applicable model and pick the cheapest adequate one.
+
+        A more expensive model only wins if it beats the current choice by the
+        parsimony fraction *and* by more than the measurement noise.
+        """
+        models = {}
+        for name, g in COMPLEXITY_MODELS:
+            if name == "O(2ⁿ)" and max(sizes) > MAX_EXPONENTIAL_SIZE:
+                continue
+            a, b, err = _fit_model(sizes, times, g)
+            models[name] = {'a': a, 'b': b, 'rmse': err}
+
+        best = None
+        for name, _ in COMPLEXITY_MODELS:
+            if name not in models:
+                continue
+            if best is None:
+                best = name
+                continue
+            current, candidate = models[best]['rmse'], models[name]['rmse']
+            if candidate < current * (1 - self.parsimony) and current - candidate > noise:
+                best = name
+        return best, models
+
+    def fit(self, sizes: List[int], samples: List[Any], function_name: str = "") -> ComplexityFit:
+        """Fit timings; each entry of samples is a time or a list of repeats."""
+        if len(sizes) != len(samples):
+            raise ValueError("sizes and samples must have the same length")
+        if len(set(sizes)) < 3:
+            raise ValueError("At least three distinct input sizes are required")
+        if min(sizes) < 1:
+            raise ValueError("Input sizes must be positive")
+
+        samples = [list(s) if isinstance(s, (list, tuple)) else [s] for s in samples]
+        tiny = 1e-12
+        times = [max(statistics.median(s), tiny) for s in samples]
+        # Relative median absolute deviation of the repeats: the noise floor
+        noise = statistics.median(
+            statistics.median(abs(x - t) for x in s) / t for s, t in zip(samples, times))
+        best, models = self._select(sizes, times, noise)
+
+        # Bootstrap over the repeats: how often does the same model win?
+        wins = 0
+        rounds = self.bootstrap_rounds if any(len(s) > 1 for s in samples) else 0
+        for _ in range(rounds):
+            resampled = [max(statistics.median(self.rng.choices(s, k=len(s))), tiny)
+                         for s in samples]
+            if self._select(sizes, resampled, noise)[0] == best:
+                wins += 1
+        confidence = wins / rounds if rounds else 1.0
+
+        return ComplexityFit(function_name, list(sizes), samples, models, best,
+                             _loglog_slope(sizes, times), confidence)
+
+    def analyze(self, func: Callable, sizes: List[int],
+                setup: Optional[Callable[[int], tuple]] = None) -> ComplexityFit:
+        """Measure func at the given sizes and fit its complexity."""
+        samples = self.measure(func, sizes, setup)
+        return self.fit(sizes, samples, getattr(func, '__name__', repr(func)))
+
+
+class FittedPerformanceComparator(PerformanceComparator):
+    """PerformanceComparator whose complexity estimate comes from ComplexityFitter.
+
+    One mean per size is easily thrown off by a single slow run, so
+    analyze_scaling() collects calibrated repeats and the fit uses their
+    medians. A fit with R² below `min_r_squared` explains the timings no
+    better than a flat line and is reported as inconclusive instead.
+    """
+
+    def __init__(self, fitter: Optional[ComplexityFitter] = None,
+                 min_r_squared: float = 0.9):
+        super().__init__()
+        self.fitter = fitter or ComplexityFitter()
+        self.min_r_squared = min_r_squared
+
+    def analyze_scaling(self, func: Callable, input_sizes: List[int],
+                        runs_per_size: int = 5) -> Dict[str, Any]:
+        """Time each size with repeated calibrated samples, then fit their medians."""
+        print(f"\nAnalyzing scaling for {func.__name__}...")
+
+        samples = self.fitter.measure(func, input_sizes,
+                                      repeats=max(runs_per_size, self.fitter.repeats))
+        scaling_results = []
+        for size, per_size in zip(input_sizes, samples):
+            median = statistics.median(per_size)
+            scaling_results.append({
+                'input_size': size,
+                'mean_time': statistics.mean(per_size),
+                'median_time': median,
+                'std_dev': statistics.stdev(per_size) if len(per_size) > 1 else 0.0,
+                'operations_per_second': size / median if median > 0 else 0,
+                'samples': per_size,
+            })
+
+        return {
+            'function_name': func.__name__,
+            'scaling_results': scaling_results,
+            'complexity_analysis': self._analyze_complexity(scaling_results),
+        }
+
+    def _analyze_complexity(self, results: List[Dict]) -> Dict[str, Any]:
+        """Least-squares replacement for the growth-ratio buckets."""
+        analysis = super()._analyze_complexity(results)
+        if 'estimated_complexity' not in analysis:
+            return analysis
+
+        # Repeated samples when analyze_scaling() collected them, else the means
+        fit = self.fitter.fit([r['input_size'] for r in results],
+                              [r.get('samples', r['mean_time']) for r in results])
+        if fit.r_squared >= self.min_r_squared:
+            estimate = f"{fit.best} (R² {fit.r_squared:.3f})"
+        else:
+            estimate = (f"inconclusive (best {fit.best}, R² {fit.r_squared:.3f} "
+                        f"< {self.min_r_squared}; timings too noisy)")
+        analysis.update({
+            'estimated_complexity': estimate,
+            'fit_accepted': fit.r_squared >= self.min_r_squared,
+            'loglog_exponent': fit.exponent,
+            'model_errors': {name: m['rmse'] for name, m in fit.models.items()},
+            'fit': fit,
+        })
+        return analysis
+
+
+def _load_callable(spec: str) -> Callable:
+    """Resolve 'package.module:function' or 'path/to/file.py:function'.
+
+    Module names are looked up from the current directory too: when this
+    script is run by path, sys.path starts with the script's directory,
+    not the directory the command was run from.
+    """
+    module_name, sep, attr = spec.partition(":")
+    if not sep or not attr:
+        raise ValueError(f"Expected 'module:function', got '{spec}'")
+    if os.getcwd() not in sys.path:
+        sys.path.insert(0, os.getcwd())
+    if module_name.endswith(".py"):
+        path = os.path.abspath(module_name)
+        name = os.path.splitext(os.path.basename(path))[0].replace("-", "_")
+        module_spec = importlib.util.spec_from_file_location(name, path)
+        module = importlib.util.module_from_spec(module_spec)
+        sys.path.insert(0, os.path.dirname(path))
+        module_spec.loader.exec_module(module)
+    else:
+        module = importlib.import_module(module_name)
+    target = module
+    for part in attr.split("."):
+        target = getattr(target, part)
+    return target
+
+
+def complexity_cli(argv: Optional[List[str]] = None) -> int:
+    """Command-line entry point; returns a process exit code for CI."""
+    parser = argparse.ArgumentParser(
+        prog="05-profiling-and-benchmarking.py complexity",
+        description="Fit the empirical time complexity of a function f(n).",
+        epilog="Exit codes: 0 pass, 1 worse than --max, 2 below --min-confidence, "
+               "3 invocation error (bad arguments, target not loadable or raised).")
+    parser.add_argument("target", help="module:function or file.py:function")
+    parser.add_argument("--sizes", type=int, nargs="+",
+                        default=[1_000, 2_000, 4_000, 8_000, 16_000, 32_000],
+                        help="input sizes passed to the function")
+    parser.add_argument("--setup", help="module:function returning the args for size n")
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--min-sample-time", type=float, default=0.005)
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--max", dest="max_complexity",
+                        help="fail (exit 1) if the fitted model is worse, e.g. 'n log n'")
+    parser.add_argument("--min-confidence", type=float, default=0.0,
+                        help="fail (exit 2) if the fit confidence is below this")
+    parser.add_argument("--json", action="store_true", help="print the fit as JSON")
+    try:
+        args = parser.parse_args(argv)
+    except SystemExit as e:
+        # argparse exits with 2, which here already means "low confidence"
+        return 3 if e.code else 0
+
+    # A broken invocation must not look like a complexity regression to CI
+    try:
+        if args.max_complexity:
+            normalize_complexity(args.max_complexity)
+        func = _load_callable(args.target)
+        setup = _load_callable(args.setup) if args.setup else None
+        fitter = ComplexityFitter(repeats=args.repeats, min_sample_time=args.min_sample_time,
+                                  seed=args.seed)
+        fit = fitter.analyze(func, args.sizes, setup)
+    except Exception as e:
+        print(f"ERROR: {type(e).__name__}: {e}", file=sys.stderr)
+        return 3
+
+    print(json.dumps(fit.to_dict(), indent=2) if args.json else fit)
+
+    if args.max_complexity and fit.exceeds(args.max_complexity):
+        print(f"FAIL: {fit.best} exceeds allowed {normalize_complexity(args.max_complexity)}",
+              file=sys.stderr)
+        return 1
+    if fit.confidence < args.min_confidence:
+        print(f"FAIL: confidence {fit.confidence:.0%} below {args.min_confidence:.0%}",
+              file=sys.stderr)
+        return 2
+    return 0
+
+# Example usage of Step 7:
+def step7_example():
+    """Demonstrate least-squares complexity fitting."""
+    print("\n=== Step 7: Empirical Complexity Fitting ===")
+
+    def constant_lookup(data):
+        return data[len(data) // 2]
+
+    def linear_sum(data):
+        return sum(data)
+
+    def sort_copy(data):
+        return sorted(data)
+
+    def pairwise_count(data):
+        count = 0
+        for x in data:
+            for y in data:
+                if x < y:
+                    count += 1
+        return count
+
+    def random_list(n):
+        return ([random.random() for _ in range(n)],)
+
+    fitter = ComplexityFitter(repeats=5, seed=42)
+    for func, sizes in [
+        (constant_lookup, [1_000, 4_000, 16_000, 64_000]),
+        (linear_sum, [2_000, 8_000, 32_000, 128_000]),
+        (sort_copy, [2_000, 8_000, 32_000, 128_000]),
+        (pairwise_count, [50, 100, 200, 400]),
+    ]:
+        fit = fitter.analyze(func, sizes, setup=random_list)
+        print(f"  {func.__name__:<16} -> {fit.best:<11} "
+              f"exponent {fit.exponent:5.2f}  confidence {fit.confidence:4.0%}  "
+              f"R² {fit.r_squared:.3f}")
+
+    # Plug the fitter into the Step 5 report
+    comparator = FittedPerformanceComparator(ComplexityFitter(seed=42))
+    scaling = comparator.analyze_scaling(
+        lambda n: sum(range(n)), [5_000, 10_000, 20_000, 40_000], runs_per_size=3)
+    print(comparator.generate_performance_report({'scaling_analysis': scaling}))
+
+    print("CI usage:")
+    print("  python 05-profiling-and-benchmarking.py complexity mymodule:func "
+          "--sizes 1000 2000 4000 8000 --max 'n log n'")
+    print("  exit 1: worse than --max, 2: below --min-confidence, 3: invocation error")
+
+
+# Step 8: Persist benchmark history and detect regressions statistically
+# ===============================================================================
+
+# Explanation:
+# set_baseline()/compare_to_baseline() in Step 5 keep the baseline in memory and
+# flag a regression when the mean moves by 5%. That forgets everything between
+# runs and reacts to a single noisy outlier. For CI we want:
+# - a history store that survives the process (SQLite, one row per run)
+# - machine and interpreter metadata, so runs are only compared like for like
+# - a significance test on the raw samples: the Mann-Whitney U test makes no
+#   normality assumption and is robust to the outliers timing data is full of
+# - a bootstrap confidence interval on the median ratio to size the effect
+# - a pass/fail report and exit code a pipeline can act on
+
+# All imports from previous steps plus sqlite3 and platform
+import platform
+import sqlite3
+
+# New in Step 8: environment fingerprint stored with every run
+def machine_metadata() -> Dict[str, Any]:
+    """Describe the machine and interpreter that produced a measurement."""
+    return {
+        'hostname': platform.node(),
+        'system': platform.system(),
+        'release': platform.release(),
+        'machine': platform.machine(),
+        'processor': platform.processor(),
+        'cpu_count': os.cpu_count(),
+        'python_version': platform.python_version(),
+        'python_implementation': platform.python_implementation(),
+    }
+
+
+def machine_key(metadata: Dict[str, Any]) -> str:
+    """Fields that must match for two runs to be comparable."""
+    return "|".join(str(metadata.get(field)) for field in
+                    ('hostname', 'machine', 'cpu_count', 'python_implementation', 'python_version'))
+
+
+def mann_whitney_u(baseline: List[float], current: List[float]) -> Tuple[float, float]:
+    """One-sided Mann-Whitney U test that `current` tends to be slower.
+
+    Returns (U, p_value) using the normal approximation with tie and
+    continuity corrections.
+    """
+    n1, n2 = len(baseline), len(current)
+    if n1 == 0 or n2 == 0:
+        raise ValueError("Both samples need at least one measurement")
+
+    pooled = sorted([(t, 0) for t in baseline] + [(t, 1) for t in current])
+    ranks = [0.0] * len(pooled)
+    tie_term = 0.0
+    i = 0
+    while i < len(pooled):
+        j = i
+        while j + 1 < len(pooled) and pooled[j + 1][0] == pooled[i][0]:
+            j += 1
+        average_rank = (i + j) / 2 + 1
+        for k in range(i, j + 1):
+            ranks[k] = average_rank
+        ties = j - i + 1
+        tie_term += ties ** 3 - ties
+        i = j + 1
+
+    rank_sum = sum(rank for rank, (_, group) in zip(ranks, pooled) if group == 1)
+    u = rank_sum - n2 * (n2 + 1) / 2
+    n = n1 + n2
+    mean_u = n1 * n2 / 2
+    var_u = n1 * n2 / 12 * ((n + 1) - tie_term / (n * (n - 1))) if n > 1 else 0.0
+    if var_u <= 0:
+        return u, 0.5
+    z = (u - mean_u - 0.5) / math.sqrt(var_u)
+    return u, 0.5 * math.erfc(z / math.sqrt(2))
+
+
+def bootstrap_ratio_ci(baseline: List[float], current: List[float],
+                       rounds: int = 2000, confidence: float = 0.95,
+                       rng: Optional[random.Random] = None) -> Tuple[float, float]:
+    """Bootstrap confidence interval for median(current) / median(baseline)."""
+    rng = rng or random.Random()
+    ratios = sorted(
+        statistics.median(rng.choices(current, k=len(current))) /
+        statistics.median(rng.choices(baseline, k=len(baseline)))
+        for _ in range(rounds)
+    )
+    tail = (1 - confidence) / 2
+    low = ratios[int(tail * (rounds - 1))]
+    high = ratios[int(math.ceil((1 - tail) * (rounds - 1)))]
+    return low, high
+
+
+class RegressionCheck:
+    """Outcome of comparing a benchmark run against its history."""
+
+    def __init__(self, name: str, baseline: List[float], current: List[float],
+                 alpha: float = 0.05, min_effect: float = 0.05,
+                 rng: Optional[random.Random] = None):
+        self.name = name
+        self.baseline_runs = len(baseline)
+        self.current_runs = len(current)
+        self.baseline_median = statistics.median(baseline)
+        self.current_median = statistics.median(current)
+        self.ratio = self.current_median / self.baseline_median
+        self.ratio_ci = bootstrap_ratio_ci(baseline, current, rng=rng)
+        _, self.p_slower = mann_whitney_u(baseline, current)
+        _, self.p_faster = mann_whitney_u(current, baseline)
+        self.alpha = alpha
+        self.min_effect = min_effect
+
+        # Significant *and* large enough to matter *and* the whole CI agrees
+        self.is_regression = (self.p_slower < alpha and self.ratio > 1 + min_effect
+                              and self.ratio_ci[0] > 1.0)
+        self.is_improvement = (self.p_faster < alpha and self.ratio < 1 - min_effect
+                               and self.ratio_ci[1] < 1.0)
+
+    @property
+    def status(self) -> str:
+        if self.is_regression:
+            return "FAIL"
+        if self.is_improvement:
+            return "IMPROVED"
+        return "PASS"
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'name': self.name,
+            'status': self.status,
+            'baseline_median': self.baseline_median,
+            'current_median': self.current_median,
+            'ratio': self.ratio,
+            'ratio_ci': list(self.ratio_ci),
+            'p_slower': self.p_slower,
+            'p_faster': self.p_faster,
+        }
+
+    def __str__(self):
+        return (f"{self.status:<8} {self.name}: {self.current_median:.6f}s vs "
+                f"{self.baseline_median:.6f}s ({self.ratio:.3f}x, "
+                f"95% CI [{self.ratio_ci[0]:.3f}, {self.ratio_ci[1]:.3f}], "
+                f"p={min(self.p_slower, self.p_faster):.4f})")
+
+
+class BenchmarkHistory:
+    """SQLite-backed store of benchmark runs and their raw timings."""
+
+    def __init__(self, path: str = "benchmark_history.sqlite3"):
+        self.path = path
+        self.conn = sqlite3.connect(path)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS benchmark_runs (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                name TEXT NOT NULL,
+                recorded_at REAL NOT NULL,
+                machine_key TEXT NOT NULL,
+                metadata TEXT NOT NULL,
+                times TEXT NOT NULL,
+                median REAL NOT NULL,
+                mean REAL NOT NULL
+            )
+        """)
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_runs_name "
+                          "ON benchmark_runs (name, machine_key, id)")
+        self.conn.commit()
+        self.metadata = machine_metadata()
+
+    def record(self, name: str, result: BenchmarkResult,
+               extra: Optional[Dict[str, Any]] = None) -> int:
+        """Store a run; `extra` (e.g. a git commit) is kept with the metadata."""
+        metadata = dict(self.metadata, **(extra or {}))
+        cursor = self.conn.execute(
+            "INSERT INTO benchmark_runs (name, recorded_at, machine_key, metadata, times, median, mean) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (name, time.time(), machine_key(metadata), json.dumps(metadata),
+             json.dumps(result.times), result.median, result.mean))
+        self.conn.commit()
+        return cursor.lastrowid
+
+    def runs(self, name: str, limit: Optional[int] = None, before_id: Optional[int] = None,
+             same_machine: bool = True) -> List[Dict[str, Any]]:
+        """Most recent runs for a benchmark, newest first."""
+        query = "SELECT id, recorded_at, metadata, times FROM benchmark_runs WHERE name = ?"
+        params: List[Any] = [name]
+        if same_machine:
+            query += " AND machine_key = ?"
+            params.append(machine_key(self.metadata))
+        if before_id is not None:
+            query += " AND id < ?"
+            params.append(before_id)
+        query += " ORDER BY id DESC"
+        if limit is not None:
+            query += " LIMIT ?"
+            params.append(limit)
+        return [
+            {'id': run_id, 'recorded_at': recorded_at,
+             'metadata': json.loads(metadata), 'times': json.loads(times)}
+            for run_id, recorded_at, metadata, times in self.conn.execute(query, params)
+        ]
+
+    def names(self) -> List[str]:
+        return [row[0] for row in self.conn.execute(
+            "SELECT DISTINCT name FROM benchmark_runs ORDER BY name")]
+
+    def baseline_times(self, name: str, window: int = 5,
+                       before_id: Optional[int] = None) -> List[float]:
+        """Pool the raw timings of the last `window` runs into one baseline sample."""
+        pooled = []
+        for run in self.runs(name, limit=window, before_id=before_id):
+            pooled.extend(run['times'])
+        return pooled
+
+    def check(self, name: str, current: BenchmarkResult, window: int = 5,
+              alpha: float = 0.05, min_effect: float = 0.05,
+              before_id: Optional[int] = None) -> Optional[RegressionCheck]:
+        """Compare a result against history; None when there is no history yet."""
+        baseline = self.baseline_times(name, window, before_id)
+        if not baseline:
+            return None
+        return RegressionCheck(name, baseline, current.times, alpha, min_effect)
+
+    def check_latest(self, window: int = 5, alpha: float = 0.05,
+                     min_effect: float = 0.05) -> List[RegressionCheck]:
+        """Check the newest run of every benchmark against the runs before it."""
+        checks = []
+        for name in self.names():
+            latest = self.runs(name, limit=1)
+            if not latest:
+                continue
+            result = BenchmarkResult(latest[0]['times'], name)
+            check = self.check(name, result, window, alpha, min_effect,
+                               before_id=latest[0]['id'])
+            if check:
+                checks.append(check)
+        return checks
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+
+def regression_report(checks: List[RegressionCheck]) -> str:
+    """Render checks as a pass/fail report."""
+    failures = sum(check.is_regression for check in checks)
+    lines = ["BENCHMARK REGRESSION REPORT", "=" * 60]
+    lines.extend(str(check) for check in checks)
+    lines.append("=" * 60)
+    lines.append(f"{len(checks)} benchmarks, {failures} regressions: "
+                 f"{'FAIL' if failures else 'PASS'}")
+    return "\n".join(lines)
+
+
+class PersistentPerformanceComparator(FittedPerformanceComparator):
+    """PerformanceComparator whose baselines live in a BenchmarkHistory."""
+
+    def __init__(self, history: BenchmarkHistory, window: int = 5,
+                 alpha: float = 0.05, min_effect: float = 0.05):
+        super().__init__()
+        self.history = history
+        self.window = window
+        self.alpha = alpha
+        self.min_effect = min_effect
+
+    def set_baseline(self, name: str, result: BenchmarkResult):
+        """Record the result in the history store."""
+        self.baseline_results[name] = result
+        self.history.record(name, result)
+        print(f"Baseline recorded for '{name}': median {result.median:.6f}s")
+
+    def compare_to_baseline(self, name: str, current_result: BenchmarkResult) -> Dict[str, float]:
+        """Compare with a statistical test against the stored history."""
+        check = self.history.check(name, current_result, self.window,
+                                   self.alpha, self.min_effect)
+        if check is None:
+            raise ValueError(f"No baseline set for '{name}'")
+        comparison = {
+            'baseline_mean': check.baseline_median,
+            'current_mean': check.current_median,
+            'performance_ratio': check.ratio,
+            'improvement_percent': (1 - check.ratio) * 100,
+            'is_regression': check.is_regression,
+            'is_improvement': check.is_improvement,
+            'ratio_ci': check.ratio_ci,
+            'p_value': min(check.p_slower, check.p_faster),
+        }
+        self.comparison_history.append(check)
+        return comparison
+
+
+def history_cli(argv: Optional[List[str]] = None) -> int:
+    """Report on a benchmark history database; exit 1 on any regression."""
+    parser = argparse.ArgumentParser(
+        prog="05-profiling-and-benchmarking.py history",
+        description="Check the latest benchmark runs against their history.")
+    parser.add_argument("--db", default="benchmark_history.sqlite3")
+    parser.add_argument("--window", type=int, default=5,
+                        help="number of previous runs pooled into the baseline")
+    parser.add_argument("--alpha", type=float, default=0.05)
+    parser.add_argument("--min-effect", type=float, default=0.05,
+                        help="smallest slowdown treated as a regression (0.05 = 5%%)")
+    parser.add_argument("--json", action="store_true")
+    args = parser.parse_args(argv)
+
+    if not os.path.exists(args.db):
+        print(f"No history database at {args.db}", file=sys.stderr)
+        return 2
+    with BenchmarkHistory(args.db) as history:
+        checks = history.check_latest(args.window, args.alpha, args.min_effect)
+    if args.json:
+        print(json.dumps([check.to_dict() for check in checks], indent=2))
+    else:
+        print(regression_report(checks))
+    return 1 if any(check.is_regression for check in checks) else 0
+
+# Example usage of Step 8:
+def step8_example():
+    """Demonstrate persistent benchmark history and regression detection."""
+    print("\n=== Step 8: Benchmark History and Regression Detection ===")
+    import tempfile
+
+    def build_list(n):
+        return [i * 2 for i in range(n)]
+
+    def build_list_slowly(n):
+        result = []
+        for i in range(n):
+            result.append(i * 2)
+        return result
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        db_path = os.path.join(tmpdir, "history.sqlite3")
+        benchmark = StatisticalBenchmark(warmup_runs=2, benchmark_runs=15)
+
+        with BenchmarkHistory(db_path) as history:
+            # Three "nightly" runs of the same code build up the baseline
+            for _ in range(3):
+                history.record("build_list", benchmark.benchmark_function(build_list, 20000))
+
+            same = benchmark.benchmark_function(build_list, 20000)
+            slower = benchmark.benchmark_function(build_list_slowly, 20000)
+            checks = [
+                history.check("build_list", same),
+                history.check("build_list", slower),
+            ]
+            checks[1].name = "build_list (loop version)"
+            print(regression_report(checks))
+
+            # Drop-in use through the Step 5 comparator interface
+            comparator = PersistentPerformanceComparator(history)
+            comparison = comparator.compare_to_baseline("build_list", slower)
+            print(f"\nComparator: {comparison['performance_ratio']:.2f}x, "
+                  f"p={comparison['p_value']:.4f}, "
+                  f"regression={comparison['is_regression']}")
+
+        print("\nCI usage:")
+        print("  python 05-profiling-and-benchmarking.py history --db benchmark_history.sqlite3")
+
+
+# Step 9: Add a low-overhead sampling profiler
+# ===============================================================================
+
+# Explanation:
+# cProfile (Step 3) is a deterministic profiler: it hooks every call and return,
+# which can slow call-heavy code by 2x or more and distorts the very hot spots
+# we are trying to find. A sampling profiler instead looks at the stack a fixed
+# number of times per second and counts what it sees. At ~100 Hz the cost is a
+# few hundred stack walks per second, typically well under 2% overhead, and the
+# counts converge on where time is actually spent.
+# Two sampling back ends are provided:
+# - "thread": a daemon thread reads sys._current_frames(); works everywhere and
+#   can sample every thread in the process
+# - "signal": ITIMER_PROF delivers SIGPROF on CPU time; Unix main thread only,
+#   but it samples exactly when the process is burning CPU
+# Results are exported as "collapsed stacks" (the format flamegraph.pl,
+# speedscope and inferno read) or rendered directly as an SVG flame graph.
+
+# All imports from previous steps plus threading, signal and collections
+import signal
+import threading
+from collections import Counter
+from html import escape as html_escape
+
+# New in Step 9: the sampling profiler
+class SamplingProfiler:
+    """Statistical stack-sampling profiler with a CPUProfiler-style interface."""
+
+    def __init__(self, hz: float = 100.0, mode: str = "thread",
+                 all_threads: bool = False, max_depth: int = 128):
+        """
+        Args:
+            hz: Samples per second.
+            mode: "thread" (portable) or "signal" (SIGPROF, Unix main thread).
+            all_threads: In thread mode, sample every thread instead of only
+                the thread that called start_profiling().
+            max_depth: Deepest stack recorded; deeper frames are truncated.
+        """
+        if hz <= 0:
+            raise ValueError("hz must be positive")
+        if mode not in ("thread", "signal"):
+            raise ValueError("mode must be 'thread' or 'signal'")
+        if mode == "signal" and not hasattr(signal, "setitimer"):
+            raise ValueError("signal mode needs signal.setitimer (Unix only)")
+        self.interval = 1.0 / hz
+        self.mode = mode
+        self.all_threads = all_threads
+        self.max_depth = max_depth
+        self.samples: Counter = Counter()
+        self.sample_count = 0
+        self.elapsed_time = 0.0
+        self._labels: Dict[Any, str] = {}
+        self._running = False
+        self._stop_event = threading.Event()
+        self._sampler_thread = None
+        self._target_thread_id = None
+        self._previous_handler = None
+        self._start_time = None
+
+    # -- sampling -----------------------------------------------------------
+    def _record(self, frame):
+        """Store one stack as a tuple of code objects (root first)."""
+        codes = []
+        while frame is not None and len(codes) < self.max_depth:
+            codes.append(frame.f_code)
+            frame = frame.f_back
+        if codes:
+            codes.reverse()
+            self.samples[tuple(codes)] += 1
+            self.sample_count += 1
+
+    def _sample_loop(self):
+        own_id = threading.get_ident()
+        # Schedule against absolute deadlines so time spent waiting for the
+        # GIL does not silently lower the sampling rate
+        next_sample = time.perf_counter() + self.interval
+        while not self._stop_event.wait(max(0.0, next_sample - time.perf_counter())):
+            next_sample = max(next_sample + self.interval, time.perf_counter())
+            frames = sys._current_frames()
+            if self.all_threads:
+                for thread_id, frame in frames.items():
+                    if thread_id != own_id:
+                        self._record(frame)
+            else:
+                frame = frames.get(self._target_thread_id)
+                if frame is not None:
+                    self._record(frame)
+
+    def _signal_handler(self, signum, frame):
+        self._record(frame)
+
+    def start_profiling(self):
+        """Start sampling."""
+        # Validate before touching any state, so a failed start can be retried
+        if self._running:
+            raise RuntimeError("Profiler already running")
+        if self.mode == "signal" and threading.current_thread() is not threading.main_thread():
+            raise RuntimeError("signal mode must be started from the main thread")
+        self._running = True
+        self._start_time = time.perf_counter()
+        if self.mode == "signal":
+            self._previous_handler = signal.signal(signal.SIGPROF, self._signal_handler)
+            signal.setitimer(signal.ITIMER_PROF, self.interval, self.interval)
+        else:
+            self._target_thread_id = threading.get_ident()
+            self._stop_event.clear()
+            self._sampler_thread = threading.Thread(
+                target=self._sample_loop, name="SamplingProfiler", daemon=True)
+            self._sampler_thread.start()
+
+    def stop_profiling(self):
+        """Stop sampling; returns the collected stack counts."""
+        if not self._running:
+            return self.samples
+        if self.mode == "signal":
+            signal.setitimer(signal.ITIMER_PROF, 0, 0)
+            signal.signal(signal.SIGPROF, self._previous_handler or signal.SIG_DFL)
+        else:
+            self._stop_event.set()
+            self._sampler_thread.join()
+        self.elapsed_time += time.perf_counter() - self._start_time
+        self._running = False
+        return self.samples
+
+    def reset(self):
+        """Discard collected samples."""
+        self.samples.clear()
+        self.sample_count = 0
+        self.elapsed_time = 0.0
+
+    # -- reporting ----------------------------------------------------------
+    def _label(self, code) -> str:
+        label = self._labels.get(code)
+        if label is None:
+            label = f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+            self._labels[code] = label
+        return label
+
+    def collapsed_stacks(self) -> str:
+        """Stacks in 'root;child;leaf count' form, one per line."""
+        lines = []
+        for stack, count in self.samples.most_common():
+            lines.append(";".join(self._label(code).replace(";", ":") for code in stack)
+                         + f" {count}")
+        return "\n".join(lines)
+
+    def write_collapsed(self, path: str):
+        """Write collapsed stacks for flamegraph.pl, speedscope or inferno."""
+        with open(path, "w") as f:
+            f.write(self.collapsed_stacks())
+            f.write("\n")
+
+    def function_stats(self) -> List[Tuple[str, int, int]]:
+        """(function, self samples, total samples) sorted by total samples."""
+        self_counts: Counter = Counter()
+        total_counts: Counter = Counter()
+        for stack, count in self.samples.items():
+            self_counts[stack[-1]] += count
+            for code in set(stack):
+                total_counts[code] += count
+        return sorted(((self._label(code), self_counts[code], total)
+                       for code, total in total_counts.items()),
+                      key=lambda row: (row[2], row[1]), reverse=True)
+
+    def get_stats_summary(self, sort_by: str = 'total', limit: int = 10) -> str:
+        """Formatted table of the hottest functions ('total' or 'self')."""
+        if not self.sample_count:
+            return "No profiling data available"
+        rows = self.function_stats()
+        if sort_by == 'self':
+            rows.sort(key=lambda row: row[1], reverse=True)
+        lines = [f"{self.sample_count} samples over {self.elapsed_time:.3f}s "
+                 f"({self.sample_count / max(self.elapsed_time, 1e-9):.0f} Hz effective)",
+                 f"{'self %':>7} {'total %':>8}  function"]
+        for label, self_samples, total in rows[:limit]:
+            lines.append(f"{self_samples / self.sample_count:>7.1%} "
+                         f"{total / self.sample_count:>8.1%}  {label}")
+        return "\n".join(lines)
+
+    def write_flamegraph(self, path: str, title: str = "Flame Graph",
+                         width: int = 1200, frame_height: int = 16):
+        """Render the samples as a standalone SVG flame graph."""
+        # Merge stacks into a tree: label -> [count, children]
+        root = [0, {}]
+        for stack, count in self.samples.items():
+            node = root
+            node[0] += count
+            for code in stack:
+                node = node[1].setdefault(self._label(code), [0, {}])
+                node[0] += count
+
+        rects = []
+        max_depth = 0
+
+        def layout(children, x, depth):
+            nonlocal max_depth
+            max_depth = max(max_depth, depth)
+            for label, (count, grandchildren) in sorted(children.items()):
+                w = count / root[0] * width
+                if w >= 0.5:
+                    rects.append((x, depth, w, label, count))
+                    layout(grandchildren, x, depth + 1)
+                x += w
+
+        if root[0]:
+            layout(root[1], 0.0, 0)
+        height = (max_depth + 1) * frame_height + 40
+        out = [f'<svg xmlns="http://www.w3.org/2000/svg" width="{width}" height="{height}" '
+               f'font-family="monospace" font-size="11">',
+               f'<text x="{width / 2}" y="20" text-anchor="middle" font-size="15">'
+               f'{html_escape(title)}</text>']
+        for x, depth, w, label, count in rects:
+            y = height - (depth + 1) * frame_height
+            # Deterministic warm colours, keyed on the function name
+            hue = sum(map(ord, label)) % 60
+            text = html_escape(label)
+            out.append(
+                f'<g><title>{text} ({count} samples, {count / root[0]:.1%})</title>'
+                f'<rect x="{x:.1f}" y="{y}" width="{w:.1f}" height="{frame_height - 1}" '
+                f'fill="hsl({hue},80%,60%)"/>')
+            max_chars = int(w / 7)
+            if max_chars >= 4:
+                short = label if len(label) <= max_chars else label[:max_chars - 2] + ".."
+                out.append(f'<text x="{x + 3:.1f}" y="{y + frame_height - 4}">'
+                           f'{html_escape(short)}</text>')
+            out.append('</g>')
+        out.append('</svg>')
+        with open(path, "w") as f:
+            f.write("\n".join(out))
+
+    def profile_function(self, func: Callable, *args, **kwargs) -> Tuple[Any, str]:
+        """Profile a single function call."""
+        self.start_profiling()
+        try:
+            result = func(*args, **kwargs)
+        finally:
+            self.stop_profiling()
+        return result, self.get_stats_summary()
+
+    def __enter__(self):
+        self.start_profiling()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop_profiling()
+
+
+def sampling_profile_decorator(hz: float = 100.0, limit: int = 10,
+                               flamegraph: Optional[str] = None):
+    """Decorator for sampling-profiling a function, optionally saving an SVG."""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            profiler = SamplingProfiler(hz=hz)
+            result, _ = profiler.profile_function(func, *args, **kwargs)
+            stats = profiler.get_stats_summary(limit=limit)
+            print(f"\n=== Sampling profile for {func.__name__} ===")
+            print(stats)
+            if flamegraph:
+                profiler.write_flamegraph(flamegraph, title=func.__name__)
+            return result
+        return wrapper
+    return decorator
+
+# Example usage of Step 9:
+def step9_example():
+    """Demonstrate sampling profiling and measure its overhead."""
+    print("\n=== Step 9: Sampling Profiler ===")
+    import tempfile
+
+    def parse_numbers(n):
+        return [int(str(i)) for i in range(n)]
+
+    def checksum(values):
+        total = 0
+        for v in values:
+            total = (total * 31 + v) % 1_000_003
+        return total
+
+    def workload():
+        for _ in range(6):
+            checksum(parse_numbers(100_000))
+
+    # Alternate plain and sampled runs and keep the best of each, so machine
+    # noise does not masquerade as profiler overhead
+    profiler = SamplingProfiler(hz=100)
+    plain_times, sampled_times = [], []
+    for _ in range(3):
+        with Timer() as plain:
+            workload()
+        plain_times.append(plain.elapsed_time)
+        with profiler:
+            with Timer() as sampled:
+                workload()
+        sampled_times.append(sampled.elapsed_time)
+
+    plain_best, sampled_best = min(plain_times), min(sampled_times)
+    overhead = (sampled_best - plain_best) / plain_best * 100
+    print(profiler.get_stats_summary(limit=6))
+    print(f"\nWithout profiler: {plain_best:.3f}s (best of 3)")
+    print(f"With sampling at 100 Hz: {sampled_best:.3f}s ({overhead:+.1f}% overhead)")
+
+    if hasattr(signal, "setitimer"):
+        with SamplingProfiler(hz=200, mode="signal") as cpu_sampler:
+            workload()
+        print(f"Signal mode collected {cpu_sampler.sample_count} CPU-time samples")
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        svg_path = os.path.join(tmpdir, "workload.svg")
+        folded_path = os.path.join(tmpdir, "workload.folded")
+        profiler.write_flamegraph(svg_path, title="workload")
+        profiler.write_collapsed(folded_path)
+        print(f"Flame graph: {os.path.getsize(svg_path)} bytes SVG, "
+              f"{len(profiler.samples)} distinct stacks in collapsed format")
+        print("Top collapsed stack:", profiler.collapsed_stacks().splitlines()[0])
+
+
 if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "complexity":
+        sys.exit(complexity_cli(sys.argv[2:]))
+    if len(sys.argv) > 1 and sys.argv[1] == "history":
+        sys.exit(history_cli(sys.argv[2:]))
+
     step1_example()
     step2_example()
     step3_example()
     step4_example()
     step5_example()
-    step6_example()
\ No newline at end of file
+    step6_example()
+    step7_example()
+    step8_example()
+    step9_example()
@@ -2164,4 +2164,1090 @@ if __name__ == "__main__":
     demo_step2()
     demo_step3()
     demo_step4()
-    demo_step5()
\ No newline at end of file
+    demo_step5()
+
+# Step 6: Add a Persistent Disk-Backed Tier to the Multi-Level Cache
+# ===============================================================================
+
+# Explanation:
+# Every level of MultiLevelCache_final lives in process memory, so a deploy or
+# restart always begins with an empty cache and every request falls through to
+# the database at once (a "thundering herd"). Here we add an optional disk tier
+# built on SQLite. Values are stored as compact binary blobs (pickle, plus zlib
+# for large payloads), the tier evicts least recently used rows once a byte
+# budget is exceeded, and the in-memory levels are warmed lazily: a value is
+# only promoted back into L1/L2/L3 when it is actually requested.
+
+# All imports from previous steps plus persistence helpers
+import os
+import pickle
+import sqlite3
+import tempfile
+import zlib
+
+class DiskCacheTier:
+    """Persistent, size-bounded cache tier stored in a SQLite database."""
+    
+    # Single-byte header that tells us how a blob was encoded
+    _RAW = b"\x00"
+    _COMPRESSED = b"\x01"
+    
+    def __init__(self, path: str, max_bytes: int = 64 * 1024 * 1024,
+                 ttl: Optional[float] = None, compress_threshold: int = 1024):
+        """
+        Initialize the disk tier.
+        
+        Args:
+            path: SQLite database file (created if it does not exist)
+            max_bytes: Maximum total size of stored values in bytes
+            ttl: Optional time to live in seconds (None means no expiry)
+            compress_threshold: Payloads larger than this are zlib-compressed
+        """
+        self.path = path
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.compress_threshold = compress_threshold
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._lock = threading.Lock()
+        
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        # WAL keeps readers and the writer from blocking each other and makes
+        # individual writes much cheaper than the default rollback journal
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS cache_entries (
+                key BLOB PRIMARY KEY,
+                value BLOB NOT NULL,
+                size INTEGER NOT NULL,
+                created REAL NOT NULL,
+                accessed REAL NOT NULL
+            )
+        """)
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_cache_accessed ON cache_entries(accessed)"
+        )
+        
+        # Entries written by a previous process still count against the budget
+        row = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM cache_entries").fetchone()
+        self._total_bytes = row[0]
+    
+    @staticmethod
+    def _encode_key(key: Any) -> bytes:
+        """Turn a cache key into a stable binary primary key."""
+        return pickle.dumps(key, protocol=pickle.HIGHEST_PROTOCOL)
+    
+    def _serialize(self, value: Any) -> bytes:
+        """Serialize a value into a compact binary blob."""
+        data = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        if len(data) > self.compress_threshold:
+            compressed = zlib.compress(data, 6)
+            if len(compressed) < len(data):
+                return self._COMPRESSED + compressed
+        return self._RAW + data
+    
+    def _deserialize(self, blob: bytes) -> Any:
+        """Inverse of _serialize()."""
+        header, payload = blob[:1], blob[1:]
+        if header == self._COMPRESSED:
+            payload = zlib.decompress(payload)
+        return pickle.loads(payload)
+    
+    def _evict_if_needed(self) -> None:
+        """Remove least recently accessed rows until we are within budget."""
+        while self._total_bytes > self.max_bytes:
+            rows = self._conn.execute(
+                "SELECT key, size FROM cache_entries ORDER BY accessed LIMIT 64"
+            ).fetchall()
+            if not rows:
+                self._total_bytes = 0
+                break
+            
+            for key_blob, size in rows:
+                self._conn.execute("DELETE FROM cache_entries WHERE key = ?", (key_blob,))
+                self._total_bytes -= size
+                self._evictions += 1
+                if self._total_bytes <= self.max_bytes:
+                    break
+    
+    def get(self, key: Any) -> Optional[Any]:
+        """Get value from disk, return None if not found or expired."""
+        key_blob = self._encode_key(key)
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, size, created FROM cache_entries WHERE key = ?", (key_blob,)
+            ).fetchone()
+            if row is None:
+                self._misses += 1
+                return None
+            
+            blob, size, created = row
+            now = time.time()
+            if self.ttl is not None and now - created > self.ttl:
+                self._conn.execute("DELETE FROM cache_entries WHERE key = ?", (key_blob,))
+                self._total_bytes -= size
+                self._misses += 1
+                return None
+            
+            self._conn.execute(
+                "UPDATE cache_entries SET accessed = ? WHERE key = ?", (now, key_blob)
+            )
+            self._hits += 1
+        
+        return self._deserialize(blob)
+    
+    def put(self, key: Any, value: Any) -> None:
+        """Store a value on disk, evicting old entries if over budget."""
+        key_blob = self._encode_key(key)
+        blob = self._serialize(value)
+        size = len(blob)
+        if size > self.max_bytes:
+            return  # Would evict everything else and still not fit
+        
+        with self._lock:
+            now = time.time()
+            self._conn.execute("BEGIN")
+            try:
+                row = self._conn.execute(
+                    "SELECT size FROM cache_entries WHERE key = ?", (key_blob,)
+                ).fetchone()
+                if row is not None:
+                    self._total_bytes -= row[0]
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO cache_entries (key, value, size, created, accessed) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    (key_blob, blob, size, now, now)
+                )
+                self._total_bytes += size
+                self._evict_if_needed()
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                self._total_bytes = self._conn.execute(
+                    "SELECT COALESCE(SUM(size), 0) FROM cache_entries"
+                ).fetchone()[0]
+                raise
+    
+    def delete(self, key: Any) -> None:
+        """Remove a single entry from disk."""
+        key_blob = self._encode_key(key)
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT size FROM cache_entries WHERE key = ?", (key_blob,)
+            ).fetchone()
+            if row is not None:
+                self._conn.execute("DELETE FROM cache_entries WHERE key = ?", (key_blob,))
+                self._total_bytes -= row[0]
+    
+    def clear(self) -> None:
+        """Remove every entry from disk."""
+        with self._lock:
+            self._conn.execute("DELETE FROM cache_entries")
+            self._total_bytes = 0
+            self._hits = 0
+            self._misses = 0
+            self._evictions = 0
+    
+    def close(self) -> None:
+        """Close the underlying database connection."""
+        with self._lock:
+            self._conn.close()
+    
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM cache_entries").fetchone()[0]
+    
+    def cache_info(self) -> str:
+        """Get cache statistics."""
+        entries = len(self)
+        return (f"Disk Cache - Entries: {entries}, "
+                f"Bytes: {self._total_bytes}/{self.max_bytes}, "
+                f"Hits: {self._hits}, Misses: {self._misses}, Evictions: {self._evictions}")
+
+class PersistentMultiLevelCache(MultiLevelCache_final):
+    """Multi-level cache with an optional persistent disk tier behind L3."""
+    
+    def __init__(self,
+                 l1_maxsize: int = 50,
+                 l2_maxsize: int = 200,
+                 l3_maxsize: int = 1000,
+                 l3_ttl: float = 3600.0,
+                 disk_path: Optional[str] = None,
+                 disk_max_bytes: int = 64 * 1024 * 1024,
+                 disk_ttl: Optional[float] = None):
+        """
+        Initialize the cache.
+        
+        When disk_path is None this behaves exactly like MultiLevelCache_final.
+        Otherwise every put is also written to the disk tier, and misses in the
+        in-memory levels are served from disk and promoted back into L1-L3.
+        """
+        super().__init__(l1_maxsize, l2_maxsize, l3_maxsize, l3_ttl)
+        self.disk_cache = (
+            DiskCacheTier(disk_path, max_bytes=disk_max_bytes, ttl=disk_ttl)
+            if disk_path else None
+        )
+        self.disk_hits = 0
+    
+    def get(self, key: Any) -> Optional[Any]:
+        """Get value from memory levels first, then from disk."""
+        value = super().get(key)
+        if value is not None or self.disk_cache is None:
+            return value
+        
+        value = self.disk_cache.get(key)
+        if value is None:
+            return None
+        
+        with self._lock:
+            # super().get() recorded this lookup as a miss, but disk served it
+            self.misses -= 1
+            self.disk_hits += 1
+            # Lazily warm the in-memory levels with the value we just loaded
+            self.l3_cache.put(key, value)
+            self.l2_cache.put(key, value)
+            self._promote_to_l1(key, value)
+        return value
+    
+    def put(self, key: Any, value: Any) -> None:
+        """Put value in all memory levels and on disk."""
+        super().put(key, value)
+        if self.disk_cache is not None:
+            self.disk_cache.put(key, value)
+    
+    def clear(self) -> None:
+        """Clear all memory levels and the disk tier."""
+        super().clear()
+        self.disk_hits = 0
+        if self.disk_cache is not None:
+            self.disk_cache.clear()
+    
+    def close(self) -> None:
+        """Release the disk tier (memory levels are simply dropped)."""
+        if self.disk_cache is not None:
+            self.disk_cache.close()
+    
+    def cache_info(self) -> str:
+        """Get comprehensive cache statistics including the disk tier."""
+        info = super().cache_info()
+        if self.disk_cache is None:
+            return info
+        return (f"{info}\n"
+                f"  Disk: {self.disk_cache.cache_info()}, {self.disk_hits} promoted to memory")
+
+# New in Step 6: Persistent multi-level cache decorator
+def persistent_multi_level_cache(disk_path: str, l1_maxsize: int = 50, l2_maxsize: int = 200,
+                                 l3_maxsize: int = 1000, l3_ttl: float = 3600.0,
+                                 disk_max_bytes: int = 64 * 1024 * 1024,
+                                 disk_ttl: Optional[float] = None):
+    """Multi-level cache decorator backed by a persistent disk tier."""
+    def decorator(func: Callable) -> Callable:
+        cache = PersistentMultiLevelCache(l1_maxsize, l2_maxsize, l3_maxsize, l3_ttl,
+                                          disk_path=disk_path,
+                                          disk_max_bytes=disk_max_bytes,
+                                          disk_ttl=disk_ttl)
+        
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            # Create key from arguments
+            try:
+                key = args
+                if kwargs:
+                    key += tuple(sorted(kwargs.items()))
+            except TypeError:
+                key = str(args) + str(sorted(kwargs.items()))
+            
+            return cache.get_or_compute(key, func, *args, **kwargs)
+        
+        wrapper.cache_info = cache.cache_info
+        wrapper.cache_clear = cache.clear
+        wrapper.cache = cache
+        
+        return wrapper
+    return decorator
+
+def benchmark_warm_restart(num_keys: int = 200, query_latency: float = 0.005):
+    """Compare request latency after a restart with and without the disk tier."""
+    print("=== Benchmark: Warm Restart with Disk Tier ===")
+    
+    def slow_query(n: int) -> dict:
+        time.sleep(query_latency)  # Simulate database round trip
+        return {"id": n, "payload": "x" * 256}
+    
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db_path = os.path.join(tmp_dir, "cache.sqlite3")
+        
+        # First process lifetime: populate the cache
+        first_run = PersistentMultiLevelCache(l1_maxsize=20, l2_maxsize=50, l3_maxsize=100,
+                                              disk_path=db_path)
+        for n in range(num_keys):
+            first_run.get_or_compute(n, slow_query, n)
+        first_run.close()
+        
+        # "Restart" without the disk tier: everything goes back to the database
+        cold = MultiLevelCache_final(l1_maxsize=20, l2_maxsize=50, l3_maxsize=100)
+        start_time = time.perf_counter()
+        for n in range(num_keys):
+            cold.get_or_compute(n, slow_query, n)
+        cold_time = time.perf_counter() - start_time
+        
+        # "Restart" with the disk tier: values are read back from SQLite
+        warm = PersistentMultiLevelCache(l1_maxsize=20, l2_maxsize=50, l3_maxsize=100,
+                                         disk_path=db_path)
+        start_time = time.perf_counter()
+        for n in range(num_keys):
+            warm.get_or_compute(n, slow_query, n)
+        warm_time = time.perf_counter() - start_time
+        
+        # Second pass on the warm cache hits memory levels where they fit
+        start_time = time.perf_counter()
+        for n in range(num_keys):
+            warm.get_or_compute(n, slow_query, n)
+        second_pass_time = time.perf_counter() - start_time
+        
+        print(f"Cold restart (memory only): {cold_time:.4f}s "
+              f"({cold_time / num_keys * 1000:.3f} ms/request)")
+        print(f"Warm restart (disk tier):   {warm_time:.4f}s "
+              f"({warm_time / num_keys * 1000:.3f} ms/request)")
+        print(f"Warm second pass:           {second_pass_time:.4f}s")
+        print(f"Speedup after restart: {cold_time / warm_time:.1f}x")
+        print(f"Cache info:\n{warm.cache_info()}")
+        warm.close()
+    print()
+
+def demo_step6():
+    """Demonstrate the persistent disk tier."""
+    print("=== Step 6: Persistent Disk-Backed Cache Tier ===")
+    
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db_path = os.path.join(tmp_dir, "demo_cache.sqlite3")
+        
+        # Values survive closing and reopening the cache
+        cache = PersistentMultiLevelCache(l1_maxsize=2, l2_maxsize=4, l3_maxsize=8,
+                                          disk_path=db_path)
+        for i in range(5):
+            cache.put(f"key{i}", {"value": i, "data": list(range(i * 10))})
+        cache.close()
+        
+        reopened = PersistentMultiLevelCache(l1_maxsize=2, l2_maxsize=4, l3_maxsize=8,
+                                             disk_path=db_path)
+        print(f"After restart, key3 -> {reopened.get('key3')['value']} (loaded from disk)")
+        print(f"Second access to key3 -> {reopened.get('key3')['value']} (served from L1)")
+        print(reopened.cache_info())
+        reopened.close()
+        print()
+        
+        # Size-bounded eviction on the disk tier
+        print("Testing size-bounded eviction:")
+        small_tier = DiskCacheTier(os.path.join(tmp_dir, "small.sqlite3"), max_bytes=4096)
+        for i in range(20):
+            small_tier.put(i, os.urandom(512))  # Incompressible payloads
+        print(small_tier.cache_info())
+        print(f"Oldest key still present: {small_tier.get(0) is not None}")
+        print(f"Newest key still present: {small_tier.get(19) is not None}")
+        small_tier.close()
+    print()
+    
+    benchmark_warm_restart()
+
+if __name__ == "__main__":
+    demo_step1()
+    demo_step2()
+    demo_step3()
+    demo_step4()
+    demo_step5()
+    demo_step6()
+
+
+# Step 7: Add Memory-Bounded Caches that Evict by Byte Size
+# ===============================================================================
+
+# Explanation:
+# All caches so far are bounded by an entry count (maxsize). That is fine when
+# every value is roughly the same size, but DatabaseQueryCache stores result
+# lists whose size varies wildly, so "500 entries" can mean 5 KB or 5 GB.
+# Here we bound caches by weight instead: every value is measured once by a
+# pluggable weigher (a deep size estimate by default) and least recently used
+# entries are evicted until the total weight fits inside max_bytes.
+
+# All imports from previous steps plus size estimation helpers
+import sys
+from collections import deque
+
+def deep_sizeof(obj: Any) -> int:
+    """Estimate the total memory used by an object and everything it references."""
+    seen = set()
+    total = 0
+    pending = deque([obj])
+    
+    while pending:
+        current = pending.popleft()
+        if id(current) in seen:
+            continue
+        seen.add(id(current))
+        total += sys.getsizeof(current)
+        
+        if isinstance(current, (str, bytes, bytearray, int, float, bool, type(None))):
+            continue
+        if isinstance(current, dict):
+            pending.extend(current.keys())
+            pending.extend(current.values())
+        elif isinstance(current, (list, tuple, set, frozenset, deque)):
+            pending.extend(current)
+        
+        # Instance attributes, whether stored in __dict__ or __slots__
+        if hasattr(current, "__dict__"):
+            pending.append(vars(current))
+        for slot in getattr(type(current), "__slots__", ()):
+            if hasattr(current, slot):
+                pending.append(getattr(current, slot))
+    
+    return total
+
+class WeightedLRUCache:
+    """LRU cache bounded by the total weight (bytes) of its values."""
+    
+    def __init__(self, max_bytes: int = 64 * 1024 * 1024,
+                 weigher: Callable[[Any], int] = deep_sizeof,
+                 maxsize: Optional[int] = None):
+        """
+        Initialize weighted LRU cache.
+        
+        Args:
+            max_bytes: Maximum total weight of all cached values
+            weigher: Function returning the weight of a value in bytes
+            maxsize: Optional additional limit on the number of entries
+        """
+        self.max_bytes = max_bytes
+        self.weigher = weigher
+        self.maxsize = maxsize
+        self.cache = OrderedDict()  # key -> (value, weight)
+        self.current_bytes = 0
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._rejected = 0
+        self._lock = threading.Lock()
+    
+    def _evict_until_fits(self, incoming_weight: int) -> None:
+        """Evict least recently used entries until the new value fits."""
+        while self.cache and (
+            self.current_bytes + incoming_weight > self.max_bytes
+            or (self.maxsize is not None and len(self.cache) >= self.maxsize)
+        ):
+            _, (_, weight) = self.cache.popitem(last=False)
+            self.current_bytes -= weight
+            self._evictions += 1
+    
+    def get(self, key: Any) -> Optional[Any]:
+        """Get value from cache, return None if not found."""
+        entry = self.get_with_weight(key)
+        return None if entry is None else entry[0]
+    
+    def get_with_weight(self, key: Any) -> Optional[Tuple[Any, int]]:
+        """Get (value, weight) from cache, return None if not found."""
+        with self._lock:
+            if key in self.cache:
+                self.cache.move_to_end(key)
+                self._hits += 1
+                return self.cache[key]
+            
+            self._misses += 1
+            return None
+    
+    def put(self, key: Any, value: Any, weight: Optional[int] = None) -> None:
+        """Put key-value pair in cache, evicting by weight as needed.
+        
+        Pass `weight` when it is already known to skip the weigher.
+        """
+        if weight is None:
+            weight = self.weigher(value)
+        with self._lock:
+            if key in self.cache:
+                _, old_weight = self.cache.pop(key)
+                self.current_bytes -= old_weight
+            
+            if weight > self.max_bytes:
+                # A single oversized value would flush the whole cache
+                self._rejected += 1
+                return
+            
+            self._evict_until_fits(weight)
+            self.cache[key] = (value, weight)
+            self.current_bytes += weight
+    
+    def get_or_compute(self, key: Any, compute_func: Callable, *args, **kwargs) -> Any:
+        """Get value from cache or compute and cache it."""
+        value = self.get(key)
+        if value is not None:
+            return value
+        
+        value = compute_func(*args, **kwargs)
+        self.put(key, value)
+        return value
+    
+    def clear(self) -> None:
+        """Clear the cache."""
+        with self._lock:
+            self.cache.clear()
+            self.current_bytes = 0
+            self._hits = 0
+            self._misses = 0
+            self._evictions = 0
+            self._rejected = 0
+    
+    def cache_info(self) -> str:
+        """Get cache statistics."""
+        with self._lock:
+            return (f"Weighted LRU Cache - Size: {len(self.cache)}, "
+                    f"Bytes: {self.current_bytes}/{self.max_bytes}, "
+                    f"Hits: {self._hits}, Misses: {self._misses}, "
+                    f"Evictions: {self._evictions}, Rejected: {self._rejected}")
+
+class WeightedTTLCache:
+    """TTL cache bounded by the total weight (bytes) of its values."""
+    
+    def __init__(self, max_bytes: int = 64 * 1024 * 1024, ttl: float = 300.0,
+                 weigher: Callable[[Any], int] = deep_sizeof):
+        """
+        Initialize weighted TTL cache.
+        
+        Args:
+            max_bytes: Maximum total weight of all cached values
+            ttl: Time to live in seconds (default 5 minutes)
+            weigher: Function returning the weight of a value in bytes
+        """
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.weigher = weigher
+        self.cache = OrderedDict()  # key -> (value, timestamp, weight), LRU order
+        self.current_bytes = 0
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._rejected = 0
+        self._lock = threading.Lock()
+    
+    def _remove(self, key: Any) -> None:
+        """Remove an entry and release its weight."""
+        _, _, weight = self.cache.pop(key)
+        self.current_bytes -= weight
+    
+    def _cleanup_expired(self) -> None:
+        """Remove expired entries from cache."""
+        current_time = time.time()
+        expired_keys = [
+            key for key, (_, timestamp, _) in self.cache.items()
+            if current_time - timestamp > self.ttl
+        ]
+        for key in expired_keys:
+            self._remove(key)
+    
+    def get(self, key: Any) -> Optional[Any]:
+        """Get value from cache, return None if not found or expired."""
+        entry = self.get_with_weight(key)
+        return None if entry is None else entry[0]
+    
+    def get_with_weight(self, key: Any) -> Optional[Tuple[Any, int]]:
+        """Get (value, weight) from cache, return None if not found or expired."""
+        with self._lock:
+            if key not in self.cache:
+                self._misses += 1
+                return None
+            
+            value, timestamp, weight = self.cache[key]
+            if time.time() - timestamp > self.ttl:
+                self._remove(key)
+                self._misses += 1
+                return None
+            
+            self.cache.move_to_end(key)
+            self._hits += 1
+            return value, weight
+    
+    def put(self, key: Any, value: Any, weight: Optional[int] = None) -> None:
+        """Put key-value pair in cache, evicting by weight as needed.
+        
+        Pass `weight` when it is already known to skip the weigher.
+        """
+        if weight is None:
+            weight = self.weigher(value)
+        with self._lock:
+            if key in self.cache:
+                self._remove(key)
+            
+            if weight > self.max_bytes:
+                self._rejected += 1
+                return
+            
+            # Expired entries are the cheapest thing to give back
+            if self.current_bytes + weight > self.max_bytes:
+                self._cleanup_expired()
+            
+            while self.cache and self.current_bytes + weight > self.max_bytes:
+                lru_key = next(iter(self.cache))
+                self._remove(lru_key)
+                self._evictions += 1
+            
+            self.cache[key] = (value, time.time(), weight)
+            self.current_bytes += weight
+    
+    def get_or_compute(self, key: Any, compute_func: Callable, *args, **kwargs) -> Any:
+        """Get value from cache or compute and cache it."""
+        value = self.get(key)
+        if value is not None:
+            return value
+        
+        value = compute_func(*args, **kwargs)
+        self.put(key, value)
+        return value
+    
+    def clear(self) -> None:
+        """Clear the cache."""
+        with self._lock:
+            self.cache.clear()
+            self.current_bytes = 0
+            self._hits = 0
+            self._misses = 0
+            self._evictions = 0
+            self._rejected = 0
+    
+    def cache_info(self) -> str:
+        """Get cache statistics."""
+        with self._lock:
+            self._cleanup_expired()
+            return (f"Weighted TTL Cache - Size: {len(self.cache)}, "
+                    f"Bytes: {self.current_bytes}/{self.max_bytes}, TTL: {self.ttl}s, "
+                    f"Hits: {self._hits}, Misses: {self._misses}, "
+                    f"Evictions: {self._evictions}, Rejected: {self._rejected}")
+
+class WeightedMultiLevelCache(MultiLevelCache_final):
+    """Multi-level cache where every level is bounded by bytes, not entry count."""
+    
+    def __init__(self,
+                 l1_max_bytes: int = 1 * 1024 * 1024,    # Hot data
+                 l2_max_bytes: int = 8 * 1024 * 1024,    # Warm data
+                 l3_max_bytes: int = 32 * 1024 * 1024,   # Cold data with TTL
+                 l3_ttl: float = 3600.0,
+                 weigher: Callable[[Any], int] = deep_sizeof):
+        super().__init__(l1_maxsize=0, l2_maxsize=0, l3_maxsize=0, l3_ttl=l3_ttl)
+        self.weigher = weigher
+        
+        # L1 keeps the dict/access-order layout of the base class plus weights
+        self.l1_max_bytes = l1_max_bytes
+        self.l1_weights = {}
+        self.l1_bytes = 0
+        
+        self.l2_cache = WeightedLRUCache(l2_max_bytes, weigher)
+        self.l3_cache = WeightedTTLCache(l3_max_bytes, l3_ttl, weigher)
+    
+    def _promote_to_l1(self, key: Any, value: Any, weight: Optional[int] = None) -> None:
+        """Promote a value to L1 cache, evicting by weight."""
+        if weight is None:
+            weight = self.weigher(value)
+        
+        if key in self.l1_cache:
+            self.l1_bytes -= self.l1_weights.pop(key)
+            del self.l1_cache[key]
+            self.l1_access_order.remove(key)
+        
+        if weight > self.l1_max_bytes:
+            return  # Too big to be "hot"; it still lives in L2/L3
+        
+        while self.l1_access_order and self.l1_bytes + weight > self.l1_max_bytes:
+            old_key = self.l1_access_order.pop(0)
+            del self.l1_cache[old_key]
+            self.l1_bytes -= self.l1_weights.pop(old_key)
+        
+        self.l1_cache[key] = value
+        self.l1_weights[key] = weight
+        self.l1_bytes += weight
+        self.l1_access_order.append(key)
+    
+    def get(self, key: Any) -> Optional[Any]:
+        """Get value from multi-level cache; promotions reuse the stored weight."""
+        with self._lock:
+            if key in self.l1_cache:
+                self.l1_access_order.remove(key)
+                self.l1_access_order.append(key)
+                self.l1_hits += 1
+                return self.l1_cache[key]
+            
+            entry = self.l2_cache.get_with_weight(key)
+            if entry is not None:
+                self.l2_hits += 1
+                self._promote_to_l1(key, *entry)
+                return entry[0]
+            
+            entry = self.l3_cache.get_with_weight(key)
+            if entry is not None:
+                self.l3_hits += 1
+                self.l2_cache.put(key, *entry)
+                self._promote_to_l1(key, *entry)
+                return entry[0]
+            
+            self.misses += 1
+            return None
+    
+    def put(self, key: Any, value: Any) -> None:
+        """Put value in every level, weighing it once (outside the lock)."""
+        weight = self.weigher(value)
+        with self._lock:
+            self._promote_to_l1(key, value, weight)
+            self.l2_cache.put(key, value, weight)
+            self.l3_cache.put(key, value, weight)
+    
+    def clear(self) -> None:
+        """Clear all cache levels."""
+        super().clear()
+        with self._lock:
+            self.l1_weights.clear()
+            self.l1_bytes = 0
+    
+    @property
+    def current_bytes(self) -> int:
+        """Total weight currently held across all levels."""
+        return self.l1_bytes + self.l2_cache.current_bytes + self.l3_cache.current_bytes
+    
+    def cache_info(self) -> str:
+        """Get comprehensive cache statistics including weighted sizes."""
+        with self._lock:
+            total_hits = self.l1_hits + self.l2_hits + self.l3_hits
+            total_requests = total_hits + self.misses
+            hit_rate = (total_hits / total_requests * 100) if total_requests > 0 else 0
+            
+            return (f"Weighted Multi-Level Cache Stats:\n"
+                   f"  L1: {len(self.l1_cache)} items, Bytes: {self.l1_bytes}/{self.l1_max_bytes}, {self.l1_hits} hits\n"
+                   f"  L2: {self.l2_cache.cache_info()}\n"
+                   f"  L3: {self.l3_cache.cache_info()}\n"
+                   f"  Weighted Size (sum of levels): {self.current_bytes} bytes\n"
+                   f"  Total: {total_hits} hits, {self.misses} misses\n"
+                   f"  Hit Rate: {hit_rate:.1f}%")
+
+# New in Step 7: Weighted LRU cache decorator
+def weighted_lru_cache(max_bytes: int = 64 * 1024 * 1024,
+                       weigher: Callable[[Any], int] = deep_sizeof):
+    """LRU cache decorator bounded by the total size of cached results."""
+    def decorator(func: Callable) -> Callable:
+        cache = WeightedLRUCache(max_bytes, weigher)
+        
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            # Create key from arguments
+            try:
+                key = args
+                if kwargs:
+                    key += tuple(sorted(kwargs.items()))
+            except TypeError:
+                key = str(args) + str(sorted(kwargs.items()))
+            
+            return cache.get_or_compute(key, func, *args, **kwargs)
+        
+        wrapper.cache_info = cache.cache_info
+        wrapper.cache_clear = cache.clear
+        wrapper.cache = cache
+        
+        return wrapper
+    return decorator
+
+class WeightedDatabaseQueryCache(DatabaseQueryCache):
+    """DatabaseQueryCache whose levels are bounded by memory instead of entry count."""
+    
+    def __init__(self, l1_max_bytes: int = 256 * 1024, l2_max_bytes: int = 2 * 1024 * 1024,
+                 l3_max_bytes: int = 8 * 1024 * 1024, weigher: Callable[[Any], int] = deep_sizeof):
+        super().__init__()
+        self.cache = WeightedMultiLevelCache(
+            l1_max_bytes=l1_max_bytes,
+            l2_max_bytes=l2_max_bytes,
+            l3_max_bytes=l3_max_bytes,
+            l3_ttl=1800.0,  # 30 minute TTL
+            weigher=weigher
+        )
+
+def demo_step7():
+    """Demonstrate byte-bounded caches."""
+    print("=== Step 7: Memory-Bounded Caches ===")
+    
+    # Entry-count bounds say nothing about memory when sizes vary
+    small_result = [{"id": 1}]
+    large_result = [{"id": i, "data": "x" * 100} for i in range(2000)]
+    print(f"Small result: {deep_sizeof(small_result)} bytes, "
+          f"large result: {deep_sizeof(large_result)} bytes")
+    print()
+    
+    print("Testing weighted LRU eviction (budget 64 KB):")
+    cache = WeightedLRUCache(max_bytes=64 * 1024)
+    for i in range(10):
+        cache.put(f"small{i}", [i] * 10)
+    print(f"After 10 small values: {cache.cache_info()}")
+    
+    cache.get("small0")  # Keep one small value warm
+    for i in range(3):
+        cache.put(f"medium{i}", [{"id": n, "data": "x" * 100} for n in range(100)])
+    print(f"After three ~22 KB values: {cache.cache_info()}")
+    print(f"Keys kept: {list(cache.cache.keys())}")
+    
+    cache.put("huge", large_result)  # Bigger than the whole budget
+    print(f"After an oversized value: {cache.cache_info()}")
+    print()
+    
+    # Pluggable weigher: count list elements instead of bytes
+    print("Testing a custom weigher (rows instead of bytes):")
+    row_cache = WeightedLRUCache(max_bytes=1000, weigher=len)
+    for table, rows in [("a", 400), ("b", 400), ("c", 400)]:
+        row_cache.put(table, list(range(rows)))
+    print(row_cache.cache_info())
+    print()
+    
+    print("Testing weighted database query cache:")
+    db_cache = WeightedDatabaseQueryCache(l1_max_bytes=16 * 1024,
+                                          l2_max_bytes=64 * 1024,
+                                          l3_max_bytes=128 * 1024)
+    queries = [
+        ("users", {"status": "active"}),
+        ("orders", {"date": "2025-01-01"}),
+        ("users", {"status": "active"}),  # Repeat
+        ("products", {"category": "books"}),
+        ("orders", {"date": "2025-01-01"}),  # Repeat
+    ]
+    for table, conditions in queries:
+        results = db_cache.execute_query(table, conditions)
+        print(f"Query {table} with {conditions}: {len(results)} results")
+    print(db_cache.get_stats())
+    print()
+
+if __name__ == "__main__":
+    demo_step1()
+    demo_step2()
+    demo_step3()
+    demo_step4()
+    demo_step5()
+    demo_step6()
+    demo_step7()
+
+
+# Step 8: Add Asyncio-Native Cache Decorators for Coroutine Functions
+# ===============================================================================
+
+# Explanation:
+# ttl_cache, lru_cache and multi_level_cache only understand regular functions.
+# Applied to an "async def" they cache the coroutine object instead of its
+# result, and a coroutine can only be awaited once. The async versions below
+# await the function and cache the result. They also coalesce concurrent
+# misses: if ten requests for the same user arrive together, one fetch runs
+# and all ten callers await the same in-flight task. The shared task is wrapped
+# in asyncio.shield(), so a cancelled caller does not cancel the fetch for
+# everybody else.
+
+# All imports from previous steps plus asyncio
+import asyncio
+from functools import partial
+
+class AsyncCache:
+    """Async front-end for any cache with get()/put() that coalesces concurrent misses."""
+    
+    def __init__(self, backend: Any):
+        """
+        Initialize async cache.
+        
+        Args:
+            backend: Any cache from the previous steps (LRU, TTL, multi-level...)
+        """
+        self.backend = backend
+        self._inflight = {}  # key -> asyncio.Task computing the value
+        self._coalesced = 0
+    
+    def _on_done(self, key: Any, task: "asyncio.Task") -> None:
+        """Store a finished result and forget the in-flight task."""
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        
+        # Failed or cancelled computations are not cached, so the next call retries
+        if task.cancelled() or task.exception() is not None:
+            return
+        self.backend.put(key, task.result())
+    
+    async def get_or_compute(self, key: Any, coro_func: Callable, *args, **kwargs) -> Any:
+        """Get value from cache or await the coroutine function and cache its result."""
+        value = self.backend.get(key)
+        if value is not None:
+            return value
+        
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(coro_func(*args, **kwargs))
+            self._inflight[key] = task
+            # Registered before any waiter, so the cache is filled before they resume
+            task.add_done_callback(partial(self._on_done, key))
+        else:
+            self._coalesced += 1
+        
+        # shield(): cancelling this caller must not cancel the shared computation
+        return await asyncio.shield(task)
+    
+    def clear(self) -> None:
+        """Clear the backend cache (in-flight computations still finish)."""
+        self.backend.clear()
+        self._coalesced = 0
+    
+    def cache_info(self) -> str:
+        """Get cache statistics."""
+        return (f"{self.backend.cache_info()}\n"
+                f"  Async: In-flight: {len(self._inflight)}, Coalesced awaits: {self._coalesced}")
+
+# New in Step 8: Generic async cache decorator
+def async_cached(backend: Any):
+    """Cache the awaited results of a coroutine function in the given backend."""
+    def decorator(func: Callable) -> Callable:
+        if not asyncio.iscoroutinefunction(func):
+            raise TypeError(f"{func.__name__} is not a coroutine function")
+        
+        cache = AsyncCache(backend)
+        
+        @wraps(func)
+        async def wrapper(*args, **kwargs):
+            # Create key from arguments
+            try:
+                key = args
+                if kwargs:
+                    key += tuple(sorted(kwargs.items()))
+                hash(key)
+            except TypeError:
+                key = str(args) + str(sorted(kwargs.items()))
+            
+            return await cache.get_or_compute(key, func, *args, **kwargs)
+        
+        wrapper.cache_info = cache.cache_info
+        wrapper.cache_clear = cache.clear
+        wrapper.cache = cache
+        
+        return wrapper
+    return decorator
+
+def async_lru_cache(maxsize: int = 128):
+    """LRU cache decorator for coroutine functions."""
+    return async_cached(LRUCache_final(maxsize))
+
+def async_ttl_cache(maxsize: int = 128, ttl: float = 300.0):
+    """TTL cache decorator for coroutine functions."""
+    return async_cached(TTLCache_final(maxsize, ttl))
+
+def async_multi_level_cache(l1_maxsize: int = 50, l2_maxsize: int = 200,
+                            l3_maxsize: int = 1000, l3_ttl: float = 3600.0):
+    """Multi-level cache decorator for coroutine functions."""
+    return async_cached(MultiLevelCache_final(l1_maxsize, l2_maxsize, l3_maxsize, l3_ttl))
+
+# New in Step 8: Real-world example with an async API client
+class AsyncWebAPICache:
+    """Async version of WebAPICache with request coalescing."""
+    
+    def __init__(self, ttl: float = 300.0):
+        self.request_count = 0
+        self.cache = AsyncCache(TTLCache_final(maxsize=1000, ttl=ttl))
+    
+    async def _request_user_data(self, user_id: int) -> dict:
+        """Simulate fetching user data from an external API."""
+        self.request_count += 1
+        await asyncio.sleep(0.1)  # Simulate network latency
+        return {
+            "id": user_id,
+            "name": f"User {user_id}",
+            "email": f"user{user_id}@example.com",
+            "last_login": time.time()
+        }
+    
+    async def fetch_user_data(self, user_id: int) -> dict:
+        """Fetch user data, sharing one request between concurrent callers."""
+        return await self.cache.get_or_compute(f"user_{user_id}", self._request_user_data, user_id)
+    
+    def get_stats(self) -> str:
+        return f"API calls made: {self.request_count}, {self.cache.cache_info()}"
+
+async def _demo_step8_async():
+    """Async part of the Step 8 demonstration."""
+    print("Testing request coalescing:")
+    api = AsyncWebAPICache()
+    
+    start_time = time.perf_counter()
+    results = await asyncio.gather(*(api.fetch_user_data(1) for _ in range(10)))
+    elapsed = time.perf_counter() - start_time
+    print(f"10 concurrent fetches of user 1 took {elapsed:.3f}s, "
+          f"all identical: {all(r is results[0] for r in results)}")
+    
+    await api.fetch_user_data(1)  # Served from the TTL cache
+    await asyncio.gather(*(api.fetch_user_data(uid) for uid in [2, 3, 2, 3]))
+    print(api.get_stats())
+    print()
+    
+    print("Testing cancellation safety:")
+    api = AsyncWebAPICache()
+    first = asyncio.ensure_future(api.fetch_user_data(7))
+    second = asyncio.ensure_future(api.fetch_user_data(7))
+    await asyncio.sleep(0.01)
+    first.cancel()  # Only this caller gives up
+    result = await second
+    print(f"First caller cancelled: {first.cancelled()}, "
+          f"second caller got: {result['name']}, API calls: {api.request_count}")
+    print()
+    
+    print("Testing async TTL expiration and decorator:")
+    call_count = 0
+    
+    @async_ttl_cache(maxsize=10, ttl=0.2)
+    async def lookup(n: int) -> int:
+        nonlocal call_count
+        call_count += 1
+        await asyncio.sleep(0.01)
+        return n * n
+    
+    await lookup(4)
+    await lookup(4)  # Cached
+    await asyncio.sleep(0.3)
+    await lookup(4)  # Expired, recomputed
+    print(f"lookup(4) computed {call_count} times")
+    print(lookup.cache_info())
+    print()
+    
+    print("Testing that failures are not cached:")
+    attempts = 0
+    
+    @async_lru_cache(maxsize=10)
+    async def flaky(n: int) -> int:
+        nonlocal attempts
+        attempts += 1
+        await asyncio.sleep(0.01)
+        if attempts == 1:
+            raise ConnectionError("temporary failure")
+        return n
+    
+    try:
+        await flaky(1)
+    except ConnectionError as e:
+        print(f"First call failed: {e}")
+    print(f"Retry returned {await flaky(1)} after {attempts} attempts")
+    
+    @async_multi_level_cache(l1_maxsize=2, l2_maxsize=4, l3_maxsize=8)
+    async def product(n: int) -> dict:
+        await asyncio.sleep(0.01)
+        return {"id": n}
+    
+    await asyncio.gather(*(product(i % 3) for i in range(9)))
+    print(product.cache_info())
+
+def demo_step8():
+    """Demonstrate asyncio-native caching."""
+    print("=== Step 8: Async Cache Decorators ===")
+    asyncio.run(_demo_step8_async())
+    print()
+
+if __name__ == "__main__":
+    demo_step1()
+    demo_step2()
+    demo_step3()
+    demo_step4()
+    demo_step5()
+    demo_step6()
+    demo_step7()
+    demo_step8()
@@ -635,6 +635,764 @@ for fib in fib_gen:
 print(f"Fibonacci: {fibs}")
 
 
+# Step 6: A Fused, Batched and Parallelizable Lazy Pipeline Engine
+# ===============================================================================
+
+# Explanation:
+# LazySequence wraps every stage in its own generator, so each element travels
+# through one generator frame per stage. LazyDataProcessor rebuilds its
+# filter/map chain on every take()/collect() call and re-reads the source each
+# time. The Pipeline class below fixes both problems:
+# - Stage fusion: consecutive map/filter stages run in ONE pass per batch
+# - Batched execution: the source is cut into batches of N items, so the fused
+#   loop and map_batches() stages are called once per batch, not once per item
+# - chunked_parallel(n_workers): batches are processed in a process pool with a
+#   bounded number of batches in flight (stage functions must be picklable,
+#   i.e. defined at module level)
+# - Memoized materialization: results produced by take()/collect() are kept, so
+#   calling take() twice never re-reads the source
+
+import os
+import pickle
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from typing import Tuple
+
+def _fuse(stages: Tuple[Tuple[str, Callable], ...]) -> Callable:
+    """Build one function that applies a run of map/filter stages in a single pass.
+    
+    The builtin map/filter iterators are chained over the batch, so each
+    element goes through every stage before the next one is read, with no
+    intermediate lists and the loop itself running in C.
+    """
+    steps = tuple((map if kind == "map" else filter, func) for kind, func in stages)
+    
+    def fused(batch: List[Any]) -> List[Any]:
+        items = batch
+        for apply, func in steps:
+            items = apply(func, items)
+        return list(items)
+    
+    return fused
+
+def _run_segments(segments: Tuple, batch: List[Any]) -> List[Any]:
+    """Push one batch through every segment (also used by worker processes)."""
+    for kind, payload in segments:
+        if kind == "fused":
+            batch = _fuse(payload)(batch)
+        else:  # "batch": a function that takes and returns a whole list
+            batch = list(payload(batch))
+        if not batch:
+            break
+    return batch
+
+class Pipeline:
+    """Lazy dataflow pipeline with stage fusion, batching and optional parallelism."""
+    
+    def __init__(self, source: Iterable, batch_size: int = 1024,
+                 _stages: Tuple = (), _workers: int = 0):
+        self._source = source
+        self.batch_size = batch_size
+        self._stages = _stages
+        self._workers = _workers
+        
+        # Memoized results
+        self._results = []
+        self._batches = None
+        self._exhausted = False
+    
+    def _derive(self, stage: Optional[Tuple] = None, workers: Optional[int] = None) -> 'Pipeline':
+        """Return a new pipeline with one more stage (pipelines are immutable)."""
+        stages = self._stages + (stage,) if stage else self._stages
+        return Pipeline(self._source, self.batch_size, stages,
+                        self._workers if workers is None else workers)
+    
+    def map(self, func: Callable[[Any], Any]) -> 'Pipeline':
+        """Transform each element."""
+        return self._derive(("map", func))
+    
+    def filter(self, predicate: Callable[[Any], bool]) -> 'Pipeline':
+        """Keep elements for which predicate is true."""
+        return self._derive(("filter", predicate))
+    
+    def map_batches(self, func: Callable[[List[Any]], Iterable]) -> 'Pipeline':
+        """Transform a whole batch at once (e.g. a vectorized NumPy function)."""
+        return self._derive(("batch", func))
+    
+    def chunked_parallel(self, n_workers: Optional[int] = None) -> 'Pipeline':
+        """Execute batches in a pool of worker processes."""
+        return self._derive(workers=n_workers or os.cpu_count() or 1)
+    
+    def _plan(self) -> Tuple:
+        """Group consecutive map/filter stages into fused segments."""
+        segments = []
+        run = []
+        for kind, func in self._stages:
+            if kind == "batch":
+                if run:
+                    segments.append(("fused", tuple(run)))
+                    run = []
+                segments.append(("batch", func))
+            else:
+                run.append((kind, func))
+        if run:
+            segments.append(("fused", tuple(run)))
+        return tuple(segments)
+    
+    def _source_batches(self) -> Iterator[List[Any]]:
+        """Cut the source into lists of batch_size items."""
+        iterator = iter(self._source)
+        while True:
+            batch = list(islice(iterator, self.batch_size))
+            if not batch:
+                return
+            yield batch
+    
+    def iter_batches(self) -> Iterator[List[Any]]:
+        """Execute the pipeline and yield output batches (not memoized)."""
+        segments = self._plan()
+        if self._workers <= 1:
+            for batch in self._source_batches():
+                batch = _run_segments(segments, batch)
+                if batch:
+                    yield batch
+            return
+        
+        try:
+            pickle.dumps(segments)
+        except (pickle.PicklingError, AttributeError, TypeError) as e:
+            raise TypeError("chunked_parallel() needs picklable stage functions "
+                            "(define them at module level, not as lambdas)") from e
+        
+        # Keep a bounded window of batches in flight so the source is read lazily
+        max_in_flight = self._workers * 2
+        with ProcessPoolExecutor(max_workers=self._workers) as pool:
+            pending = deque()
+            for batch in self._source_batches():
+                pending.append(pool.submit(_run_segments, segments, batch))
+                if len(pending) >= max_in_flight:
+                    result = pending.popleft().result()
+                    if result:
+                        yield result
+            while pending:
+                result = pending.popleft().result()
+                if result:
+                    yield result
+    
+    def _fill(self, n: Optional[int] = None) -> None:
+        """Run the pipeline until at least n results are memoized (or it ends)."""
+        if self._batches is None:
+            self._batches = self.iter_batches()
+        while not self._exhausted and (n is None or len(self._results) < n):
+            try:
+                self._results.extend(next(self._batches))
+            except StopIteration:
+                self._exhausted = True
+                self._batches = None
+    
+    def take(self, n: int) -> List[Any]:
+        """Return the first n results, computing only as many batches as needed."""
+        self._fill(n)
+        return self._results[:n]
+    
+    def collect(self) -> List[Any]:
+        """Return all results."""
+        self._fill()
+        return list(self._results)
+    
+    def __iter__(self) -> Iterator[Any]:
+        """Iterate over results, reusing anything already materialized."""
+        index = 0
+        while True:
+            while index < len(self._results):
+                yield self._results[index]
+                index += 1
+            if self._exhausted:
+                return
+            self._fill(index + 1)
+    
+    def count(self) -> int:
+        """Count all results.
+        
+        The results are memoized like collect(), because the source may be a
+        one-shot iterator that take() has already partly consumed.
+        """
+        self._fill()
+        return len(self._results)
+
+# Module-level stage functions, so they can be pickled for chunked_parallel()
+def _is_even(x: int) -> bool:
+    return x % 2 == 0
+
+def _square(x: int) -> int:
+    return x * x
+
+def _not_multiple_of_three(x: int) -> bool:
+    return x % 3 != 0
+
+def _add_one(x: int) -> int:
+    return x + 1
+
+def benchmark_lazy_pipeline(n: int = 10_000_000, workers: Optional[int] = None) -> None:
+    """Compare the Pipeline engine with chained generators on an n-element pipeline."""
+    print(f"Benchmark: filter -> map -> filter -> map over {n:,} elements")
+    
+    def nested_generators():
+        # Same shape as LazySequence (one generator per stage), minus the printing
+        def source():
+            yield from range(n)
+        def filter_stage(gen_func, predicate):
+            return lambda: (x for x in gen_func() if predicate(x))
+        def map_stage(gen_func, func):
+            return lambda: (func(x) for x in gen_func())
+        chain = filter_stage(source, _is_even)
+        chain = map_stage(chain, _square)
+        chain = filter_stage(chain, _not_multiple_of_three)
+        chain = map_stage(chain, _add_one)
+        return list(chain())
+    
+    def builtin_chain():
+        # Same shape as LazyDataProcessor.collect()
+        return list(map(_add_one, filter(_not_multiple_of_three,
+                                         map(_square, filter(_is_even, range(n))))))
+    
+    def fused_pipeline(parallel_workers: int = 0):
+        pipeline = (Pipeline(range(n), batch_size=65536)
+                    .filter(_is_even).map(_square)
+                    .filter(_not_multiple_of_three).map(_add_one))
+        if parallel_workers:
+            pipeline = pipeline.chunked_parallel(parallel_workers)
+        return pipeline.collect()
+    
+    timings = {}
+    reference = None
+    candidates = [
+        ("Nested generators (LazySequence)", nested_generators),
+        ("filter/map chain (LazyDataProcessor)", builtin_chain),
+        ("Fused batched Pipeline", fused_pipeline),
+    ]
+    workers = workers or os.cpu_count() or 1
+    if workers > 1:
+        candidates.append((f"Pipeline.chunked_parallel({workers})",
+                           lambda: fused_pipeline(workers)))
+    
+    for name, func in candidates:
+        start_time = time.time()
+        result = func()
+        timings[name] = time.time() - start_time
+        if reference is None:
+            reference = result
+        status = "OK" if result == reference else "MISMATCH"
+        print(f"  {name:40s} {timings[name]:.3f}s  [{status}]")
+        del result
+    
+    baseline = timings["Nested generators (LazySequence)"]
+    for name, elapsed in timings.items():
+        print(f"  {name:40s} {baseline / elapsed:.2f}x vs nested generators")
+
+# Step 6 demonstration
+# (guarded because worker processes may re-import this module on start-up)
+if __name__ == "__main__":
+    print("\n=== Step 6: Fused Lazy Pipeline Engine ===")
+    
+    reads = 0
+    def counting_source(limit):
+        global reads
+        for i in range(limit):
+            reads += 1
+            yield i
+    
+    pipeline = (Pipeline(counting_source(1_000_000), batch_size=100)
+                .filter(lambda x: x % 2 == 0)
+                .map(lambda x: x * x)
+                .filter(lambda x: x > 10))
+    print(f"First take(3): {pipeline.take(3)}, source items read: {reads}")
+    print(f"Second take(3): {pipeline.take(3)}, source items read: {reads} (memoized)")
+    print(f"take(5): {pipeline.take(5)}, source items read: {reads}")
+    
+    print("\nBatch stage (whole-batch function) between fused stages:")
+    batched = (Pipeline(range(20), batch_size=8)
+               .map(lambda x: x * 10)
+               .map_batches(lambda batch: [sum(batch)])
+               .filter(lambda total: total > 0))
+    print(f"Per-batch sums: {batched.collect()}")
+    
+    print()
+    benchmark_lazy_pipeline(n=1_000_000)
+    print("(Call benchmark_lazy_pipeline() for the full 10M-element comparison.)")
+
+
+# Step 7: Streaming File Pipeline with Backpressure
+# ===============================================================================
+
+# Explanation:
+# process_large_file_lazy() (Step 2) and Pipeline (Step 6) pull every item
+# through one thread, so reading, decoding, parsing and the downstream work
+# never overlap, and each ETL job glues its own decode/parse/batch steps
+# around them. StreamingPipeline runs every stage in its own thread and
+# connects the stages with bounded queues:
+# - Backpressure: a full queue blocks the stage feeding it, so a slow
+#   consumer caps how far ahead the file is read
+# - Stages: decode (bytes -> lines), parse, filter, map and batch
+# - Items travel between stages in chunks to amortize queue overhead
+# - parse/filter/map can fan out to a thread or process pool; results are
+#   emitted in source order
+# - Per-stage counters: items in/out, busy time, and time spent starved
+#   (waiting for input) or blocked (waiting for a full downstream queue)
+
+import codecs
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+_END = object()
+
+def read_blocks(filename: str, block_size: int = 1 << 16) -> Iterator[bytes]:
+    """Binary counterpart of process_large_file_lazy(): yield raw blocks."""
+    with open(filename, 'rb') as file:
+        while True:
+            block = file.read(block_size)
+            if not block:
+                return
+            yield block
+
+def _run_stage_chunk(kind: str, func: Callable, items: List[Any]) -> Tuple[List[Any], float]:
+    """Apply a stateless stage to one chunk (also used by worker processes)."""
+    start = time.perf_counter()
+    if kind == "map":
+        out = [func(item) for item in items]
+    elif kind == "parse":
+        out = [record for record in map(func, items) if record is not None]
+    else:  # "filter"
+        out = [item for item in items if func(item)]
+    return out, time.perf_counter() - start
+
+class _LineDecoder:
+    """Incremental bytes -> lines; lines and characters may span blocks."""
+    
+    def __init__(self, encoding: str, errors: str):
+        self._decoder = codecs.getincrementaldecoder(encoding)(errors)
+        self._tail = ""
+    
+    def __call__(self, blocks: List[bytes]) -> List[str]:
+        text = self._tail + "".join(self._decoder.decode(block) for block in blocks)
+        if "\r" in text:
+            text = text.replace("\r\n", "\n")
+        lines = text.split("\n")
+        self._tail = lines.pop()
+        return lines
+    
+    def flush(self) -> List[str]:
+        text = (self._tail + self._decoder.decode(b"", final=True)).replace("\r\n", "\n")
+        self._tail = ""
+        lines = text.split("\n")
+        if not lines[-1]:
+            lines.pop()
+        return lines
+
+class _Batcher:
+    """Regroup the item stream into lists of exactly `size` (the last may be short)."""
+    
+    def __init__(self, size: int):
+        self.size = size
+        self._buffer = []
+    
+    def __call__(self, items: List[Any]) -> List[List[Any]]:
+        buffer = self._buffer
+        buffer.extend(items)
+        if len(buffer) < self.size:
+            return []
+        cut = len(buffer) - len(buffer) % self.size
+        batches = [buffer[i:i + self.size] for i in range(0, cut, self.size)]
+        self._buffer = buffer[cut:]
+        return batches
+    
+    def flush(self) -> List[List[Any]]:
+        batches = [self._buffer] if self._buffer else []
+        self._buffer = []
+        return batches
+
+class StageStats:
+    """Throughput counters for one stage of a StreamingPipeline run."""
+    __slots__ = ('name', 'items_in', 'items_out', 'chunks', 'busy', 'starved',
+                 'blocked', 'started', 'finished')
+    
+    def __init__(self, name: str):
+        self.name = name
+        self.items_in = 0
+        self.items_out = 0
+        self.chunks = 0
+        self.busy = 0.0
+        self.starved = 0.0
+        self.blocked = 0.0
+        self.started = None
+        self.finished = None
+    
+    @property
+    def elapsed(self) -> float:
+        if self.started is None:
+            return 0.0
+        return (self.finished or time.perf_counter()) - self.started
+    
+    @property
+    def throughput(self) -> float:
+        """Items emitted per second of wall time."""
+        return self.items_out / self.elapsed if self.elapsed else 0.0
+    
+    @property
+    def capacity(self) -> float:
+        """Items per second this stage could take if it never waited."""
+        return self.items_in / self.busy if self.busy else 0.0
+    
+    def to_dict(self) -> dict:
+        return {name: getattr(self, name) for name in self.__slots__} | {
+            'elapsed': self.elapsed, 'throughput': self.throughput, 'capacity': self.capacity}
+
+class StreamingPipeline:
+    """Threaded pipeline of decode/parse/filter/map/batch stages with bounded queues."""
+    
+    def __init__(self, source: Iterable, chunk_size: int = 512, queue_size: int = 4,
+                 _stages: Tuple = ()):
+        self._source = source
+        self.chunk_size = chunk_size  # source items per queue transfer
+        self.queue_size = queue_size  # chunks buffered between two stages
+        self._stages = _stages
+        self.stats: List[StageStats] = []
+        self._stop = threading.Event()
+        self._error = None
+    
+    @classmethod
+    def from_file(cls, filename: str, block_size: int = 1 << 16,
+                  queue_size: int = 4) -> 'StreamingPipeline':
+        """Stream a file as raw blocks; follow with decode()."""
+        return cls(read_blocks(filename, block_size), chunk_size=1, queue_size=queue_size)
+    
+    def _derive(self, stage: Tuple) -> 'StreamingPipeline':
+        """Return a new pipeline with one more stage (pipelines are immutable)."""
+        return StreamingPipeline(self._source, self.chunk_size, self.queue_size,
+                                 self._stages + (stage,))
+    
+    def _stateless(self, kind: str, func: Callable, workers: int, mode: str) -> 'StreamingPipeline':
+        if mode not in ("thread", "process"):
+            raise ValueError(f"mode must be 'thread' or 'process', not {mode!r}")
+        return self._derive((kind, func, workers, mode))
+    
+    def decode(self, encoding: str = "utf-8", errors: str = "strict") -> 'StreamingPipeline':
+        """Turn byte blocks into lines (without line endings)."""
+        return self._derive(("decode", (encoding, errors), 0, "thread"))
+    
+    def parse(self, func: Callable[[str], Any], workers: int = 0,
+              mode: str = "thread") -> 'StreamingPipeline':
+        """Turn each line into a record; func returns None for lines to drop."""
+        return self._stateless("parse", func, workers, mode)
+    
+    def filter(self, predicate: Callable[[Any], bool], workers: int = 0,
+               mode: str = "thread") -> 'StreamingPipeline':
+        """Keep items for which predicate is true."""
+        return self._stateless("filter", predicate, workers, mode)
+    
+    def map(self, func: Callable[[Any], Any], workers: int = 0,
+            mode: str = "thread") -> 'StreamingPipeline':
+        """Transform each item."""
+        return self._stateless("map", func, workers, mode)
+    
+    def batch(self, size: int) -> 'StreamingPipeline':
+        """Emit lists of `size` items, e.g. for executemany() or bulk writes."""
+        if size < 1:
+            raise ValueError("batch size must be >= 1")
+        return self._derive(("batch", size, 0, "thread"))
+    
+    def _fail(self, error: BaseException) -> None:
+        if self._error is None:
+            self._error = error
+        self._stop.set()
+    
+    def _put(self, outbox: queue.Queue, chunk: Any, stats: StageStats) -> bool:
+        """Put with backpressure; returns False if the run was stopped."""
+        start = time.perf_counter()
+        try:
+            while not self._stop.is_set():
+                try:
+                    outbox.put(chunk, timeout=0.05)
+                    return True
+                except queue.Full:
+                    continue
+            return False
+        finally:
+            stats.blocked += time.perf_counter() - start
+    
+    def _get(self, inbox: queue.Queue, stats: StageStats) -> Any:
+        """Get the next chunk, _END, or None if the run was stopped."""
+        start = time.perf_counter()
+        try:
+            while not self._stop.is_set():
+                try:
+                    return inbox.get(timeout=0.05)
+                except queue.Empty:
+                    continue
+            return None
+        finally:
+            stats.starved += time.perf_counter() - start
+    
+    def _run_source(self, outbox: queue.Queue, stats: StageStats) -> None:
+        stats.started = time.perf_counter()
+        try:
+            iterator = iter(self._source)
+            while True:
+                start = time.perf_counter()
+                chunk = list(islice(iterator, self.chunk_size))
+                stats.busy += time.perf_counter() - start
+                if not chunk:
+                    break
+                stats.items_in += len(chunk)
+                stats.items_out += len(chunk)
+                stats.chunks += 1
+                if not self._put(outbox, chunk, stats):
+                    return
+            self._put(outbox, _END, stats)
+        except BaseException as e:
+            self._fail(e)
+        finally:
+            stats.finished = time.perf_counter()
+    
+    def _emit(self, outbox: queue.Queue, out: List[Any], stats: StageStats) -> bool:
+        if not out:
+            return True
+        stats.items_out += len(out)
+        return self._put(outbox, out, stats)
+    
+    def _run_stage(self, stage: Tuple, inbox: queue.Queue, outbox: queue.Queue,
+                   stats: StageStats) -> None:
+        kind, arg, workers, mode = stage
+        stats.started = time.perf_counter()
+        executor = None
+        try:
+            if kind in ("decode", "batch"):
+                handler = _LineDecoder(*arg) if kind == "decode" else _Batcher(arg)
+            elif workers:
+                pool_class = ProcessPoolExecutor if mode == "process" else ThreadPoolExecutor
+                executor = pool_class(max_workers=workers)
+            pending = deque()
+            
+            def emit_result(future) -> bool:
+                out, busy = future.result()
+                stats.busy += busy
+                return self._emit(outbox, out, stats)
+            
+            while True:
+                # Hand over finished results before possibly waiting for input
+                while pending and pending[0].done():
+                    if not emit_result(pending.popleft()):
+                        return
+                chunk = self._get(inbox, stats)
+                if chunk is None:
+                    return
+                if chunk is _END:
+                    break
+                stats.items_in += len(chunk)
+                stats.chunks += 1
+                if executor is not None:
+                    pending.append(executor.submit(_run_stage_chunk, kind, arg, chunk))
+                    # Bounded in-flight window: backpressure reaches the pool too
+                    if len(pending) >= workers * 2 and not emit_result(pending.popleft()):
+                        return
+                    continue
+                if kind in ("decode", "batch"):
+                    start = time.perf_counter()
+                    out = handler(chunk)
+                    stats.busy += time.perf_counter() - start
+                else:
+                    out, busy = _run_stage_chunk(kind, arg, chunk)
+                    stats.busy += busy
+                if not self._emit(outbox, out, stats):
+                    return
+            
+            while pending:
+                if not emit_result(pending.popleft()):
+                    return
+            if kind in ("decode", "batch") and not self._emit(outbox, handler.flush(), stats):
+                return
+            self._put(outbox, _END, stats)
+        except BaseException as e:
+            self._fail(e)
+        finally:
+            if executor is not None:
+                executor.shutdown(wait=True, cancel_futures=True)
+            stats.finished = time.perf_counter()
+    
+    def __iter__(self) -> Iterator[Any]:
+        """Start the stage threads and yield the final stage's items."""
+        for kind, func, workers, mode in self._stages:
+            if workers and mode == "process":
+                try:
+                    pickle.dumps(func)
+                except (pickle.PicklingError, AttributeError, TypeError) as e:
+                    raise TypeError(f"{kind}() with mode='process' needs a picklable "
+                                    "function (define it at module level)") from e
+        
+        self._stop = threading.Event()
+        self._error = None
+        self.stats = [StageStats("source")] + [StageStats(stage[0]) for stage in self._stages]
+        queues = [queue.Queue(self.queue_size) for _ in range(len(self._stages) + 1)]
+        threads = [threading.Thread(target=self._run_source, args=(queues[0], self.stats[0]),
+                                    daemon=True)]
+        for i, stage in enumerate(self._stages):
+            threads.append(threading.Thread(
+                target=self._run_stage, args=(stage, queues[i], queues[i + 1], self.stats[i + 1]),
+                daemon=True))
+        for thread in threads:
+            thread.start()
+        
+        consumer = StageStats("consumer")
+        try:
+            while True:
+                chunk = self._get(queues[-1], consumer)
+                if chunk is None or chunk is _END:
+                    break
+                yield from chunk
+        finally:
+            # Also runs when the consumer stops early: unblock and join every stage
+            self._stop.set()
+            for thread in threads:
+                thread.join()
+        if self._error is not None:
+            raise self._error
+    
+    def collect(self) -> List[Any]:
+        """Run to completion and return every item."""
+        return list(self)
+    
+    def run(self, sink: Optional[Callable[[Any], Any]] = None) -> int:
+        """Run to completion, passing each item to sink; returns the item count."""
+        count = 0
+        for item in self:
+            if sink is not None:
+                sink(item)
+            count += 1
+        return count
+    
+    def print_stats(self) -> None:
+        """Per-stage counters of the last run."""
+        print(f"  {'stage':<8} {'in':>9} {'out':>9} {'items/s':>10} {'capacity/s':>11} "
+              f"{'busy':>7} {'starved':>8} {'blocked':>8}")
+        for stats in self.stats:
+            print(f"  {stats.name:<8} {stats.items_in:>9,} {stats.items_out:>9,} "
+                  f"{stats.throughput:>10,.0f} {stats.capacity:>11,.0f} {stats.busy:>6.2f}s "
+                  f"{stats.starved:>7.2f}s {stats.blocked:>7.2f}s")
+
+# Module-level stage functions, so they can be pickled for mode='process'
+def _parse_event(line: str) -> Optional[Tuple]:
+    parts = line.split(",")
+    if len(parts) != 4:
+        return None
+    try:
+        return int(parts[0]), parts[1], parts[2], float(parts[3])
+    except ValueError:
+        return None
+
+def _is_not_debug(event: Tuple) -> bool:
+    return event[2] != "DEBUG"
+
+def _enrich_event(event: Tuple) -> dict:
+    event_id, user, level, latency = event
+    return {'id': event_id, 'user': user.upper(), 'level': level,
+            'latency': latency, 'slow': latency > 250.0}
+
+def _write_event_file(filename: str, lines: int) -> None:
+    levels = ("DEBUG", "INFO", "WARN", "ERROR")
+    with open(filename, "w") as file:
+        for i in range(lines):
+            if i % 997 == 0:
+                file.write("malformed line\n")
+            else:
+                file.write(f"{i},user{i % 5000},{levels[i % 4]},{(i * 37) % 500 / 1.7:.2f}\n")
+
+def benchmark_streaming_pipeline(lines: int = 500_000, workers: int = 2) -> None:
+    """Hand-glued generators vs StreamingPipeline on a decode/parse/filter/map/batch job."""
+    import tempfile
+    
+    print(f"Benchmark: decode -> parse -> filter -> map -> batch(1000) over {lines:,} lines "
+          f"({os.cpu_count()} CPU)")
+    fd, path = tempfile.mkstemp(suffix=".csv")
+    os.close(fd)
+    try:
+        _write_event_file(path, lines)
+        
+        def hand_glued():
+            # What every job used to write around process_large_file_lazy()
+            batches, batch = 0, []
+            with open(path, "r") as file:
+                for line in file:
+                    event = _parse_event(line.rstrip("\n"))
+                    if event is None or not _is_not_debug(event):
+                        continue
+                    batch.append(_enrich_event(event))
+                    if len(batch) == 1000:
+                        batches += 1
+                        batch = []
+            return batches + (1 if batch else 0)
+        
+        def streaming(parse_workers: int = 0, mode: str = "thread"):
+            pipeline = (StreamingPipeline.from_file(path)
+                        .decode()
+                        .parse(_parse_event, workers=parse_workers, mode=mode)
+                        .filter(_is_not_debug)
+                        .map(_enrich_event)
+                        .batch(1000))
+            return pipeline.run(), pipeline
+        
+        start = time.perf_counter()
+        reference = hand_glued()
+        baseline = time.perf_counter() - start
+        print(f"  {'Hand-glued generators':40s} {baseline:.3f}s  {reference} batches")
+        
+        for label, parse_workers, mode in (("StreamingPipeline", 0, "thread"),
+                                           (f"StreamingPipeline, parse x{workers} processes",
+                                            workers, "process")):
+            start = time.perf_counter()
+            batches, pipeline = streaming(parse_workers, mode)
+            elapsed = time.perf_counter() - start
+            status = "OK" if batches == reference else "MISMATCH"
+            print(f"  {label:40s} {elapsed:.3f}s  {batches} batches [{status}], "
+                  f"{baseline / elapsed:.2f}x")
+            pipeline.print_stats()
+    finally:
+        os.remove(path)
+
+# Step 7 demonstration
+if __name__ == "__main__":
+    print("\n=== Step 7: Streaming Pipeline with Backpressure ===")
+    
+    print("Composing with process_large_file_lazy() from Step 2:")
+    lazy_lines = (StreamingPipeline(process_large_file_lazy("nonexistent_file.txt"), chunk_size=2)
+                  .map(str.lower)
+                  .batch(2))
+    print(f"Batches: {lazy_lines.collect()}")
+    
+    read = 0
+    def counting_lines(limit):
+        global read
+        for i in range(limit):
+            read += 1
+            yield f"{i},user{i % 10},INFO,{i % 300}.0"
+    
+    slow = (StreamingPipeline(counting_lines(1_000_000), chunk_size=100, queue_size=2)
+            .parse(_parse_event)
+            .map(_enrich_event))
+    consumed = 0
+    for record in slow:
+        consumed += 1
+        if consumed % 1000 == 0:
+            time.sleep(0.01)  # slow consumer
+        if consumed == 5000:
+            break
+    print(f"\nSlow consumer took {consumed:,} records; source read {read:,} of 1,000,000 "
+          f"(backpressure bounds the read-ahead)")
+    
+    print()
+    benchmark_streaming_pipeline()
+
 # ===============================================================================
 #                              COMPLETE EXAMPLE
 # ===============================================================================
@@ -1375,6 +1375,773 @@ def demonstrate_complete_optimization():
     
     return log_result, html_report, csv_result, benchmarks
 
+# Step 6: Build upon Steps 1-5 - Columnar log and CSV processing
+# ===============================================================================
+
+# Explanation:
+# optimize_log_processing() builds a dict for every line and then loops again to
+# count levels; process_csv_data() splits on ',' (breaking quoted fields) and
+# rescans every row once per column. Both also need the whole input as a list.
+# A columnar approach fixes all three:
+# - read the input in large chunks straight from a file object
+# - parse a whole chunk at once (one regex pass, or the C csv parser) and
+#   transpose it into column arrays instead of per-row dicts
+# - dictionary-encode repeated strings (log levels) into a compact array('H')
+#   and aggregate each column with a single C-level operation
+#   (np.bincount / Counter, map(float), min/max/sum)
+
+# All code from Steps 1-5 (see above), plus:
+import csv
+import io
+from array import array
+from collections import Counter
+from bisect import bisect_right
+from itertools import islice, zip_longest
+from operator import itemgetter
+
+try:
+    import numpy as np
+    HAS_NUMPY = True
+except ImportError:
+    HAS_NUMPY = False
+
+# New code for Step 6:
+# "timestamp level message" after stripping, split on single spaces like
+# line.strip().split(' ', 2); lines that do not match get the level ''.
+# Used when NumPy is not installed.
+LOG_LINE_PATTERN = re.compile(
+    r'^[ \t\r\f\v]*(\S+) (\S+) ([^\n]*\S)[ \t\r\f\v]*$', re.MULTILINE)
+
+# Level names up to this many bytes are grouped with one np.unique call;
+# longer ones (rare, usually malformed lines) are decoded one by one
+MAX_LEVEL_KEY_BYTES = 32
+
+class StringColumn:
+    """Strings stored Arrow-style: raw chunk buffers plus start/end offsets.
+    
+    No str object is created until a value is actually read.
+    """
+    
+    def __init__(self):
+        self._chunks = []        # (buffer, starts, ends)
+        self._boundaries = []    # cumulative row count after each chunk
+        self._length = 0
+    
+    def append_chunk(self, buffer: bytes, starts, ends):
+        if len(starts):
+            self._chunks.append((buffer, starts, ends))
+            self._length += len(starts)
+            self._boundaries.append(self._length)
+    
+    def __len__(self) -> int:
+        return self._length
+    
+    def __getitem__(self, index: int) -> str:
+        if index < 0:
+            index += self._length
+        if not 0 <= index < self._length:
+            raise IndexError("column index out of range")
+        chunk = bisect_right(self._boundaries, index)
+        offset = index - (self._boundaries[chunk - 1] if chunk else 0)
+        buffer, starts, ends = self._chunks[chunk]
+        return buffer[starts[offset]:ends[offset]].decode('utf-8', 'replace')
+
+class LogColumns:
+    """Column-oriented storage for parsed log lines."""
+    
+    def __init__(self, use_offsets: bool = False):
+        self.timestamps = StringColumn() if use_offsets else []
+        self.level_codes = array('H')       # index into self.levels
+        self.messages = StringColumn() if use_offsets else []
+        self.levels: List[str] = []         # dictionary for level_codes
+        self._level_ids: Dict[str, int] = {}
+    
+    def level_id(self, level: str) -> int:
+        """Code for a level name, growing the dictionary as needed."""
+        code = self._level_ids.get(level)
+        if code is None:
+            code = self._level_ids[level] = len(self.levels)
+            self.levels.append(level)
+        return code
+    
+    def encode_levels(self, levels) -> array:
+        """Map level strings to small integer codes."""
+        for level in set(levels) - self._level_ids.keys():
+            self.level_id(level)
+        return array('H', map(self._level_ids.__getitem__, levels))
+    
+    def __len__(self) -> int:
+        return len(self.level_codes)
+    
+    def __getitem__(self, index: int) -> Dict[str, str]:
+        """Materialize one row as the dict format of optimize_log_processing()."""
+        return {
+            'timestamp': self.timestamps[index],
+            'level': self.levels[self.level_codes[index]],
+            'message': self.messages[index],
+        }
+
+def iter_text_chunks(source, chunk_size: int = 1 << 20, batch_lines: int = 65536) -> Iterator[tuple]:
+    """Yield (text, line_count) chunks made of whole lines.
+    
+    `source` is a file object (text or binary, read in chunk_size pieces)
+    or any iterable of lines, such as a list of strings.
+    """
+    if hasattr(source, 'read'):
+        carry = None
+        while True:
+            block = source.read(chunk_size)
+            if not block:
+                break
+            block = carry + block if carry else block
+            newline = '\n' if isinstance(block, str) else b'\n'
+            cut = block.rfind(newline) + 1
+            carry = block[cut:]
+            if cut:
+                yield block[:cut], block.count(newline, 0, cut)
+        if carry:
+            yield carry, 1
+    else:
+        iterator = iter(source)
+        while True:
+            batch = list(islice(iterator, batch_lines))
+            if not batch:
+                break
+            # Lines that keep their '\n' just produce blank gaps that never
+            # match, so the per-line count stays len(batch) either way
+            yield "\n".join(batch), len(batch)
+
+def _is_ascii_space(values):
+    """Vectorized bytes.isspace() for a uint8 array."""
+    return (values == 32) | ((values >= 9) & (values <= 13))
+
+def parse_log_chunk_numpy(buffer: bytes) -> Dict[str, Any]:
+    """Locate the timestamp/level/message fields of every line with array ops.
+    
+    Returns offset arrays for the lines that have all three fields, with the
+    same rules as line.strip().split(' ', 2): fields are separated by single
+    spaces after leading/trailing whitespace is removed.
+    """
+    data = np.frombuffer(buffer, dtype=np.uint8)
+    size = len(data)
+    newlines = np.flatnonzero(data == 10)
+    starts = np.concatenate(([0], newlines + 1))
+    ends = np.concatenate((newlines, [size]))
+    if size and data[-1] == 10:
+        starts, ends = starts[:-1], ends[:-1]   # no line after the final '\n'
+    
+    empty = {'ts_start': starts[:0], 'ts_end': starts[:0], 'level_start': starts[:0],
+             'level_end': starts[:0], 'msg_start': starts[:0], 'msg_end': starts[:0]}
+    spaces = np.flatnonzero(data == 32)
+    if len(spaces) < 2:
+        return empty
+    
+    # Strip every line (= str.strip()). Only lines that really start or end
+    # with whitespace need the slower search over all non-whitespace bytes.
+    line_start, line_end = starts.copy(), ends.copy()
+    nonblank = starts < ends
+    lead = nonblank & _is_ascii_space(data[np.minimum(starts, size - 1)])
+    trail = nonblank & _is_ascii_space(data[np.maximum(ends - 1, 0)])
+    if lead.any() or trail.any():
+        content = np.flatnonzero(~_is_ascii_space(data))
+        if not len(content):
+            return empty
+        first = np.searchsorted(content, starts[lead])
+        line_start[lead] = np.where(first < len(content),
+                                    content[np.minimum(first, len(content) - 1)], ends[lead])
+        last = np.searchsorted(content, ends[trail]) - 1
+        line_end[trail] = np.where(last >= 0, content[np.maximum(last, 0)] + 1, starts[trail])
+    has_content = line_start < line_end
+    
+    # The first two spaces after the stripped start delimit the fields
+    k = np.searchsorted(spaces, line_start)
+    has_two = k + 1 < len(spaces)
+    space1 = spaces[np.minimum(k, len(spaces) - 1)]
+    space2 = spaces[np.minimum(k + 1, len(spaces) - 1)]
+    valid = has_content & has_two & (space2 < line_end) & (space2 > space1 + 1)
+    
+    return {
+        'ts_start': line_start[valid], 'ts_end': space1[valid],
+        'level_start': space1[valid] + 1, 'level_end': space2[valid],
+        'msg_start': space2[valid] + 1, 'msg_end': line_end[valid],
+    }
+
+class ColumnarStringOptimizationSuite(StringOptimizationSuite):
+    """StringOptimizationSuite with bulk, columnar, streaming parsers."""
+    
+    def _count_chunk_numpy(self, buffer: bytes, columns: LogColumns,
+                           level_totals: Counter, keep_columns: bool):
+        """Vectorized path: offsets from parse_log_chunk_numpy, levels via np.unique."""
+        fields = parse_log_chunk_numpy(buffer)
+        level_start, level_end = fields['level_start'], fields['level_end']
+        if not len(level_start):
+            return
+        data = np.frombuffer(buffer, dtype=np.uint8)
+        
+        # Gather each level's bytes into a fixed-width key and group them all at once
+        lengths = level_end - level_start
+        width = int(min(lengths.max(), MAX_LEVEL_KEY_BYTES))
+        width = 8 if width <= 8 else width   # short levels sort as plain uint64
+        short = np.flatnonzero(lengths <= width)
+        columns_idx = np.arange(width)
+        positions = np.minimum(level_start[short, None] + columns_idx, len(data) - 1)
+        keys = np.where(columns_idx < lengths[short, None], data[positions], 0).astype(np.uint8)
+        keys = np.ascontiguousarray(keys).view('<u8' if width == 8 else f'V{width}').ravel()
+        _, first, inverse, counts = np.unique(keys, return_index=True,
+                                              return_inverse=True, return_counts=True)
+        
+        # Only one decode per distinct level per chunk
+        mapping = np.array([
+            columns.level_id(buffer[level_start[short[i]]:level_end[short[i]]].decode('utf-8', 'replace'))
+            for i in first], dtype=np.uint16)
+        codes = np.empty(len(level_start), dtype=np.uint16)
+        codes[short] = mapping[inverse.ravel()]
+        for code, count in zip(mapping, counts):
+            level_totals[columns.levels[code]] += int(count)
+        for i in np.flatnonzero(lengths > width):
+            level = buffer[level_start[i]:level_end[i]].decode('utf-8', 'replace')
+            codes[i] = columns.level_id(level)
+            level_totals[level] += 1
+        
+        if keep_columns:
+            columns.timestamps.append_chunk(buffer, fields['ts_start'], fields['ts_end'])
+            columns.level_codes.frombytes(codes.tobytes())
+            columns.messages.append_chunk(buffer, fields['msg_start'], fields['msg_end'])
+    
+    def _count_chunk_regex(self, text: str, columns: LogColumns,
+                           level_totals: Counter, keep_columns: bool):
+        """Fallback path: one regex pass per chunk, transposed with zip()."""
+        matches = LOG_LINE_PATTERN.findall(text)
+        if not matches:
+            return
+        timestamps, levels, messages = zip(*matches)
+        level_totals.update(levels)
+        if keep_columns:
+            columns.timestamps.extend(timestamps)
+            columns.level_codes.extend(columns.encode_levels(levels))
+            columns.messages.extend(messages)
+    
+    def optimize_log_processing(self, log_source, keep_columns: bool = True,
+                                chunk_size: int = 1 << 20) -> Dict[str, Any]:
+        """Parse logs chunk by chunk into columns and count levels in bulk.
+        
+        Accepts a file object (text or binary) or any iterable of lines.
+        With keep_columns=False only the aggregates are kept, so memory stays
+        flat no matter how large the input is.
+        """
+        start_time = time.time()
+        columns = LogColumns(use_offsets=HAS_NUMPY)
+        level_totals = Counter()
+        total_lines = 0
+        
+        for chunk, line_count in iter_text_chunks(log_source, chunk_size):
+            total_lines += line_count
+            if HAS_NUMPY:
+                buffer = chunk.encode('utf-8') if isinstance(chunk, str) else chunk
+                self._count_chunk_numpy(buffer, columns, level_totals, keep_columns)
+            else:
+                text = chunk.decode('utf-8', 'replace') if isinstance(chunk, bytes) else chunk
+                self._count_chunk_regex(text, columns, level_totals, keep_columns)
+        
+        unmatched = total_lines - sum(level_totals.values())
+        if unmatched:
+            level_totals[''] += unmatched
+        
+        self.builder.clear()
+        self.builder.append_line("LOG ANALYSIS REPORT")
+        self.builder.append_line("=" * 40)
+        self.builder.append_line()
+        for level, count in level_totals.most_common():
+            self.builder.append_line(f"{level}: {count} entries")
+        self.builder.append_line()
+        self.builder.append_line(f"Total entries: {total_lines}")
+        
+        processing_time = time.time() - start_time
+        self.builder.append_line(f"Processing time: {processing_time:.4f} seconds")
+        
+        return {
+            'report': self.builder.build(),
+            'columns': columns if keep_columns else None,
+            'level_counts': dict(level_totals),
+            'total_entries': total_lines,
+            'processing_time': processing_time
+        }
+    
+    def process_csv_data(self, csv_source, keep_columns: bool = False,
+                         batch_rows: int = 65536) -> Dict[str, Any]:
+        """Parse CSV with the C csv module and aggregate each column per batch.
+        
+        Quoted fields (including embedded commas and newlines) are handled by
+        csv.reader. Columns whose non-empty values all parse as numbers also
+        get count/min/max/mean.
+        """
+        if isinstance(csv_source, str):
+            csv_source = io.StringIO(csv_source)
+        reader = csv.reader(csv_source)
+        headers = next(reader, None)
+        if headers is None:
+            return {'headers': [], 'columns': {}, 'row_count': 0,
+                    'column_stats': {}, 'summary': ''}
+        
+        width = len(headers)
+        non_empty = [0] * width
+        numeric = [True] * width
+        sums = [0.0] * width
+        counts = [0] * width
+        minimums = [float('inf')] * width
+        maximums = [float('-inf')] * width
+        kept = [[] for _ in range(width)] if keep_columns else None
+        row_count = 0
+        
+        while True:
+            batch = list(islice(reader, batch_rows))
+            if not batch:
+                break
+            row_count += len(batch)
+            # Transpose the batch in C, one itemgetter pass per column;
+            # ragged batches fall back to zip_longest, padding with ''
+            if min(map(len, batch)) >= width:
+                columns = [list(map(itemgetter(i), batch)) for i in range(width)]
+            else:
+                columns = list(zip_longest(*batch, fillvalue=''))[:width]
+                columns += [('',) * len(batch)] * (width - len(columns))
+            
+            for i, column in enumerate(columns):
+                values = [v for v in map(str.strip, column) if v]
+                non_empty[i] += len(values)
+                if kept is not None:
+                    kept[i].extend(column)
+                if not numeric[i] or not values:
+                    continue
+                try:
+                    numbers = array('d', map(float, values))
+                except ValueError:
+                    numeric[i] = False
+                    continue
+                if HAS_NUMPY:
+                    vector = np.frombuffer(numbers, dtype=np.float64)
+                    sums[i] += float(vector.sum())
+                    minimums[i] = min(minimums[i], float(vector.min()))
+                    maximums[i] = max(maximums[i], float(vector.max()))
+                else:
+                    sums[i] += sum(numbers)
+                    minimums[i] = min(minimums[i], min(numbers))
+                    maximums[i] = max(maximums[i], max(numbers))
+                counts[i] += len(numbers)
+        
+        column_stats = {}
+        for i, header in enumerate(headers):
+            stats = {'non_empty': non_empty[i]}
+            if numeric[i] and counts[i]:
+                stats.update(count=counts[i], min=minimums[i], max=maximums[i],
+                             mean=sums[i] / counts[i])
+            column_stats[header] = stats
+        
+        self.builder.clear()
+        self.builder.append_line("CSV DATA SUMMARY")
+        self.builder.append_line("-" * 30)
+        self.builder.append_line(f"Headers: {', '.join(headers)}")
+        self.builder.append_line(f"Total rows: {row_count}")
+        for header, stats in column_stats.items():
+            line = f"{header}: {stats['non_empty']} non-empty values"
+            if 'mean' in stats:
+                line += f" (min {stats['min']:g}, max {stats['max']:g}, mean {stats['mean']:.2f})"
+            self.builder.append_line(line)
+        
+        return {
+            'headers': headers,
+            'columns': dict(zip(headers, kept)) if kept is not None else None,
+            'row_count': row_count,
+            'column_stats': column_stats,
+            'summary': self.builder.build()
+        }
+
+def benchmark_columnar_processing(n_lines: int = 1_000_000):
+    """Compare the row-oriented and columnar log/CSV paths."""
+    import random
+    import tempfile
+    
+    levels = ["INFO", "DEBUG", "WARNING", "ERROR"]
+    rng = random.Random(0)
+    original = StringOptimizationSuite()
+    columnar = ColumnarStringOptimizationSuite()
+    
+    log_lines = [f"2025-01-01T00:00:{i % 60:02d} {rng.choice(levels)} request {i} served"
+                 for i in range(n_lines)]
+    
+    start_time = time.time()
+    row_result = original.optimize_log_processing(log_lines)
+    row_time = time.time() - start_time
+    
+    with tempfile.TemporaryFile('w+') as f:
+        f.write("\n".join(log_lines))
+        f.write("\n")
+        del log_lines
+        f.seek(0)
+        start_time = time.time()
+        column_result = columnar.optimize_log_processing(f, keep_columns=False)
+        column_time = time.time() - start_time
+    
+    assert row_result['level_counts'] == column_result['level_counts']
+    print(f"Log lines: {n_lines:,}")
+    print(f"  Row dicts + second pass:      {row_time:.3f}s")
+    print(f"  Columnar, streamed from file: {column_time:.3f}s ({row_time / column_time:.1f}x)")
+    
+    csv_rows = n_lines // 4
+    csv_text = "id,name,score,department\n" + "".join(
+        f'{i},"Smith, {i}",{rng.random() * 100:.2f},{rng.choice(levels)}\n'
+        for i in range(csv_rows))
+    
+    start_time = time.time()
+    original.process_csv_data(csv_text.splitlines())
+    naive_time = time.time() - start_time
+    
+    start_time = time.time()
+    result = columnar.process_csv_data(io.StringIO(csv_text))
+    csv_time = time.time() - start_time
+    
+    print(f"CSV rows: {csv_rows:,} (quoted names contain commas)")
+    print(f"  split(',') + per-column rescans: {naive_time:.3f}s (misparses quoted fields)")
+    print(f"  csv.reader + columnar batches:   {csv_time:.3f}s")
+    print(f"  score mean: {result['column_stats']['score']['mean']:.2f}")
+
+def demonstrate_columnar_processing():
+    """Demonstrate streaming, columnar log and CSV processing."""
+    suite = ColumnarStringOptimizationSuite()
+    
+    print("=== COLUMNAR STRING PROCESSING ===\n")
+    
+    log_file = io.StringIO(
+        "2025-01-01 INFO Application started\n"
+        "2025-01-01 DEBUG Loading configuration\n"
+        "2025-01-01 ERROR Database connection failed\n"
+        "2025-01-01 INFO Retrying connection\n"
+        "2025-01-01 INFO Connection successful\n"
+    )
+    log_result = suite.optimize_log_processing(log_file)
+    print(log_result['report'])
+    print(f"Row view of entry 2: {log_result['columns'][2]}")
+    
+    csv_file = io.StringIO(
+        'name,age,score,department\n'
+        'Alice,30,95,Engineering\n'
+        '"Bob, Jr.",25,87,"Sales, EMEA"\n'
+        'Charlie,35,,Engineering\n'
+    )
+    csv_result = suite.process_csv_data(csv_file, keep_columns=True)
+    print(csv_result['summary'])
+    print(f"Quoted names parsed intact: {csv_result['columns']['name']}")
+    
+    print("\nBenchmark:")
+    benchmark_columnar_processing(200_000)
+    
+    return log_result, csv_result
+
+
+# Step 7: Build upon Steps 1-6 - Streaming HTML report writer
+# ===============================================================================
+
+# Explanation:
+# generate_html_report() builds the whole document in one StringIO and returns
+# it as a single string, so a 1M-row report needs the full text (plus the copy
+# made by getvalue()) in memory at once. It also interpolates values without
+# escaping, so a name like "<script>" ends up as live markup.
+# A streaming writer fixes both:
+# - precompile the row template once per column set ("<tr><td>{}</td>...")
+#   and repeat it batch_rows times, so a whole batch is one str.format() call
+# - escape every cell with html.escape(); ints and floats skip escaping
+# - write each rendered batch straight to a text file, binary file or socket
+#   and drop it, so memory depends on batch_rows, not on the row count
+# - optionally frame each write as an HTTP/1.1 chunk (Transfer-Encoding:
+#   chunked) so the report can be served before its length is known
+
+# All code from Steps 1-6 (see above), plus:
+import html
+import threading
+import tracemalloc
+from itertools import chain
+from typing import Iterable, Optional
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# New code for Step 7:
+class HTMLRowTemplate:
+    """A row template compiled once for a fixed list of columns."""
+    
+    UNESCAPED_TYPES = (int, float)
+    
+    def __init__(self, columns: List[str], batch_rows: int = 1000):
+        self.columns = list(columns)
+        self.batch_rows = batch_rows
+        
+        self.header = "<tr>" + "".join(
+            f"<th>{html.escape(str(column))}</th>" for column in self.columns
+        ) + "</tr>\n"
+        self.row = "<tr>" + "<td>{}</td>" * len(self.columns) + "</tr>\n"
+        self.batch = self.row * batch_rows
+        
+        getter = itemgetter(*self.columns) if self.columns else (lambda record: ())
+        self._getter = (lambda record: (getter(record),)) if len(self.columns) == 1 else getter
+    
+    def _cells(self, records: List[Any]) -> List[Any]:
+        """Escaped cell values of a batch, flattened row by row."""
+        width = len(self.columns)
+        if records and isinstance(records[0], dict):
+            try:
+                values = list(chain.from_iterable(map(self._getter, records)))
+            except KeyError:
+                # Ragged dicts: missing keys render as empty cells
+                values = [record.get(column, '') for record in records for column in self.columns]
+        else:
+            values = list(chain.from_iterable(
+                list(record[:width]) + [''] * (width - len(record)) for record in records))
+        
+        # Inlined escaping; numbers cannot contain markup, so they skip it
+        escape, unescaped = html.escape, self.UNESCAPED_TYPES
+        return [value if type(value) in unescaped else escape(str(value)) for value in values]
+    
+    def render(self, records: List[Any]) -> str:
+        """Render up to batch_rows records with a single format() call."""
+        cells = self._cells(records)
+        template = self.batch if len(records) == self.batch_rows else self.row * len(records)
+        return template.format(*cells)
+
+class StreamingHTMLReportWriter:
+    """Write an HTML table report incrementally to a file or socket.
+    
+    `sink` may be a text file (str writes), a binary file (bytes writes) or a
+    socket (sendall). With chunked=True every write is framed as an HTTP/1.1
+    chunk and close() sends the terminating zero-length chunk.
+    
+    Leaving the `with` block because of an exception calls abort() instead
+    of close(): no footer and no final chunk are written, so a truncated
+    report cannot be mistaken for a complete one.
+    """
+    
+    def __init__(self, sink, title: str = "Performance Report",
+                 batch_rows: int = 1000, chunked: bool = False, encoding: str = 'utf-8'):
+        self.sink = sink
+        self.title = title
+        self.batch_rows = batch_rows
+        self.chunked = chunked
+        self.encoding = encoding
+        self.template: Optional[HTMLRowTemplate] = None
+        self.rows_written = 0
+        self.bytes_written = 0
+        self._started = False
+        self._closed = False
+        
+        if hasattr(sink, 'sendall'):
+            self._write_bytes = sink.sendall
+            self._text = False
+        else:
+            self._write_bytes = sink.write
+            self._text = isinstance(sink, io.TextIOBase) and not chunked
+    
+    def _emit(self, text: str):
+        if self._text:
+            self.sink.write(text)
+            self.bytes_written += len(text)
+            return
+        payload = text.encode(self.encoding)
+        if not payload:
+            return
+        if self.chunked:
+            payload = b"%X\r\n%b\r\n" % (len(payload), payload)
+        self._write_bytes(payload)
+        self.bytes_written += len(payload)
+    
+    def begin(self, columns: List[str]):
+        """Write the document head and table header for `columns`."""
+        if self._started:
+            raise RuntimeError("report already started")
+        self._started = True
+        self.template = HTMLRowTemplate(columns, self.batch_rows)
+        self._emit(self._head() + self.template.header)
+    
+    def _head(self) -> str:
+        title = html.escape(self.title)
+        return ("<!DOCTYPE html>\n"
+                f"<html><head><meta charset='{self.encoding}'><title>{title}</title></head><body>\n"
+                f"<h1>{title}</h1>\n"
+                "<table border='1'>\n")
+    
+    def write_rows(self, rows: Iterable[Any]) -> int:
+        """Render and write rows in batches; returns how many were written.
+        
+        If the report has not been started, the keys of the first dict row
+        become the columns.
+        """
+        iterator = iter(rows)
+        written = 0
+        while True:
+            batch = list(islice(iterator, self.batch_rows))
+            if not batch:
+                break
+            if not self._started:
+                if not isinstance(batch[0], dict):
+                    raise ValueError("columns are required for non-dict rows")
+                self.begin(list(batch[0].keys()))
+            self._emit(self.template.render(batch))
+            written += len(batch)
+        self.rows_written += written
+        return written
+    
+    def close(self):
+        """Write the table/document footer (and the final chunk when chunked)."""
+        if self._closed:
+            return
+        if not self._started:
+            self._started = True
+            self._emit(self._head())
+        self._emit("</table>\n</body></html>\n")
+        if self.chunked:
+            self._write_bytes(b"0\r\n\r\n")
+            self.bytes_written += 5
+        self._closed = True
+    
+    def abort(self):
+        """Stop without the footer or terminating chunk (the output stays incomplete)."""
+        self._closed = True
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+class StreamingStringOptimizationSuite(ColumnarStringOptimizationSuite):
+    """Suite whose HTML reports are escaped and can be streamed."""
+    
+    def generate_html_report(self, data: Iterable[Dict[str, Any]], out=None,
+                             columns: Optional[List[str]] = None,
+                             batch_rows: int = 1000, chunked: bool = False):
+        """Render an HTML report of `data`.
+        
+        With out=None the report is returned as a string (for small reports,
+        like the Step 5 version). Otherwise it is streamed to `out` and the
+        number of rows written is returned.
+        """
+        if out is None:
+            buffer = StringIO()
+            self.stream_html_report(data, buffer, columns, batch_rows)
+            return buffer.getvalue()
+        return self.stream_html_report(data, out, columns, batch_rows, chunked)
+    
+    def stream_html_report(self, rows: Iterable[Any], sink, columns: Optional[List[str]] = None,
+                           batch_rows: int = 1000, chunked: bool = False) -> int:
+        with StreamingHTMLReportWriter(sink, batch_rows=batch_rows, chunked=chunked) as writer:
+            if columns is not None:
+                writer.begin(columns)
+            return writer.write_rows(rows)
+
+class ReportRequestHandler(BaseHTTPRequestHandler):
+    """Serve a generated report with Transfer-Encoding: chunked."""
+    
+    protocol_version = "HTTP/1.1"
+    rows_factory = None         # set on a subclass: () -> iterable of rows
+    columns: Optional[List[str]] = None
+    
+    def do_GET(self):
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        # wfile is unbuffered, so each batch goes out as soon as it is rendered
+        try:
+            StreamingStringOptimizationSuite().stream_html_report(
+                type(self).rows_factory(), self.wfile, self.columns, chunked=True)
+        except Exception:
+            # The status line is already sent; dropping the connection without
+            # the terminating chunk is the only way to signal the failure
+            self.close_connection = True
+            raise
+    
+    def log_message(self, format, *args):
+        pass
+
+def report_rows(n_rows: int) -> Iterator[Dict[str, Any]]:
+    """Generate report rows lazily (some values need escaping)."""
+    departments = ["Engineering", "Sales & Marketing", "R<D>"]
+    for i in range(n_rows):
+        yield {"id": i, "name": f"user{i}", "score": i % 100 + 0.5,
+               "department": departments[i % 3]}
+
+def benchmark_html_report(n_rows: int = 1_000_000):
+    """Compare time and peak memory of the StringIO and streaming reports."""
+    import tempfile
+    
+    original = StringOptimizationSuite()
+    streaming = StreamingStringOptimizationSuite()
+    
+    def build_in_memory():
+        return len(original.generate_html_report(list(report_rows(n_rows))))
+    
+    def stream_to_file():
+        with tempfile.TemporaryFile('w+', encoding='utf-8') as out:
+            streaming.generate_html_report(report_rows(n_rows), out)
+            return out.tell()
+    
+    results = {}
+    for label, run in (("StringIO, unescaped:", build_in_memory),
+                       ("Streamed to file:   ", stream_to_file)):
+        start_time = time.time()
+        size = run()
+        elapsed = time.time() - start_time
+        # Separate pass for memory: tracemalloc slows allocation-heavy code a lot
+        tracemalloc.start()
+        run()
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        results[label] = peak
+        print(f"  {label} {elapsed:.3f}s, peak {peak / 1024 / 1024:6.1f} MB"
+              f" ({size / 1024 / 1024:.1f} MB report)")
+    
+    return results
+
+def demonstrate_streaming_html_report():
+    """Demonstrate escaped, batched, streamed and chunked HTML reports."""
+    import urllib.request
+    
+    suite = StreamingStringOptimizationSuite()
+    
+    print("=== STREAMING HTML REPORTS ===\n")
+    
+    data = [
+        {"name": "Alice", "score": 95, "department": "Engineering"},
+        {"name": "<script>alert('x')</script>", "score": 87, "department": "R&D"}
+    ]
+    html_report = suite.generate_html_report(data)
+    print("Escaped report rows:")
+    for line in html_report.splitlines():
+        if line.startswith("<tr><td>"):
+            print(f"  {line}")
+    
+    # Chunked transfer over a real socket
+    handler = type("DemoReportHandler", (ReportRequestHandler,),
+                   {"rows_factory": staticmethod(lambda: report_rows(5000))})
+    server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        url = f"http://127.0.0.1:{server.server_address[1]}/"
+        with urllib.request.urlopen(url, timeout=10) as response:
+            encoding = response.headers.get("Transfer-Encoding")
+            body = response.read().decode('utf-8')
+        print(f"\nServed over HTTP with Transfer-Encoding: {encoding}")
+        print(f"  {body.count('<tr><td>'):,} rows, {len(body):,} characters received")
+    finally:
+        server.shutdown()
+        server.server_close()
+    
+    print("\nBenchmark (200,000 rows):")
+    benchmark_html_report(200_000)
+    
+    return html_report
+
+
 # ===============================================================================
 #                              MAIN DEMONSTRATION
 # ===============================================================================
@@ -1399,6 +2166,12 @@ if __name__ == "__main__":
     print("\n--- Step 5: Complete Optimization Suite ---")
     demonstrate_complete_optimization()
     
+    print("\n--- Step 6: Columnar Log and CSV Processing ---")
+    demonstrate_columnar_processing()
+    
+    print("\n--- Step 7: Streaming HTML Reports ---")
+    demonstrate_streaming_html_report()
+    
     print("\n" + "=" * 60)
     print("STRING OPTIMIZATION COMPLETE!")
     print("Key takeaways:")
@@ -1407,5 +2180,7 @@ if __name__ == "__main__":
     print("- Use StringIO for incremental building")
     print("- Apply generators for memory efficiency")
     print("- Combine techniques for maximum performance")
+    print("- Parse in bulk into columns and stream from files")
+    print("- Stream escaped output in batches instead of building one string")
     print("=" * 60)
 
@@ -1405,6 +1405,444 @@ if __name__ == "__main__":
 # - Added proper error handling and cleanup
 
 
+# Step 7: Add a zero-copy line index for huge files
+# ===============================================================================
+
+# Explanation:
+# MemoryMappedOperations.read_file_mmap() and analyze_file_mmap() call
+# mm.read().decode(), which copies the whole file into a Python string and
+# throws away the benefit of mmap. For multi-GB log files we want to:
+# - Build a compact index of line start offsets once (an array of uint64)
+#   and save it next to the file, so reopening the file costs nothing
+# - Return lines and slices as memoryview objects that point straight into
+#   the mapping (no copy until the caller decodes them)
+# - Count lines, words and bytes with chunked scans, using NumPy when it is
+#   installed and falling back to plain bytes methods otherwise
+
+import os
+import time
+import mmap
+import codecs
+import struct
+import tempfile
+from array import array
+from typing import Dict, Any, Iterator, Optional
+
+try:
+    import numpy as np
+    HAS_NUMPY = True
+except ImportError:
+    HAS_NUMPY = False
+
+SCAN_CHUNK_SIZE = 16 * 1024 * 1024  # 16MB chunks keep scans cache-friendly and memory-bounded
+
+class LineIndexedFile:
+    """Random access to the lines of a huge file through mmap and a persisted offset index."""
+    
+    INDEX_SUFFIX = ".lineidx"
+    # magic, version, source size, source mtime (ns), number of offsets
+    _HEADER = struct.Struct("<4sIQQQ")
+    _MAGIC = b"LIDX"
+    _VERSION = 1
+    
+    def __init__(self, filename: str, index_path: Optional[str] = None, persist_index: bool = True):
+        self.filename = filename
+        self.index_path = index_path or filename + self.INDEX_SUFFIX
+        self._file = open(filename, 'rb')
+        self.size = os.fstat(self._file.fileno()).st_size
+        
+        # mmap cannot map an empty file, so keep an empty buffer instead
+        if self.size:
+            self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+            if hasattr(self._mm, 'madvise') and hasattr(mmap, 'MADV_RANDOM'):
+                self._mm.madvise(mmap.MADV_RANDOM)  # Line lookups jump around the file
+            self._view = memoryview(self._mm)
+        else:
+            self._mm = None
+            self._view = memoryview(b"")
+        
+        self.index_loaded_from_disk = False
+        self.offsets = self._load_index()
+        if self.offsets is None:
+            self.offsets = self._build_index()
+            if persist_index:
+                self._save_index()
+        else:
+            self.index_loaded_from_disk = True
+    
+    def _source_signature(self) -> tuple:
+        """Size and modification time used to detect a stale index."""
+        st = os.fstat(self._file.fileno())
+        return st.st_size, st.st_mtime_ns
+    
+    def _load_index(self) -> Optional[array]:
+        """Load the offset index from disk if it matches the current file."""
+        if not os.path.exists(self.index_path):
+            return None
+        
+        with open(self.index_path, 'rb') as f:
+            header = f.read(self._HEADER.size)
+            if len(header) != self._HEADER.size:
+                return None
+            magic, version, size, mtime_ns, count = self._HEADER.unpack(header)
+            if (magic != self._MAGIC or version != self._VERSION
+                    or (size, mtime_ns) != self._source_signature()):
+                return None
+            
+            offsets = array('Q')
+            try:
+                offsets.fromfile(f, count)
+            except EOFError:
+                return None
+        return offsets
+    
+    def _save_index(self) -> None:
+        """Write the offset index next to the file (atomically)."""
+        size, mtime_ns = self._source_signature()
+        tmp_path = self.index_path + ".tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(self._HEADER.pack(self._MAGIC, self._VERSION, size, mtime_ns, len(self.offsets)))
+            self.offsets.tofile(f)
+        os.replace(tmp_path, self.index_path)
+    
+    def _build_index(self) -> array:
+        """Scan the file once and record where every line starts."""
+        offsets = array('Q', [0])
+        if not self.size:
+            return offsets
+        
+        if HAS_NUMPY:
+            for start in range(0, self.size, SCAN_CHUNK_SIZE):
+                length = min(SCAN_CHUNK_SIZE, self.size - start)
+                chunk = np.frombuffer(self._mm, dtype=np.uint8, count=length, offset=start)
+                newlines = np.flatnonzero(chunk == 10).astype(np.uint64)
+                newlines += start + 1
+                offsets.frombytes(newlines.tobytes())
+                del chunk  # Release the buffer export on the mapping
+        else:
+            find = self._mm.find
+            append = offsets.append
+            pos = find(b"\n")
+            while pos != -1:
+                append(pos + 1)
+                pos = find(b"\n", pos + 1)
+        
+        # Sentinel: the end of the last line when the file lacks a trailing newline
+        if offsets[-1] != self.size:
+            offsets.append(self.size)
+        return offsets
+    
+    def __len__(self) -> int:
+        """Number of lines, in O(1)."""
+        return len(self.offsets) - 1
+    
+    def line(self, number: int, keep_newline: bool = False) -> memoryview:
+        """Return line `number` (0-based) as a zero-copy memoryview, in O(1)."""
+        if number < 0:
+            number += len(self)
+        if not 0 <= number < len(self):
+            raise IndexError(f"line {number} out of range")
+        
+        start = self.offsets[number]
+        end = self.offsets[number + 1]
+        if not keep_newline and end > start and self._view[end - 1] == 10:
+            end -= 1
+        return self._view[start:end]
+    
+    __getitem__ = line
+    
+    def lines(self, start: int = 0, stop: Optional[int] = None) -> Iterator[memoryview]:
+        """Yield a range of lines as memoryviews."""
+        stop = len(self) if stop is None else min(stop, len(self))
+        for number in range(start, stop):
+            yield self.line(number)
+    
+    def slice(self, start: int, length: int) -> memoryview:
+        """Return an arbitrary byte range as a zero-copy memoryview."""
+        return self._view[start:start + length]
+    
+    def count_stats(self, chunk_size: int = SCAN_CHUNK_SIZE) -> Dict[str, int]:
+        """Count lines, words, bytes and characters without decoding the whole file."""
+        stats = {'size': self.size, 'lines': 0, 'words': 0, 'chars': 0}
+        decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
+        previous_ended_in_word = False
+        
+        if HAS_NUMPY and self.size:
+            # 1 for ASCII whitespace bytes (the same set bytes.split() uses)
+            is_space = np.zeros(256, dtype=bool)
+            is_space[list(b" \t\n\r\x0b\x0c")] = True
+        
+        for start in range(0, self.size, chunk_size):
+            length = min(chunk_size, self.size - start)
+            if HAS_NUMPY:
+                chunk = np.frombuffer(self._mm, dtype=np.uint8, count=length, offset=start)
+                stats['lines'] += int(np.count_nonzero(chunk == 10))
+                # UTF-8 characters are all bytes except continuation bytes 10xxxxxx
+                stats['chars'] += length - int(np.count_nonzero((chunk & 0xC0) == 0x80))
+                
+                space = is_space[chunk]
+                word_start = ~space
+                word_start[1:] &= space[:-1]
+                if previous_ended_in_word:
+                    word_start[0] = False
+                stats['words'] += int(np.count_nonzero(word_start))
+                previous_ended_in_word = not space[-1]
+                del chunk, space, word_start
+            else:
+                chunk = self._mm[start:start + length]  # Bounded copy of one chunk
+                stats['lines'] += chunk.count(b"\n")
+                stats['chars'] += len(decoder.decode(chunk))
+                
+                words = len(chunk.split())
+                # A word split across the chunk boundary was counted twice
+                if previous_ended_in_word and not chunk[:1].isspace():
+                    words -= 1
+                stats['words'] += words
+                previous_ended_in_word = not chunk[-1:].isspace()
+        
+        if not HAS_NUMPY:
+            stats['chars'] += len(decoder.decode(b"", final=True))
+        return stats
+    
+    def close(self) -> None:
+        """Release the mapping (any memoryviews handed out must be released first)."""
+        self._view.release()
+        if self._mm is not None:
+            self._mm.close()
+        self._file.close()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+class ZeroCopyMemoryMappedOperations(MemoryMappedOperations):
+    """MemoryMappedOperations without whole-file copies for analysis and slicing."""
+    
+    def read_file_slice_mmap(self, filename: str, start: int, length: int) -> str:
+        """Decode only the requested slice of the file."""
+        with LineIndexedFile(filename, persist_index=False) as indexed:
+            view = indexed.slice(start, length)
+            try:
+                return bytes(view).decode('utf-8')
+            finally:
+                view.release()
+    
+    def analyze_file_mmap(self, filename: str) -> Dict[str, Any]:
+        """Analyze file content with chunked scans instead of mm.read().decode()."""
+        with LineIndexedFile(filename, persist_index=False) as indexed:
+            return indexed.count_stats()
+
+def demonstrate_line_index(num_lines: int = 500_000) -> None:
+    """Compare the zero-copy line index with decoding the whole file."""
+    print("=== Demonstrating Zero-Copy Line Index ===\n")
+    print(f"NumPy acceleration: {'enabled' if HAS_NUMPY else 'not installed (pure Python scan)'}")
+    
+    temp_dir = tempfile.mkdtemp()
+    log_file = os.path.join(temp_dir, "app.log")
+    with open(log_file, 'w', buffering=1024 * 1024) as f:
+        for i in range(num_lines):
+            f.write(f"2025-01-01 12:00:{i % 60:02d} INFO request {i} served in {i % 97} ms\n")
+    
+    # Both helpers create their own temp directory; cleanup() removes it
+    mmap_ops = MemoryMappedOperations()
+    zero_copy_ops = ZeroCopyMemoryMappedOperations()
+    try:
+        start_time = time.time()
+        old_stats = mmap_ops.analyze_file_mmap(log_file)
+        old_time = time.time() - start_time
+        
+        start_time = time.time()
+        new_stats = zero_copy_ops.analyze_file_mmap(log_file)
+        new_time = time.time() - start_time
+        
+        print(f"analyze_file_mmap (full decode): {old_time:.4f} seconds")
+        print(f"Chunked zero-copy analysis:      {new_time:.4f} seconds")
+        print(f"Same result: {old_stats == new_stats} -> {new_stats}")
+        
+        # First open builds and persists the index; the second just loads it
+        start_time = time.time()
+        with LineIndexedFile(log_file) as indexed:
+            build_time = time.time() - start_time
+        start_time = time.time()
+        with LineIndexedFile(log_file) as indexed:
+            load_time = time.time() - start_time
+            print(f"\nIndex build: {build_time:.4f}s, reload from disk: {load_time:.4f}s "
+                  f"(loaded: {indexed.index_loaded_from_disk})")
+            print(f"Index size: {os.path.getsize(indexed.index_path):,} bytes "
+                  f"for {len(indexed):,} lines")
+            
+            # Random access by line number
+            line_numbers = [(i * 7919) % num_lines for i in range(10_000)]
+            start_time = time.time()
+            for n in line_numbers:
+                view = indexed[n]
+                view.release()
+            indexed_time = time.time() - start_time
+            
+            print(f"10,000 random line lookups: {indexed_time:.4f}s")
+            print(f"Line 123,456: {bytes(indexed[123_456]).decode()}")
+        
+        # Without an index every lookup has to read up to the requested line
+        start_time = time.time()
+        with open(log_file, 'rb') as f:
+            for n in line_numbers[:20]:
+                f.seek(0)
+                for _ in range(n + 1):
+                    f.readline()
+        scan_time = (time.time() - start_time) / 20 * len(line_numbers)
+        print(f"Same lookups by scanning from the start (estimated): {scan_time:.2f}s")
+        print()
+    finally:
+        import shutil
+        mmap_ops.cleanup()
+        zero_copy_ops.cleanup()
+        shutil.rmtree(temp_dir)
+
+if __name__ == "__main__":
+    demonstrate_line_index()
+
+# What we accomplished in this step:
+# - Built a persisted uint64 line offset index for O(1) access by line number
+# - Returned lines and slices as memoryviews into the mapping (zero-copy)
+# - Replaced whole-file decoding with chunked (optionally NumPy-vectorized) counting
+
+
+# Step 8: Add parallel chunked scanning across processes
+# ===============================================================================
+
+# Explanation:
+# search_in_file_mmap() walks the whole file with repeated mm.find() calls on a
+# single core. For very large files we can split the work:
+# - Cut the file into chunks aligned to mmap.ALLOCATIONGRANULARITY (mmap
+#   offsets must be multiples of it)
+# - Let each worker process map only its own region, extended by
+#   len(pattern) - 1 bytes so matches that straddle a boundary are not lost
+# - Have every worker report only matches that *start* inside its chunk, so the
+#   overlap never produces duplicates
+# - Concatenate the per-chunk results in chunk order, which gives exactly the
+#   same sorted list of offsets as the serial version
+
+import os
+import time
+import mmap
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Optional, Tuple
+
+def _scan_region(task: Tuple[str, int, int, bytes]) -> List[int]:
+    """Worker: find every occurrence of pattern that starts in [start, end)."""
+    filename, start, end, pattern = task
+    
+    with open(filename, 'rb') as f:
+        file_size = os.fstat(f.fileno()).st_size
+        map_end = min(end + len(pattern) - 1, file_size)
+        with mmap.mmap(f.fileno(), map_end - start, access=mmap.ACCESS_READ, offset=start) as mm:
+            positions = []
+            limit = end - start  # Matches must start before this to belong to us
+            pos = mm.find(pattern)
+            while pos != -1 and pos < limit:
+                positions.append(start + pos)
+                pos = mm.find(pattern, pos + 1)
+    return positions
+
+class ParallelFileScanner:
+    """Search huge files for a byte pattern using a pool of worker processes."""
+    
+    def __init__(self, workers: Optional[int] = None, chunk_size: int = 64 * 1024 * 1024):
+        self.workers = workers or os.cpu_count() or 1
+        # Round the chunk size up to the mmap allocation granularity
+        granularity = mmap.ALLOCATIONGRANULARITY
+        self.chunk_size = max(granularity, (chunk_size + granularity - 1) // granularity * granularity)
+    
+    def _make_tasks(self, filename: str, pattern: bytes) -> List[Tuple[str, int, int, bytes]]:
+        """Split the file into page-aligned chunks."""
+        file_size = os.path.getsize(filename)
+        return [
+            (filename, start, min(start + self.chunk_size, file_size), pattern)
+            for start in range(0, file_size, self.chunk_size)
+        ]
+    
+    def search(self, filename: str, pattern: bytes) -> List[int]:
+        """Return the offsets of all (possibly overlapping) occurrences of pattern."""
+        if not pattern:
+            raise ValueError("pattern must not be empty")
+        
+        tasks = self._make_tasks(filename, pattern)
+        if not tasks:
+            return []
+        if self.workers == 1 or len(tasks) == 1:
+            # Not worth starting processes
+            return [pos for task in tasks for pos in _scan_region(task)]
+        
+        positions = []
+        with ProcessPoolExecutor(max_workers=min(self.workers, len(tasks))) as pool:
+            # map() yields results in task order, so the merged list stays sorted
+            for chunk_positions in pool.map(_scan_region, tasks):
+                positions.extend(chunk_positions)
+        return positions
+
+class ParallelMemoryMappedOperations(ZeroCopyMemoryMappedOperations):
+    """Memory-mapped operations whose search runs across several processes."""
+    
+    def __init__(self, workers: Optional[int] = None, chunk_size: int = 64 * 1024 * 1024):
+        super().__init__()
+        self.scanner = ParallelFileScanner(workers, chunk_size)
+    
+    def search_in_file_mmap(self, filename: str, pattern: bytes) -> List[int]:
+        """Search for pattern in file using a parallel chunked scan."""
+        return self.scanner.search(filename, pattern)
+
+def benchmark_parallel_scan(file_size_mb: int = 256, max_workers: int = 16) -> None:
+    """Measure how the parallel scan scales with the number of worker processes."""
+    print("=== Benchmarking Parallel Chunked Scanning ===\n")
+    
+    temp_dir = tempfile.mkdtemp()
+    big_file = os.path.join(temp_dir, "audit.log")
+    line = b"2025-01-01 user=alice action=login status=ok token=abc123\n"
+    needle_line = b"2025-01-01 user=mallory action=export status=denied token=SECRET42\n"
+    block = line * 999 + needle_line
+    with open(big_file, 'wb') as f:
+        for _ in range(file_size_mb * 1024 * 1024 // len(block)):
+            f.write(block)
+    
+    mmap_ops = MemoryMappedOperations()
+    try:
+        pattern = b"SECRET42"
+        start_time = time.time()
+        serial = mmap_ops.search_in_file_mmap(big_file, pattern)
+        serial_time = time.time() - start_time
+        print(f"File size: {os.path.getsize(big_file) / 1024 / 1024:.0f}MB, "
+              f"matches: {len(serial):,}, CPUs available: {os.cpu_count()}")
+        print(f"Serial search_in_file_mmap: {serial_time:.4f}s")
+        
+        workers = 1
+        while workers <= max_workers:
+            scanner = ParallelFileScanner(workers=workers, chunk_size=16 * 1024 * 1024)
+            start_time = time.time()
+            parallel = scanner.search(big_file, pattern)
+            elapsed = time.time() - start_time
+            print(f"{workers:2d} worker(s): {elapsed:.4f}s, speedup {serial_time / elapsed:5.2f}x, "
+                  f"identical: {parallel == serial}")
+            workers *= 2
+        print("Note: scaling flattens once the scan is limited by disk or memory bandwidth,")
+        print("      or when there are more workers than CPU cores.")
+        print()
+    finally:
+        import shutil
+        mmap_ops.cleanup()
+        shutil.rmtree(temp_dir)
+
+if __name__ == "__main__":
+    benchmark_parallel_scan()
+
+# What we accomplished in this step:
+# - Split large files into allocation-aligned chunks with pattern-length overlap
+# - Scanned chunks in a process pool, each worker mapping only its own region
+# - Merged offsets in order so results match the serial search exactly
+
+
 # ===============================================================================
 # CONGRATULATIONS!
 #
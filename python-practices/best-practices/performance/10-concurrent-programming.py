@@ -272,6 +272,176 @@ def run_cpu_tasks_with_pool(data_ranges: List[tuple], processes: int = None) ->
     return results
 
 
+# Sending large inputs through Pool.map pickles every chunk into a pipe and
+# unpickles it again in the worker, so for big arrays the copying costs more
+# than the computation. With multiprocessing.shared_memory the data is copied
+# once into a segment that every worker maps; tasks only carry a small
+# descriptor (segment name, item format, slice bounds).
+
+import array
+import operator
+from functools import reduce
+from multiprocessing import resource_tracker, shared_memory
+from typing import Tuple
+
+# Workers attach per chunk (a cheap shm_open + mmap) and detach before
+# returning, so no worker keeps an unlinked segment mapped after a job.
+
+def _shared_reduce_worker(task: tuple):
+    """Run func over one chunk of a shared input buffer."""
+    func, name, fmt, start, stop = task
+    segment = shared_memory.SharedMemory(name=name)
+    view = segment.buf.cast(fmt)
+    chunk = view[start:stop]
+    try:
+        return func(chunk)
+    finally:
+        chunk.release()
+        view.release()
+        segment.close()
+
+def _shared_map_worker(task: tuple) -> int:
+    """Run func(input_chunk, output_chunk) over one chunk of shared buffers."""
+    func, in_name, in_fmt, out_name, out_fmt, start, stop = task
+    in_segment = shared_memory.SharedMemory(name=in_name)
+    out_segment = shared_memory.SharedMemory(name=out_name)
+    in_view = in_segment.buf.cast(in_fmt)
+    out_view = out_segment.buf.cast(out_fmt)
+    src, dst = in_view[start:stop], out_view[start:stop]
+    try:
+        func(src, dst)
+        return stop - start
+    finally:
+        for view in (src, dst, in_view, out_view):
+            view.release()
+        in_segment.close()
+        out_segment.close()
+
+class SharedMemoryExecutor:
+    """Process pool that hands workers shared-memory descriptors instead of data.
+
+    Inputs are any buffer of fixed-size items (array.array, bytes,
+    memoryview, NumPy arrays). Segments are unlinked as soon as a job
+    finishes, and on shutdown() for anything left behind by an error.
+    """
+    
+    def __init__(self, processes: int = None):
+        self.processes = processes or multiprocessing.cpu_count()
+        # Start the resource tracker *before* the workers so they share it.
+        # Otherwise each worker starts its own tracker on first attach, and
+        # those trackers "clean up" (and warn about) segments we already unlinked.
+        resource_tracker.ensure_running()
+        self._pool = multiprocessing.Pool(processes=self.processes)
+        self._segments = {}
+    
+    def _share(self, data) -> Tuple[shared_memory.SharedMemory, str, int]:
+        """Copy a buffer into a new segment; returns (segment, format, length)."""
+        view = memoryview(data)
+        if view.ndim != 1:
+            view = view.cast('B').cast(view.format)
+        fmt, length = view.format, len(view)
+        segment = shared_memory.SharedMemory(create=True, size=max(1, view.nbytes))
+        self._segments[segment.name] = segment
+        segment.buf[:view.nbytes] = view.cast('B')
+        view.release()
+        return segment, fmt, length
+    
+    def _release(self, segment: shared_memory.SharedMemory):
+        self._segments.pop(segment.name, None)
+        segment.close()
+        try:
+            segment.unlink()
+        except FileNotFoundError:
+            pass
+    
+    def _chunks(self, length: int, chunk_items: int = None):
+        if chunk_items is None:
+            # A few chunks per worker balances load without many tiny tasks
+            chunk_items = max(1, -(-length // (self.processes * 4)))
+        return [(start, min(start + chunk_items, length))
+                for start in range(0, length, chunk_items)]
+    
+    def map_reduce(self, func, data, reduce_func=operator.add, initial=None,
+                   chunk_items: int = None):
+        """Apply func to every chunk (as a memoryview) and reduce the partial results.
+
+        func must be a module-level function so it can be sent to workers;
+        chunks may complete in any order, so reduce_func should be associative
+        and commutative.
+        """
+        segment, fmt, length = self._share(data)
+        try:
+            tasks = [(func, segment.name, fmt, start, stop)
+                     for start, stop in self._chunks(length, chunk_items)]
+            partials = self._pool.imap_unordered(_shared_reduce_worker, tasks)
+            if initial is None:
+                return reduce(reduce_func, partials)
+            return reduce(reduce_func, partials, initial)
+        finally:
+            self._release(segment)
+    
+    def map_array(self, func, data, out_typecode: str = None, chunk_items: int = None) -> array.array:
+        """Fill an output array of the same length with func(src_chunk, dst_chunk).
+
+        The output lives in shared memory too, so results are never pickled.
+        """
+        in_segment, in_fmt, length = self._share(data)
+        out_typecode = out_typecode or in_fmt
+        out = array.array(out_typecode)
+        out_segment = shared_memory.SharedMemory(create=True, size=max(1, length * out.itemsize))
+        self._segments[out_segment.name] = out_segment
+        try:
+            tasks = [(func, in_segment.name, in_fmt, out_segment.name, out_typecode, start, stop)
+                     for start, stop in self._chunks(length, chunk_items)]
+            for _ in self._pool.imap_unordered(_shared_map_worker, tasks):
+                pass
+            out.frombytes(out_segment.buf[:length * out.itemsize])
+            return out
+        finally:
+            self._release(in_segment)
+            self._release(out_segment)
+    
+    def shutdown(self):
+        """Stop the workers and unlink any segment still owned by the executor."""
+        self._pool.close()
+        self._pool.join()
+        for segment in list(self._segments.values()):
+            self._release(segment)
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        if exc_type is not None:
+            self._pool.terminate()
+        self.shutdown()
+        return False
+
+def sum_of_squares_chunk(values) -> float:
+    """Chunk function for map_reduce: sum of squares of a memoryview slice."""
+    total = 0
+    for v in values:
+        total += v * v
+    return total
+
+def square_chunk(src, dst):
+    """Chunk function for map_array: dst[i] = src[i] ** 2."""
+    for i, v in enumerate(src):
+        dst[i] = v * v
+
+def run_cpu_tasks_shared_memory(values, processes: int = None) -> float:
+    """Sum of squares over a large numeric buffer using shared memory."""
+    print("=== Running CPU tasks with shared memory ===")
+    start_time = time.time()
+    
+    with SharedMemoryExecutor(processes) as executor:
+        result = executor.map_reduce(sum_of_squares_chunk, values)
+    
+    end_time = time.time()
+    print(f"Shared-memory CPU tasks completed in {end_time - start_time:.2f} seconds")
+    return result
+
+
 # Step 5: Async/await for concurrent I/O operations
 # ===============================================================================
 
@@ -389,49 +559,176 @@ def demonstrate_thread_synchronization():
     
     return actual_value == expected_value
 
+import queue
+
+class QueueClosed(Exception):
+    """Raised when putting into a closed queue or getting from a drained one."""
+
+class RingBufferQueue:
+    """Bounded MPMC queue backed by a preallocated ring buffer.
+
+    list.pop(0) shifts every remaining element, so a list used as a FIFO
+    costs O(n) per get. A ring buffer keeps head/tail indices into a
+    fixed-size list, making put and get O(1) with no reallocation. The
+    put/get API mirrors queue.Queue (including queue.Full/queue.Empty),
+    and put_many/get_many move whole batches under one lock acquisition.
+    """
+    
+    def __init__(self, capacity: int):
+        if capacity < 1:
+            raise ValueError("capacity must be at least 1")
+        self._items = [None] * capacity
+        self._capacity = capacity
+        self._head = 0   # index of the oldest item
+        self._count = 0
+        self._closed = False
+        self._lock = threading.Lock()
+        self._not_empty = threading.Condition(self._lock)
+        self._not_full = threading.Condition(self._lock)
+    
+    @property
+    def capacity(self) -> int:
+        return self._capacity
+    
+    def qsize(self) -> int:
+        return self._count
+    
+    def empty(self) -> bool:
+        return self._count == 0
+    
+    def full(self) -> bool:
+        return self._count == self._capacity
+    
+    def _wait(self, condition, ready, block: bool, timeout, exc):
+        """Wait on condition until ready() (lock held); raise exc on timeout."""
+        if ready():
+            return
+        if not block:
+            raise exc
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while not ready():
+            if deadline is None:
+                condition.wait()
+            else:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise exc
+                condition.wait(remaining)
+    
+    def put(self, item, block: bool = True, timeout: float = None):
+        """Add one item, waiting for space if the buffer is full."""
+        with self._not_full:
+            if self._count >= self._capacity:
+                self._wait(self._not_full, lambda: self._closed or self._count < self._capacity,
+                           block, timeout, queue.Full())
+            if self._closed:
+                raise QueueClosed("put() on a closed queue")
+            tail = self._head + self._count
+            if tail >= self._capacity:
+                tail -= self._capacity
+            self._items[tail] = item
+            self._count += 1
+            self._not_empty.notify()
+    
+    def get(self, block: bool = True, timeout: float = None):
+        """Remove and return the oldest item, waiting if the buffer is empty."""
+        with self._not_empty:
+            if not self._count:
+                self._wait(self._not_empty, lambda: self._count or self._closed,
+                           block, timeout, queue.Empty())
+                if not self._count:
+                    raise QueueClosed("queue is closed and drained")
+            head = self._head
+            item = self._items[head]
+            self._items[head] = None  # Drop the reference for the GC
+            head += 1
+            self._head = 0 if head == self._capacity else head
+            self._count -= 1
+            self._not_full.notify()
+            return item
+    
+    def put_many(self, items, block: bool = True, timeout: float = None) -> int:
+        """Add all items, copying as many as fit per lock acquisition.
+
+        Returns the number of items added; on timeout queue.Full is raised
+        after the items that fit have already been enqueued.
+        """
+        items = list(items)
+        deadline = None if timeout is None else time.monotonic() + timeout
+        added = 0
+        while added < len(items):
+            with self._not_full:
+                remaining = None if deadline is None else max(0.0, deadline - time.monotonic())
+                self._wait(self._not_full, lambda: self._closed or self._count < self._capacity,
+                           block, remaining, queue.Full())
+                if self._closed:
+                    raise QueueClosed("put_many() on a closed queue")
+                n = min(self._capacity - self._count, len(items) - added)
+                start = (self._head + self._count) % self._capacity
+                first = min(n, self._capacity - start)
+                # At most two slice assignments: up to the end, then wrap around
+                self._items[start:start + first] = items[added:added + first]
+                self._items[0:n - first] = items[added + first:added + n]
+                self._count += n
+                added += n
+                self._not_empty.notify(n)
+        return added
+    
+    def get_many(self, max_items: int, block: bool = True, timeout: float = None) -> List[Any]:
+        """Remove up to max_items, waiting only until at least one is available."""
+        with self._not_empty:
+            self._wait(self._not_empty, lambda: self._count or self._closed,
+                       block, timeout, queue.Empty())
+            if not self._count:
+                raise QueueClosed("queue is closed and drained")
+            n = min(max_items, self._count)
+            first = min(n, self._capacity - self._head)
+            batch = self._items[self._head:self._head + first] + self._items[0:n - first]
+            self._items[self._head:self._head + first] = [None] * first
+            self._items[0:n - first] = [None] * (n - first)
+            self._head = (self._head + n) % self._capacity
+            self._count -= n
+            self._not_full.notify(n)
+            return batch
+    
+    def close(self):
+        """Reject new items and wake every waiter; remaining items can still be read."""
+        with self._lock:
+            self._closed = True
+            self._not_empty.notify_all()
+            self._not_full.notify_all()
+
 class ProducerConsumerExample:
     """Demonstrate producer-consumer pattern with threading."""
     
     def __init__(self, buffer_size: int = 5):
-        self.buffer = []
+        self.buffer = RingBufferQueue(buffer_size)
         self.buffer_size = buffer_size
-        self.lock = threading.Lock()
-        self.not_full = threading.Condition(self.lock)
-        self.not_empty = threading.Condition(self.lock)
         self.stop_event = threading.Event()
     
     def producer(self, producer_id: int):
         """Producer function that adds items to the buffer."""
         item_count = 0
         while not self.stop_event.is_set():
-            with self.not_full:
-                while len(self.buffer) >= self.buffer_size and not self.stop_event.is_set():
-                    self.not_full.wait()
-                
-                if self.stop_event.is_set():
-                    break
-                
-                item = f"item-{producer_id}-{item_count}"
-                self.buffer.append(item)
-                print(f"Producer {producer_id} produced {item}")
-                item_count += 1
-                self.not_empty.notify()
+            item = f"item-{producer_id}-{item_count}"
+            try:
+                # Time out periodically so the stop event is noticed
+                self.buffer.put(item, timeout=0.1)
+            except queue.Full:
+                continue
+            print(f"Producer {producer_id} produced {item}")
+            item_count += 1
             
             time.sleep(0.1)  # Simulate production time
     
     def consumer(self, consumer_id: int):
         """Consumer function that removes items from the buffer."""
         while not self.stop_event.is_set():
-            with self.not_empty:
-                while len(self.buffer) == 0 and not self.stop_event.is_set():
-                    self.not_empty.wait()
-                
-                if self.stop_event.is_set():
-                    break
-                
-                item = self.buffer.pop(0)
-                print(f"Consumer {consumer_id} consumed {item}")
-                self.not_full.notify()
+            try:
+                item = self.buffer.get(timeout=0.1)
+            except queue.Empty:
+                continue
+            print(f"Consumer {consumer_id} consumed {item}")
             
             time.sleep(0.15)  # Simulate consumption time
 
@@ -492,6 +789,12 @@ def compare_cpu_performance():
     # Pool example
     data_ranges = [(0, 100000), (100000, 200000), (200000, 300000), (300000, 400000)]
     pool_results = run_cpu_tasks_with_pool(data_ranges)
+    print()
+    
+    # Shared memory: one large buffer, workers only receive descriptors
+    values = array.array('d', range(1_000_000))
+    shared_result = run_cpu_tasks_shared_memory(values)
+    print(f"Sum of squares: {shared_result:,.0f}")
     
     print("\nSummary: For CPU-bound tasks, multiprocessing provides significant speedup!")
 
@@ -526,6 +829,114 @@ def demonstrate_producer_consumer():
     
     print("Producer-consumer demonstration completed!")
 
+def benchmark_mpmc_queues(total_items: int = 200_000, producers: int = 4,
+                          consumers: int = 4, capacity: int = 1024, batch_size: int = 64):
+    """Compare queue.Queue with RingBufferQueue (per item and batched)."""
+    print("\n" + "="*60)
+    print("MPMC QUEUE BENCHMARK")
+    print("="*60)
+    
+    per_producer = total_items // producers
+    total = per_producer * producers
+    
+    def run(name, make_queue, produce, consume, finish):
+        q = make_queue()
+        received = [0] * consumers
+        consumer_threads = [threading.Thread(target=consume, args=(q, received, i))
+                            for i in range(consumers)]
+        producer_threads = [threading.Thread(target=produce, args=(q, p * per_producer))
+                            for p in range(producers)]
+        start_time = time.perf_counter()
+        for t in consumer_threads + producer_threads:
+            t.start()
+        for t in producer_threads:
+            t.join()
+        finish(q)
+        for t in consumer_threads:
+            t.join()
+        elapsed = time.perf_counter() - start_time
+        assert sum(received) == total, f"{name}: lost items"
+        print(f"{name:<28} {elapsed:7.3f}s  {total / elapsed:>12,.0f} items/sec")
+        return elapsed
+    
+    # queue.Queue: one sentinel per consumer signals the end
+    def stdlib_produce(q, first):
+        for i in range(first, first + per_producer):
+            q.put(i)
+    
+    def stdlib_consume(q, received, idx):
+        while q.get() is not None:
+            received[idx] += 1
+    
+    def stdlib_finish(q):
+        for _ in range(consumers):
+            q.put(None)
+    
+    # RingBufferQueue: close() wakes consumers once the buffer drains
+    def ring_produce(q, first):
+        for i in range(first, first + per_producer):
+            q.put(i)
+    
+    def ring_consume(q, received, idx):
+        try:
+            while True:
+                q.get()
+                received[idx] += 1
+        except QueueClosed:
+            pass
+    
+    def ring_produce_batched(q, first):
+        for start in range(first, first + per_producer, batch_size):
+            q.put_many(range(start, min(start + batch_size, first + per_producer)))
+    
+    def ring_consume_batched(q, received, idx):
+        try:
+            while True:
+                received[idx] += len(q.get_many(batch_size))
+        except QueueClosed:
+            pass
+    
+    baseline = run("queue.Queue", lambda: queue.Queue(maxsize=capacity),
+                   stdlib_produce, stdlib_consume, stdlib_finish)
+    ring = run("RingBufferQueue", lambda: RingBufferQueue(capacity),
+               ring_produce, ring_consume, RingBufferQueue.close)
+    batched = run(f"RingBufferQueue batch={batch_size}", lambda: RingBufferQueue(capacity),
+                  ring_produce_batched, ring_consume_batched, RingBufferQueue.close)
+    
+    print(f"\nPer-item speedup vs queue.Queue: {baseline / ring:.2f}x")
+    print(f"Batched speedup vs queue.Queue: {baseline / batched:.2f}x")
+
+def benchmark_shared_memory_vs_pool(size_mb: int = 100, processes: int = None):
+    """Compare Pool.map (pickled chunks) with SharedMemoryExecutor on one buffer."""
+    print("\n" + "="*60)
+    print(f"SHARED MEMORY vs Pool.map ({size_mb} MB of float64)")
+    print("="*60)
+    
+    processes = processes or multiprocessing.cpu_count()
+    n = size_mb * 1024 * 1024 // 8
+    data = array.array('d', bytes(n * 8))
+    for i in range(0, n, 4096):
+        data[i] = float(i % 1000)
+    chunk_items = max(1, -(-n // (processes * 4)))
+    
+    # The work is a C-level sum, so the difference is almost all data transfer
+    with multiprocessing.Pool(processes=processes) as pool:
+        start_time = time.perf_counter()
+        chunks = [data[i:i + chunk_items] for i in range(0, n, chunk_items)]
+        pool_total = sum(pool.map(sum, chunks))
+        pool_time = time.perf_counter() - start_time
+    del chunks
+    
+    with SharedMemoryExecutor(processes) as executor:
+        start_time = time.perf_counter()
+        shm_total = executor.map_reduce(sum, data, chunk_items=chunk_items)
+        shm_time = time.perf_counter() - start_time
+    
+    assert pool_total == shm_total
+    print(f"Pool.map:             {pool_time:.3f}s")
+    print(f"SharedMemoryExecutor: {shm_time:.3f}s")
+    print(f"Speedup: {pool_time / shm_time:.2f}x (result {shm_total:,.0f})")
+
 def when_to_use_what():
     """Guidelines for choosing the right concurrency approach."""
     print("\n" + "="*60)
@@ -564,6 +975,348 @@ def when_to_use_what():
     print("  • Async is very efficient for I/O-bound tasks")
     print("  • Choose based on your specific use case!")
 
+
+# Instead of choosing by hand, an executor can measure. CPU time divided by
+# wall time tells us how a task spends its time: close to 1.0 means it keeps
+# the interpreter busy (the GIL serializes it across threads, so it belongs in
+# a process), close to 0.0 means it mostly waits (threads are cheaper).
+
+import json
+import pickle
+from collections import deque
+from concurrent.futures import Future
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional
+
+def _measured_call(fn, args, kwargs):
+    """Run fn and return (result, cpu_seconds, wall_seconds) for this thread."""
+    cpu_start = time.thread_time()
+    wall_start = time.perf_counter()
+    result = fn(*args, **kwargs)
+    return result, time.thread_time() - cpu_start, time.perf_counter() - wall_start
+
+class _Lane:
+    """One pool plus an adjustable concurrency limit and a latency estimate."""
+    
+    RESIZE_HISTORY = 50
+    
+    def __init__(self, name: str, executor, min_workers: int, max_workers: int):
+        self.name = name
+        self.executor = executor
+        self.min_workers = min_workers
+        self.max_workers = max_workers
+        self.limit = min_workers
+        self.in_flight = 0
+        self.pending = deque()
+        self.completed = 0
+        self.queue_latency = 0.0   # EWMA of submit -> dispatch delay, seconds
+        self.latency_checked = time.perf_counter()
+        self.resizes = deque(maxlen=self.RESIZE_HISTORY)
+    
+    def stats(self) -> dict:
+        return {
+            'limit': self.limit,
+            'max_workers': self.max_workers,
+            'in_flight': self.in_flight,
+            'pending': len(self.pending),
+            'completed': self.completed,
+            'queue_latency_ms': round(self.queue_latency * 1000, 3),
+            'recent_resizes': list(self.resizes)[-5:],
+        }
+
+class AdaptiveExecutor:
+    """Route each function to a thread or process pool based on measured CPU use.
+
+    The first `probe_calls` invocations of a function run in the thread pool
+    while CPU and wall time are measured. If CPU/wall reaches `cpu_threshold`
+    (and the function can be pickled and runs long enough to amortize the
+    IPC) later calls go to the process pool. Probes of one function run one
+    at a time and other calls to it wait until the route is decided:
+    concurrent probes share the GIL, so each would see only a fraction of
+    its real CPU use and a CPU-bound function would look like it waits.
+    Each pool's concurrency limit grows while tasks wait longer than
+    `target_latency` in the queue and shrinks again when the lane sits idle.
+    While nothing is queued the latency estimate halves every
+    `latency_half_life` seconds, so a past spike does not pin the limit high.
+    """
+    
+    def __init__(self, max_threads: int = 32, max_processes: int = None,
+                 probe_calls: int = 3, cpu_threshold: float = 0.6,
+                 min_process_task: float = 0.001, target_latency: float = 0.02,
+                 latency_smoothing: float = 0.2, latency_half_life: float = 0.5):
+        max_processes = max_processes or multiprocessing.cpu_count()
+        self.min_process_task = min_process_task
+        self.probe_calls = probe_calls
+        self.cpu_threshold = cpu_threshold
+        self.target_latency = target_latency
+        self.latency_smoothing = latency_smoothing
+        self.latency_half_life = latency_half_life
+        self._lock = threading.Lock()
+        self._idle = threading.Condition(self._lock)
+        self._outstanding = 0
+        self._profiles = {}
+        self._lanes = {
+            'thread': _Lane('thread', ThreadPoolExecutor(max_threads, thread_name_prefix="adaptive"),
+                            min(4, max_threads), max_threads),
+            'process': _Lane('process', ProcessPoolExecutor(max_processes),
+                             1, max_processes),
+        }
+        self._stats_server = None
+    
+    # -- routing ------------------------------------------------------------
+    def _profile(self, fn) -> dict:
+        key = f"{getattr(fn, '__module__', '?')}.{getattr(fn, '__qualname__', repr(fn))}"
+        profile = self._profiles.get(key)
+        if profile is None:
+            profile = {'route': 'probing', 'reason': '', 'calls': 0,
+                       'probes': 0, 'cpu': 0.0, 'wall': 0.0, 'fn_ref': fn,
+                       'probe_running': False, 'held': deque()}
+            self._profiles[key] = profile
+        return profile
+    
+    def _decide(self, fn, profile: dict):
+        """Pick a route once enough probe measurements have arrived (lock held)."""
+        ratio = profile['cpu'] / profile['wall'] if profile['wall'] > 0 else 0.0
+        profile['cpu_ratio'] = round(ratio, 3)
+        if ratio < self.cpu_threshold:
+            profile['route'] = 'thread'
+            profile['reason'] = f"cpu/wall {ratio:.2f} < {self.cpu_threshold}: mostly waiting"
+            return
+        mean_wall = profile['wall'] / profile['probes']
+        if mean_wall < self.min_process_task:
+            profile['route'] = 'thread'
+            profile['reason'] = (f"cpu/wall {ratio:.2f} but {mean_wall * 1000:.2f} ms per call "
+                                 f"is too short to pay for process IPC")
+            return
+        try:
+            pickle.dumps(fn)
+        except Exception:
+            profile['route'] = 'thread'
+            profile['reason'] = f"cpu/wall {ratio:.2f} but function is not picklable"
+            return
+        profile['route'] = 'process'
+        profile['reason'] = f"cpu/wall {ratio:.2f} >= {self.cpu_threshold}: CPU-bound"
+    
+    def submit(self, fn, *args, **kwargs) -> Future:
+        """Schedule fn(*args, **kwargs) and return a Future for its result."""
+        future = Future()
+        with self._lock:
+            profile = self._profile(fn)
+            profile['calls'] += 1
+            self._outstanding += 1
+            if profile['route'] == 'probing' and profile['probe_running']:
+                profile['held'].append((future, fn, args, kwargs))
+                return future
+            lane = self._enqueue(future, fn, args, kwargs, profile)
+            dispatched = self._drain(lane)
+        self._watch(dispatched)
+        return future
+    
+    def _enqueue(self, future: Future, fn, args, kwargs, profile: dict) -> _Lane:
+        """Queue one call on the lane its function is routed to (lock held)."""
+        if profile['route'] == 'probing':
+            # Probes run in a thread so thread_time() can see their CPU use
+            profile['probe_running'] = True
+            task = (future, _measured_call, (fn, args, kwargs), profile)
+            lane = self._lanes['thread']
+        else:
+            task = (future, fn, (args, kwargs), None)
+            lane = self._lanes[profile['route']]
+        lane.pending.append((time.perf_counter(), task))
+        return lane
+    
+    def _probe_finished(self, profile: dict) -> set:
+        """Start the next probe, or release the held calls once routed (lock held).
+
+        Returns the lanes that received tasks.
+        """
+        profile['probe_running'] = False
+        lanes = set()
+        while profile['held'] and not profile['probe_running']:
+            future, fn, args, kwargs = profile['held'].popleft()
+            lanes.add(self._enqueue(future, fn, args, kwargs, profile))
+        return lanes
+    
+    def map(self, fn, *iterables) -> List[Any]:
+        """Submit fn for every set of arguments and return results in order."""
+        futures = [self.submit(fn, *args) for args in zip(*iterables)]
+        return [future.result() for future in futures]
+    
+    # -- dispatching --------------------------------------------------------
+    def _drain(self, lane: _Lane) -> list:
+        """Dispatch queued tasks while the lane is below its limit (lock held).
+
+        Returns the dispatched tasks; the caller attaches completion callbacks
+        after releasing the lock, since a task that already finished runs its
+        callback immediately.
+        """
+        dispatched = []
+        while lane.pending and lane.in_flight < lane.limit:
+            queued_at, (future, fn, call_args, profile) = lane.pending.popleft()
+            if not future.set_running_or_notify_cancel():
+                self._outstanding -= 1      # cancelled while queued
+                if not self._outstanding:
+                    self._idle.notify_all()
+                if profile is not None:
+                    # A cancelled probe never reports back; hand the probe on
+                    # (it can only go to this thread lane while still probing)
+                    self._probe_finished(profile)
+                continue
+            waited = time.perf_counter() - queued_at
+            lane.queue_latency += self.latency_smoothing * (waited - lane.queue_latency)
+            lane.in_flight += 1
+            if profile is not None:
+                inner = lane.executor.submit(fn, *call_args)
+            else:
+                args, kwargs = call_args
+                inner = lane.executor.submit(fn, *args, **kwargs)
+            dispatched.append((inner, future, lane, profile))
+        self._resize(lane)
+        return dispatched
+    
+    def _watch(self, dispatched: list):
+        for inner, future, lane, profile in dispatched:
+            inner.add_done_callback(
+                lambda done, f=future, l=lane, p=profile: self._on_done(done, f, l, p))
+    
+    def _resize(self, lane: _Lane):
+        """Grow when tasks queue longer than the target; shrink when idle (lock held)."""
+        now = time.perf_counter()
+        if not lane.pending:
+            # Dispatch samples only arrive while tasks queue; with an empty
+            # queue the true delay is zero, so decay the estimate toward it
+            lane.queue_latency *= 0.5 ** ((now - lane.latency_checked) / self.latency_half_life)
+        lane.latency_checked = now
+        if lane.pending and lane.queue_latency > self.target_latency and lane.limit < lane.max_workers:
+            lane.limit += 1
+            lane.resizes.append(f"+1 -> {lane.limit} (latency {lane.queue_latency * 1000:.1f} ms)")
+        elif (not lane.pending and lane.in_flight < lane.limit // 2
+              and lane.queue_latency < self.target_latency / 4 and lane.limit > lane.min_workers):
+            lane.limit -= 1
+            lane.resizes.append(f"-1 -> {lane.limit} (idle)")
+    
+    def _on_done(self, inner: Future, future: Future, lane: _Lane, profile: Optional[dict]):
+        exc = inner.exception()
+        with self._lock:
+            lane.in_flight -= 1
+            lane.completed += 1
+            lanes = {lane}
+            if profile is not None:
+                if exc is None:
+                    _, cpu, wall = inner.result()
+                    profile['probes'] += 1
+                    profile['cpu'] += cpu
+                    profile['wall'] += wall
+                    if profile['route'] == 'probing' and profile['probes'] >= self.probe_calls:
+                        self._decide(profile['fn_ref'], profile)
+                lanes |= self._probe_finished(profile)
+            dispatched = [task for target in lanes for task in self._drain(target)]
+        self._watch(dispatched)
+        if exc is not None:
+            future.set_exception(exc)
+        elif profile is not None:
+            future.set_result(inner.result()[0])
+        else:
+            future.set_result(inner.result())
+        with self._idle:
+            self._outstanding -= 1
+            if not self._outstanding:
+                self._idle.notify_all()
+    
+    # -- observability ------------------------------------------------------
+    def stats(self) -> dict:
+        """Routing decisions and per-pool sizing, suitable for a stats endpoint."""
+        with self._lock:
+            return {
+                'functions': {name: dict({k: v for k, v in profile.items()
+                                          if k not in ('fn_ref', 'held')},
+                                         held=len(profile['held']))
+                              for name, profile in self._profiles.items()},
+                'pools': {name: lane.stats() for name, lane in self._lanes.items()},
+            }
+    
+    def serve_stats(self, host: str = "127.0.0.1", port: int = 0) -> Tuple[str, int]:
+        """Expose stats() as JSON over HTTP in a background thread; returns the address."""
+        executor = self
+        
+        class StatsHandler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                body = json.dumps(executor.stats(), indent=2).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+            
+            def log_message(self, *args):
+                pass
+        
+        self._stats_server = ThreadingHTTPServer((host, port), StatsHandler)
+        threading.Thread(target=self._stats_server.serve_forever, daemon=True).start()
+        return self._stats_server.server_address
+    
+    def shutdown(self, wait: bool = True):
+        """Stop the pools; with wait=True, queued tasks finish first."""
+        if wait:
+            with self._idle:
+                while self._outstanding:
+                    self._idle.wait()
+        if self._stats_server is not None:
+            self._stats_server.shutdown()
+            self._stats_server.server_close()
+        for lane in self._lanes.values():
+            lane.executor.shutdown(wait=wait)
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.shutdown()
+        return False
+
+def cpu_bound_work(n: int) -> int:
+    """Pure computation: keeps the interpreter busy the whole time."""
+    return sum(i * i for i in range(n))
+
+def io_bound_work(duration: float) -> float:
+    """Mostly waiting, like a network call."""
+    time.sleep(duration)
+    return duration
+
+def demonstrate_adaptive_executor():
+    """Let the executor discover which tasks are CPU-bound and route them."""
+    print("\n" + "="*60)
+    print("ADAPTIVE EXECUTOR: MEASURE, THEN ROUTE")
+    print("="*60)
+    
+    import urllib.request
+    
+    with AdaptiveExecutor(max_threads=16, probe_calls=3) as executor:
+        host, port = executor.serve_stats()
+        # The first batch is profiled in threads; later batches use the decision
+        for batch in range(3):
+            start_time = time.time()
+            futures = []
+            for i in range(40):
+                futures.append(executor.submit(io_bound_work, 0.05))
+                if i % 4 == 0:
+                    futures.append(executor.submit(cpu_bound_work, 300_000))
+            results = [future.result() for future in futures]
+            print(f"Batch {batch + 1}: {len(results)} mixed tasks in {time.time() - start_time:.2f} seconds")
+        
+        with urllib.request.urlopen(f"http://{host}:{port}/stats") as response:
+            stats = json.loads(response.read())
+    
+    print("\nRouting decisions (from the stats endpoint):")
+    for name, profile in stats['functions'].items():
+        print(f"  {name.split('.')[-1]:<16} -> {profile['route']:<8} {profile['reason']}")
+    print("\nPools:")
+    for name, pool in stats['pools'].items():
+        print(f"  {name:<8} limit {pool['limit']}/{pool['max_workers']}, "
+              f"completed {pool['completed']}, queue latency {pool['queue_latency_ms']} ms")
+        for event in pool['recent_resizes']:
+            print(f"           resize {event}")
+
 def demonstrate_all_examples():
     """Run all demonstration examples."""
     print("CONCURRENT PROGRAMMING DEMONSTRATIONS")
@@ -585,8 +1338,17 @@ def demonstrate_all_examples():
     # Producer-consumer pattern
     demonstrate_producer_consumer()
     
+    # Ring buffer vs queue.Queue throughput
+    benchmark_mpmc_queues()
+    
+    # Shared memory vs pickling large inputs
+    benchmark_shared_memory_vs_pool()
+    
     # Guidelines
     when_to_use_what()
+    
+    # Let measurements choose instead
+    demonstrate_adaptive_executor()
 
 
 # Step 8: Main execution and testing
@@ -245,6 +245,35 @@ class InputValidator:
 # Explanation:
 # Now we'll create a secure database class that uses parameterized queries,
 # input validation, and proper error handling to prevent SQL injection.
+# For large imports, bulk_create_users() keeps the same validation and
+# hashing but hashes passwords in parallel worker processes and inserts each
+# batch with one executemany() transaction instead of one commit per user.
+
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import field
+from itertools import islice
+from typing import Iterable, Tuple
+
+PBKDF2_ITERATIONS = 100000
+
+def _hash_password_chunk(passwords: List[str]) -> List[Tuple[str, str]]:
+    """Hash a chunk of passwords with fresh salts (runs in a worker process)."""
+    results = []
+    for password in passwords:
+        salt = secrets.token_hex(32)
+        password_hash = hashlib.pbkdf2_hmac('sha256', password.encode(),
+                                            salt.encode(), PBKDF2_ITERATIONS)
+        results.append((password_hash.hex(), salt))
+    return results
+
+@dataclass
+class BulkImportResult:
+    """Outcome of bulk_create_users(): rows created and per-row failures."""
+    created: int = 0
+    failures: List[Tuple[int, str, str]] = field(default_factory=list)  # (row, username, reason)
+    elapsed: float = 0.0
 
 class SecureDatabase:
     """Secure database class with SQL injection prevention."""
@@ -275,18 +304,15 @@ class SecureDatabase:
         if salt is None:
             salt = secrets.token_hex(32)
         password_hash = hashlib.pbkdf2_hmac('sha256', password.encode(), 
-                                          salt.encode(), 100000)
+                                          salt.encode(), PBKDF2_ITERATIONS)
         return password_hash.hex(), salt
     
     def create_user(self, username: str, email: str, password: str) -> bool:
         """SECURE: Create user with input validation and parameterized queries."""
         # Input validation
-        if not self.validator.validate_username(username):
-            raise ValueError("Invalid username format")
-        if not self.validator.validate_email(email):
-            raise ValueError("Invalid email format")
-        if not self.validator.validate_password(password):
-            raise ValueError("Password does not meet security requirements")
+        error = self._validate_new_user(username, email, password)
+        if error is not None:
+            raise ValueError(error)
         
         cursor = self.connection.cursor()
         password_hash, salt = self._hash_password(password)
@@ -304,6 +330,142 @@ class SecureDatabase:
         except sqlite3.Error as e:
             raise RuntimeError(f"Database error: {e}")
     
+    def _validate_new_user(self, username: str, email: str, password: str) -> Optional[str]:
+        """Return why a new user is invalid, or None if valid.
+        
+        Shared by create_user() and bulk_create_users() so both apply the
+        same rules.
+        """
+        if not self.validator.validate_username(username):
+            return "Invalid username format"
+        if not self.validator.validate_email(email):
+            return "Invalid email format"
+        if not self.validator.validate_password(password):
+            return "Password does not meet security requirements"
+        return None
+    
+    def bulk_create_users(self, users: Iterable, batch_size: int = 1000,
+                          workers: Optional[int] = None) -> BulkImportResult:
+        """SECURE: Import many users with create_user() validation and hashing.
+        
+        `users` yields (username, email, password) tuples or dicts with those
+        keys and is consumed batch by batch, so it can be a generator over a
+        2M-row export. Each batch is validated, checked for duplicates,
+        hashed in parallel worker processes and inserted in one transaction.
+        Bad rows are reported in result.failures and do not stop the import.
+        """
+        start = time.perf_counter()
+        result = BulkImportResult()
+        workers = workers or os.cpu_count() or 1
+        executor = ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
+        iterator = iter(users)
+        row_index = 0
+        
+        try:
+            while True:
+                rows = list(islice(iterator, batch_size))
+                if not rows:
+                    break
+                
+                # Streaming validation; duplicates within the batch are failures too
+                batch, usernames, emails = [], set(), set()
+                for row in rows:
+                    index, row_index = row_index, row_index + 1
+                    username = None
+                    try:
+                        if isinstance(row, dict):
+                            username, email, password = row.get('username'), row.get('email'), row.get('password')
+                        else:
+                            username, email, password = row
+                        error = self._validate_new_user(username, email, password)
+                        if error is None and (username in usernames or email in emails):
+                            error = "Username or email already exists"
+                    except (TypeError, ValueError):
+                        # Short, long or non-sequence rows and non-string fields
+                        error = "Malformed row: expected (username, email, password)"
+                        if username is None and isinstance(row, (tuple, list)) and row:
+                            username = row[0]
+                    if error is not None:
+                        result.failures.append((index, username, error))
+                        continue
+                    usernames.add(username)
+                    emails.add(email)
+                    batch.append((index, username, email, password))
+                
+                batch = self._drop_existing_users(batch, result)
+                if not batch:
+                    continue
+                
+                # PBKDF2 dominates the cost, so it runs across processes
+                passwords = [password for _, _, _, password in batch]
+                if executor is not None:
+                    chunk = max(1, len(passwords) // (workers * 4))
+                    chunks = [passwords[i:i + chunk] for i in range(0, len(passwords), chunk)]
+                    hashed = [pair for part in executor.map(_hash_password_chunk, chunks)
+                              for pair in part]
+                else:
+                    hashed = _hash_password_chunk(passwords)
+                
+                records = [(username, email, password_hash, salt)
+                           for (_, username, email, _), (password_hash, salt) in zip(batch, hashed)]
+                self._insert_batch(batch, records, result)
+        finally:
+            if executor is not None:
+                executor.shutdown()
+        
+        result.elapsed = time.perf_counter() - start
+        return result
+    
+    def _drop_existing_users(self, batch: List[tuple], result: BulkImportResult) -> List[tuple]:
+        """Remove rows whose username or email is already in the database."""
+        if not batch:
+            return batch
+        existing_usernames, existing_emails = set(), set()
+        cursor = self.connection.cursor()
+        # Stay well under SQLite's bound-parameter limit
+        for i in range(0, len(batch), 400):
+            part = batch[i:i + 400]
+            marks = ",".join("?" * len(part))
+            cursor.execute(f"""
+                SELECT username, email FROM users
+                WHERE username IN ({marks}) OR email IN ({marks})
+            """, [row[1] for row in part] + [row[2] for row in part])
+            for username, email in cursor.fetchall():
+                existing_usernames.add(username)
+                existing_emails.add(email)
+        
+        kept = []
+        for row in batch:
+            if row[1] in existing_usernames or row[2] in existing_emails:
+                result.failures.append((row[0], row[1], "Username or email already exists"))
+            else:
+                kept.append(row)
+        return kept
+    
+    def _insert_batch(self, batch: List[tuple], records: List[tuple], result: BulkImportResult):
+        """Insert one batch in a single transaction, row by row only if it fails."""
+        insert_sql = """
+            INSERT INTO users (username, email, password_hash, salt)
+            VALUES (?, ?, ?, ?)
+        """
+        try:
+            with self.connection:
+                self.connection.executemany(insert_sql, records)
+            result.created += len(records)
+            return
+        except sqlite3.IntegrityError:
+            pass        # e.g. a concurrent writer added the same user meanwhile
+        
+        for (index, username, _, _), record in zip(batch, records):
+            try:
+                with self.connection:
+                    self.connection.execute(insert_sql, record)
+                result.created += 1
+            except sqlite3.IntegrityError:
+                result.failures.append((index, username, "Username or email already exists"))
+            except sqlite3.Error as e:
+                result.failures.append((index, username, f"Database error: {e}"))
+    
     def get_user_by_credentials(self, username: str, password: str) -> Optional[User]:
         """SECURE: Authenticate user with parameterized queries."""
         # Input validation
@@ -565,6 +727,47 @@ def demonstrate_secure_implementation():
     except Exception as e:
         print(f"Error: {e}")
 
+def demonstrate_bulk_import(n_users: int = 40):
+    """Compare create_user() in a loop with bulk_create_users()."""
+    import tempfile
+    
+    print("\n=== Bulk User Import ===")
+    workers = os.cpu_count() or 1
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        # One validated, hashed and committed row at a time
+        db = SecureDatabase(os.path.join(tmp, "loop.db"))
+        start = time.perf_counter()
+        for i in range(n_users):
+            db.create_user(f"loop_user{i}", f"loop{i}@example.com", "SecurePass123!")
+        loop_rate = n_users / (time.perf_counter() - start)
+        db.connection.close()
+        
+        # Generator input with a few bad rows mixed in
+        def legacy_export():
+            for i in range(n_users):
+                yield (f"bulk_user{i}", f"bulk{i}@example.com", "SecurePass123!")
+            yield ("bad user", "bad@example.com", "SecurePass123!")
+            yield {"username": "weak_user", "email": "weak@example.com", "password": "weak"}
+            yield ("bulk_user0", "again@example.com", "SecurePass123!")
+            yield ("truncated_user",)
+            yield None
+        
+        db = SecureDatabase(os.path.join(tmp, "bulk.db"))
+        result = db.bulk_create_users(legacy_export(), batch_size=500)
+        bulk_rate = result.created / result.elapsed
+        login = db.get_user_by_credentials("bulk_user7", "SecurePass123!")
+        db.connection.close()
+    
+    print(f"create_user loop:   {loop_rate:6.1f} users/s")
+    print(f"bulk_create_users:  {bulk_rate:6.1f} users/s with {workers} worker process(es) "
+          f"({bulk_rate / loop_rate:.1f}x; scales with cores)")
+    print(f"Created {result.created}, failed {len(result.failures)}:")
+    for index, username, reason in result.failures:
+        print(f"  row {index} ({username!r}): {reason}")
+    print(f"Imported user can log in: {login is not None}")
+    return result
+
 # Step 7: Best practices and additional security measures
 # ===============================================================================
 
@@ -632,79 +835,535 @@ class SecurityBestPractices:
 # A complete, production-ready example that includes proper error handling,
 # logging, and security measures.
 
+import atexit
 import logging
+import os
+import tempfile
+import threading
+import time
 from contextlib import contextmanager
+from datetime import datetime, timezone
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Each thread leases its own connection from a bounded pool instead of all
+# threads sharing one connection opened with check_same_thread=False.
+class PoolTimeout(TimeoutError):
+    """Raised when no connection becomes available within the acquire timeout."""
+
+class _PooledConnection:
+    """Bookkeeping for one pooled sqlite3 connection."""
+    
+    __slots__ = ('connection', 'created_at', 'last_used', 'uses', 'leased')
+    
+    def __init__(self, connection):
+        self.connection = connection
+        self.created_at = self.last_used = time.monotonic()
+        self.uses = 0
+        self.leased = False
+
+class ConnectionPool:
+    """Bounded pool of real sqlite3 connections.
+    
+    - get_connection() waits at most `timeout` seconds, then raises PoolTimeout
+    - connections idle longer than `ping_after` are checked with SELECT 1, and
+      connections older than `max_lifetime` are closed and replaced
+    - a thread gets back the connection it used last when that one is idle
+    - stats() reports wait times and time-weighted utilization
+    
+    ":memory:" is backed by a private temporary file in WAL mode, removed
+    when the pool closes. A shared-cache in-memory database would let every
+    connection see the same data, but it uses table-level locks: a
+    conflicting write fails at once with "database table is locked" and
+    ignores the busy timeout. On a WAL file, readers never block and a
+    writer waits up to `busy_timeout` seconds for the others.
+    """
+    
+    def __init__(self, database: str = ":memory:", max_connections: int = 5,
+                 timeout: float = 5.0, max_lifetime: float = 3600.0,
+                 ping_after: float = 30.0, busy_timeout: float = 5.0, on_connect=None,
+                 **connect_kwargs):
+        self._max_connections = max_connections
+        self._timeout = timeout
+        self._max_lifetime = max_lifetime
+        self._ping_after = ping_after
+        self._on_connect = on_connect
+        # sqlite3's `timeout` is the busy timeout: how long a statement waits
+        # for another connection's write lock before raising
+        self._connect_kwargs = dict(connect_kwargs, timeout=busy_timeout, check_same_thread=False)
+        self._tempdir = None
+        if database == ":memory:":
+            self._tempdir = tempfile.TemporaryDirectory(prefix="sqlite-pool-")
+            database = os.path.join(self._tempdir.name, "pool.db")
+            with sqlite3.connect(database) as setup:
+                setup.execute("PRAGMA journal_mode=WAL")    # persistent for the file
+            setup.close()
+        self._database = database
+        
+        self._idle: List[_PooledConnection] = []   # LIFO: most recently used last
+        self._records = {}                          # id(connection) -> _PooledConnection
+        self._in_use = 0
+        self._created_count = 0
+        self._closed = False
+        self._cond = threading.Condition(threading.Lock())
+        self._local = threading.local()
+        
+        # Metrics
+        self._started = time.monotonic()
+        self._last_change = self._started
+        self._busy_time = 0.0                       # integral of in_use over time
+        self._metrics = {'total_created': 0, 'acquired': 0, 'timeouts': 0, 'waits': 0, 'wait_time': 0.0,
+                         'max_wait': 0.0, 'affinity_hits': 0, 'recycled': 0,
+                         'failed_pings': 0, 'peak_in_use': 0}
+    
+    def _create_connection(self) -> _PooledConnection:
+        """Open a new sqlite3 connection and run the on_connect hook."""
+        connection = sqlite3.connect(self._database, **self._connect_kwargs)
+        try:
+            if self._on_connect is not None:
+                self._on_connect(connection)
+        except Exception:
+            connection.close()
+            raise
+        return _PooledConnection(connection)
+    
+    def _is_healthy(self, record: _PooledConnection, now: float) -> bool:
+        """Max-lifetime and liveness check, run without holding the pool lock."""
+        reason = None
+        if now - record.created_at > self._max_lifetime:
+            reason = 'recycled'
+        elif now - record.last_used > self._ping_after:
+            try:
+                record.connection.execute("SELECT 1").fetchone()
+            except sqlite3.Error:
+                reason = 'failed_pings'
+        if reason is None:
+            return True
+        with self._cond:
+            self._metrics[reason] += 1
+        return False
+    
+    def _account(self, delta: int):
+        """Update the in-use count and the utilization integral (lock held)."""
+        now = time.monotonic()
+        self._busy_time += self._in_use * (now - self._last_change)
+        self._last_change = now
+        self._in_use += delta
+        if self._in_use > self._metrics['peak_in_use']:
+            self._metrics['peak_in_use'] = self._in_use
+    
+    def _discard(self, record: _PooledConnection):
+        """Close a connection and free its slot."""
+        try:
+            record.connection.close()
+        except sqlite3.Error:
+            pass
+        with self._cond:
+            self._records.pop(id(record.connection), None)
+            self._created_count -= 1
+            self._cond.notify()
+            last = self._closed and self._created_count == 0
+        if last:
+            self._remove_tempdir()
+    
+    def _remove_tempdir(self):
+        """Delete the backing file of a ":memory:" pool once nothing uses it."""
+        if self._tempdir is not None:
+            self._tempdir.cleanup()
+    
+    def get_connection(self, timeout: Optional[float] = None) -> sqlite3.Connection:
+        """Get a database connection, waiting at most `timeout` seconds."""
+        timeout = self._timeout if timeout is None else timeout
+        start = time.monotonic()
+        deadline = start + timeout
+        waited = False
+        
+        while True:
+            record = None
+            create = False
+            with self._cond:
+                while True:
+                    if self._closed:
+                        raise RuntimeError("connection pool is closed")
+                    if self._idle:
+                        preferred = getattr(self._local, 'record', None)
+                        if preferred is not None and preferred in self._idle:
+                            self._idle.remove(preferred)
+                            record = preferred
+                            self._metrics['affinity_hits'] += 1
+                        else:
+                            record = self._idle.pop()
+                        record.leased = True
+                        break
+                    if self._created_count < self._max_connections:
+                        self._created_count += 1
+                        create = True
+                        break
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self._metrics['timeouts'] += 1
+                        raise PoolTimeout(
+                            f"no connection available after {timeout:.2f}s "
+                            f"({self._max_connections} in use)")
+                    waited = True
+                    self._cond.wait(remaining)
+                self._account(+1)
+            
+            now = time.monotonic()
+            if create:
+                try:
+                    record = self._create_connection()
+                except Exception:
+                    with self._cond:
+                        self._created_count -= 1
+                        self._account(-1)
+                        self._cond.notify()
+                    raise
+                with self._cond:
+                    record.leased = True
+                    self._records[id(record.connection)] = record
+                    self._metrics['total_created'] += 1
+            elif not self._is_healthy(record, now):
+                with self._cond:
+                    self._account(-1)
+                self._discard(record)
+                continue
+            break
+        
+        wait = time.monotonic() - start
+        with self._cond:
+            self._metrics['acquired'] += 1
+            self._metrics['wait_time'] += wait
+            self._metrics['max_wait'] = max(self._metrics['max_wait'], wait)
+            if waited:
+                self._metrics['waits'] += 1
+        record.uses += 1
+        self._local.record = record
+        return record.connection
+    
+    def release_connection(self, conn: sqlite3.Connection):
+        """Release a connection back to the pool.
+        
+        Raises ValueError for a connection this pool did not hand out or one
+        that was already released; accepting it twice would put the same
+        connection in the idle list twice and lease it to two callers.
+        """
+        with self._cond:
+            record = self._records.get(id(conn))
+            if record is None or record.connection is not conn:
+                raise ValueError("connection does not belong to this pool")
+            if not record.leased:
+                raise ValueError("connection was already released")
+            record.leased = False
+        
+        healthy = True
+        try:
+            if conn.in_transaction:
+                conn.rollback()         # never hand out a half-finished transaction
+        except sqlite3.Error:
+            healthy = False             # closed or broken: replace it
+        now = time.monotonic()
+        record.last_used = now
+        expired = now - record.created_at > self._max_lifetime
+        
+        with self._cond:
+            self._account(-1)
+            if expired:
+                self._metrics['recycled'] += 1
+                healthy = False
+            if healthy and not self._closed:
+                self._idle.append(record)
+                self._cond.notify()
+                return
+        self._discard(record)
+    
+    @contextmanager
+    def connection(self, timeout: Optional[float] = None):
+        """Lease a connection; commit on success, roll back on error."""
+        conn = self.get_connection(timeout)
+        try:
+            yield conn
+            if conn.in_transaction:
+                conn.commit()
+        except BaseException:
+            if conn.in_transaction:
+                conn.rollback()
+            raise
+        finally:
+            self.release_connection(conn)
+    
+    def close(self):
+        """Close idle connections now; busy ones are closed when released."""
+        with self._cond:
+            self._closed = True
+            idle, self._idle = self._idle, []
+            self._cond.notify_all()
+        for record in idle:
+            self._discard(record)
+        with self._cond:
+            last = self._created_count == 0
+        if last:
+            self._remove_tempdir()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+    
+    def stats(self) -> dict:
+        """Get pool statistics."""
+        with self._cond:
+            now = time.monotonic()
+            busy_time = self._busy_time + self._in_use * (now - self._last_change)
+            elapsed = max(now - self._started, 1e-9)
+            metrics = dict(self._metrics)
+            acquired = metrics['acquired']
+            return {
+                'open': self._created_count,
+                'available': len(self._idle),
+                'in_use': self._in_use,
+                'max_connections': self._max_connections,
+                'utilization': busy_time / (elapsed * self._max_connections),
+                'avg_wait_ms': metrics['wait_time'] / acquired * 1000 if acquired else 0.0,
+                'max_wait_ms': metrics['max_wait'] * 1000,
+                **{k: v for k, v in metrics.items() if k not in ('wait_time', 'max_wait')},
+            }
+
+class AuditLogWriter:
+    """Buffer audit events in memory and write them in batches.
+    
+    Committing one INSERT per event costs a synchronous disk flush per
+    failed login. Here events are queued and a background thread writes
+    them with executemany() in one transaction per batch, whenever
+    `batch_size` events are pending or `flush_interval` seconds have passed.
+    The database is switched to WAL mode, so these commits append to the
+    write-ahead log and do not block readers. close() (also run at
+    interpreter exit) writes whatever is still pending.
+    
+    An audit trail must not lose events, so nothing is dropped when the
+    database falls behind: unwritten batches go back on the pending list,
+    and once `max_pending` events are waiting, log() blocks until the
+    writer has caught up.
+    """
+    
+    INSERT_SQL = """
+        INSERT INTO audit_log (user_id, action, details, ip_address, timestamp)
+        VALUES (?, ?, ?, ?, ?)
+    """
+    
+    def __init__(self, pool: ConnectionPool, batch_size: int = 500,
+                 flush_interval: float = 0.05, max_pending: int = 50000):
+        self.pool = pool
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self.events_written = 0
+        self.batches_written = 0
+        self.events_failed = 0
+        self._pending: List[tuple] = []
+        self._in_flight = 0                     # taken by a writer, not yet stored or requeued
+        self._cond = threading.Condition()
+        self._write_lock = threading.Lock()     # keeps batches in order
+        self._closed = False
+        
+        with self.pool.connection() as connection:
+            self.journal_mode = connection.execute("PRAGMA journal_mode=WAL").fetchone()[0]
+        
+        self._thread = threading.Thread(target=self._run, name="audit-writer", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+    
+    def log(self, action: str, details: str, user_id: int = None, ip_address: str = None):
+        """Queue one event; the timestamp is taken now, not at write time."""
+        # Same format as CURRENT_TIMESTAMP (UTC, second resolution)
+        timestamp = datetime.now(timezone.utc).strftime('%Y-%m-%d %H:%M:%S')
+        with self._cond:
+            # Backpressure: the writer is falling behind, so wait for it
+            # instead of growing without bound or dropping events
+            while len(self._pending) + self._in_flight >= self.max_pending and not self._closed:
+                self._cond.notify_all()
+                self._cond.wait(self.flush_interval)
+            if self._closed:
+                raise RuntimeError("audit log writer is closed")
+            self._pending.append((user_id, action, details, ip_address, timestamp))
+            if len(self._pending) >= self.batch_size:
+                self._cond.notify_all()
+    
+    def _take(self) -> List[tuple]:
+        with self._cond:
+            events, self._pending = self._pending, []
+            self._in_flight += len(events)
+            return events
+    
+    def _requeue(self, events: List[tuple]):
+        """Put unwritten events back in front of newer ones, to be retried."""
+        with self._cond:
+            self._pending[:0] = events
+    
+    def _write(self, events: List[tuple]):
+        """Write one batch in a single transaction, isolating bad events on failure.
+        
+        If no connection frees up in time, the unwritten events go back on the
+        pending list and are retried with the next batch.
+        """
+        if not events:
+            return
+        with self._write_lock:
+            try:
+                with self.pool.connection() as connection:
+                    connection.executemany(self.INSERT_SQL, events)
+                self.events_written += len(events)
+                self.batches_written += 1
+                return
+            except PoolTimeout as e:
+                logger.warning(f"Audit batch of {len(events)} events postponed: {e}")
+                self._requeue(events)
+                return
+            except Exception as e:
+                logger.error(f"Audit batch of {len(events)} events failed ({e}); retrying one by one")
+            
+            for index, event in enumerate(events):
+                try:
+                    with self.pool.connection() as connection:
+                        connection.execute(self.INSERT_SQL, event)
+                    self.events_written += 1
+                except PoolTimeout as e:
+                    logger.warning(f"{len(events) - index} audit events postponed: {e}")
+                    self._requeue(events[index:])
+                    return
+                except Exception as e:
+                    self.events_failed += 1
+                    logger.error(f"Dropped audit event {event[1]}: {e}")
+    
+    def flush(self):
+        """Write all pending events now."""
+        events = self._take()
+        try:
+            self._write(events)
+        finally:
+            with self._cond:
+                self._in_flight -= len(events)
+                self._cond.notify_all()     # wake log() calls blocked on a full buffer
+    
+    def _run(self):
+        while True:
+            with self._cond:
+                if not self._closed and len(self._pending) < self.batch_size:
+                    self._cond.wait(self.flush_interval)
+                closed = self._closed
+            try:
+                self.flush()
+            except Exception as e:
+                # Keep the writer alive; _write() has already requeued or
+                # counted the events it could not store
+                logger.error(f"Audit writer error: {e}")
+            if closed:
+                return
+    
+    def close(self):
+        """Stop the writer thread and write the remaining events."""
+        with self._cond:
+            if self._closed:
+                return
+            self._closed = True
+            self._cond.notify_all()
+        self._thread.join()
+        self.flush()
+        atexit.unregister(self.close)
+        with self._cond:
+            lost, self._pending = self._pending, []
+        if lost:
+            self.events_failed += len(lost)
+            logger.error(f"Audit log closed with {len(lost)} events unwritten")
+    
+    def stats(self) -> Dict[str, Any]:
+        with self._cond:
+            pending = len(self._pending)
+        return {'journal_mode': self.journal_mode, 'pending': pending,
+                'events_written': self.events_written, 'batches_written': self.batches_written,
+                'events_failed': self.events_failed}
+
 class ProductionSecureDatabase:
     """Production-ready secure database class with comprehensive security measures."""
     
-    def __init__(self, db_path: str = ":memory:"):
-        self.connection = sqlite3.connect(db_path, check_same_thread=False)
-        self.connection.row_factory = sqlite3.Row
+    def __init__(self, db_path: str = ":memory:", pool_size: int = 5, acquire_timeout: float = 5.0,
+                 batched_audit: bool = True, audit_batch_size: int = 500,
+                 audit_flush_interval: float = 0.05):
+        self.pool = ConnectionPool(db_path, max_connections=pool_size, timeout=acquire_timeout,
+                                   on_connect=self._setup_security)
         self._create_tables()
         self.validator = InputValidator()
-        self._setup_security()
+        self.audit = None
+        if batched_audit:
+            self.audit = AuditLogWriter(self.pool, audit_batch_size, audit_flush_interval)
     
-    def _setup_security(self):
-        """Setup additional security measures."""
+    @staticmethod
+    def _setup_security(connection: sqlite3.Connection):
+        """Setup additional security measures on every new pooled connection."""
+        connection.row_factory = sqlite3.Row
         # Enable foreign key constraints
-        self.connection.execute("PRAGMA foreign_keys = ON")
+        connection.execute("PRAGMA foreign_keys = ON")
         # Set secure temp store
-        self.connection.execute("PRAGMA secure_delete = ON")
-        self.connection.commit()
+        connection.execute("PRAGMA secure_delete = ON")
+    
+    def close(self):
+        """Flush pending audit events and close all pooled connections."""
+        if self.audit is not None:
+            self.audit.close()
+        self.pool.close()
     
     def _create_tables(self):
         """Create user table with additional security fields."""
-        cursor = self.connection.cursor()
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS users (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                username TEXT UNIQUE NOT NULL,
-                email TEXT UNIQUE NOT NULL,
-                password_hash TEXT NOT NULL,
-                salt TEXT NOT NULL,
-                failed_login_attempts INTEGER DEFAULT 0,
-                account_locked_until TIMESTAMP NULL,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                last_login TIMESTAMP NULL
-            )
-        """)
-        
-        # Create audit log table
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS audit_log (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                user_id INTEGER,
-                action TEXT NOT NULL,
-                details TEXT,
-                ip_address TEXT,
-                timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                FOREIGN KEY (user_id) REFERENCES users (id)
-            )
-        """)
-        self.connection.commit()
+        with self._get_cursor() as cursor:
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS users (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    username TEXT UNIQUE NOT NULL,
+                    email TEXT UNIQUE NOT NULL,
+                    password_hash TEXT NOT NULL,
+                    salt TEXT NOT NULL,
+                    failed_login_attempts INTEGER DEFAULT 0,
+                    account_locked_until TIMESTAMP NULL,
+                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    last_login TIMESTAMP NULL
+                )
+            """)
+            
+            # Create audit log table
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS audit_log (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    user_id INTEGER,
+                    action TEXT NOT NULL,
+                    details TEXT,
+                    ip_address TEXT,
+                    timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    FOREIGN KEY (user_id) REFERENCES users (id)
+                )
+            """)
     
     @contextmanager
     def _get_cursor(self):
-        """Context manager for database operations."""
-        cursor = self.connection.cursor()
-        try:
-            yield cursor
-            self.connection.commit()
-        except Exception:
-            self.connection.rollback()
-            raise
-        finally:
-            cursor.close()
+        """Context manager for database operations on a pooled connection."""
+        # pool.connection() commits on success and rolls back on error
+        with self.pool.connection() as connection:
+            cursor = connection.cursor()
+            try:
+                yield cursor
+            finally:
+                cursor.close()
     
     def _log_security_event(self, action: str, details: str, user_id: int = None, ip_address: str = None):
         """Log security-related events."""
         logger.info(f"Security event: {action} - {details}")
         
+        if self.audit is not None:
+            self.audit.log(action, details, user_id, ip_address)
+            return
+        
         with self._get_cursor() as cursor:
             cursor.execute("""
                 INSERT INTO audit_log (user_id, action, details, ip_address)
@@ -753,6 +1412,302 @@ class ProductionSecureDatabase:
                                           salt.encode(), 100000)
         return password_hash.hex(), salt
 
+def demonstrate_pooled_database(threads: int = 5, users_per_thread: int = 4,
+                                writes_per_user: int = 50):
+    """Write from several threads, each on its own pooled connection.
+    
+    Uses the default configuration: an in-memory database with 5 pooled
+    connections and the background audit writer as one more writer.
+    """
+    from concurrent.futures import ThreadPoolExecutor
+    
+    print("\n=== Production Database with Connection Pool ===")
+    db = ProductionSecureDatabase()
+    try:
+        def worker(t: int) -> Tuple[int, int, List[str]]:
+            created, writes, errors = 0, 0, []
+            for i in range(users_per_thread):
+                username = f"pooled_user{t}_{i}"
+                try:
+                    created += db.create_user_secure(username, f"pooled{t}_{i}@example.com",
+                                                     "SecurePass123!", ip_address="10.0.0.1")
+                    # Failed logins: short write transactions racing the other threads
+                    for _ in range(writes_per_user):
+                        with db._get_cursor() as cursor:
+                            cursor.execute("""
+                                UPDATE users SET failed_login_attempts = failed_login_attempts + 1
+                                WHERE username = ?
+                            """, (username,))
+                        db._log_security_event("LOGIN_FAILED", f"Bad password for {username}",
+                                               ip_address="10.0.0.1")
+                        writes += 1
+                except Exception as e:
+                    errors.append(repr(e))
+            return created, writes, errors
+        
+        level = logger.level
+        logger.setLevel(logging.WARNING)    # one INFO line per event would drown the output
+        try:
+            with ThreadPoolExecutor(max_workers=threads) as executor:
+                results = list(executor.map(worker, range(threads)))
+        finally:
+            logger.setLevel(level)
+        created = sum(r[0] for r in results)
+        writes = sum(r[1] for r in results)
+        errors = [e for r in results for e in r[2]]
+        
+        db.audit.flush()
+        with db._get_cursor() as cursor:
+            cursor.execute("SELECT COUNT(*) FROM audit_log")
+            audited = cursor.fetchone()[0]
+            cursor.execute("SELECT SUM(failed_login_attempts) FROM users")
+            counted = cursor.fetchone()[0]
+        stats = db.pool.stats()
+        print(f"{threads} threads: created {created} users, {writes} failed-login writes "
+              f"(counter total {counted}), {audited} audit entries, errors: {len(errors)}")
+        for error in errors[:3]:
+            print(f"  {error}")
+        print(f"Pool: {stats['total_created']} connections, {stats['acquired']} leases, "
+              f"avg wait {stats['avg_wait_ms']:.2f} ms, timeouts {stats['timeouts']}")
+        
+        # Releasing a connection twice would lease it to two callers at once
+        connection = db.pool.get_connection()
+        db.pool.release_connection(connection)
+        try:
+            db.pool.release_connection(connection)
+            print("Double release accepted (bug)")
+        except ValueError as e:
+            print(f"Double release rejected: {e}")
+    finally:
+        db.close()
+
+def benchmark_audit_logging(n_events: int = 2000, threads: int = 4):
+    """Compare per-event commits with the batched WAL audit writer."""
+    import os
+    import tempfile
+    from concurrent.futures import ThreadPoolExecutor
+    
+    print(f"\n=== Audit Logging Benchmark ({n_events} events from {threads} threads) ===")
+    level = logger.level
+    logger.setLevel(logging.WARNING)    # keep per-event INFO lines out of the timing
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            results = {}
+            for label, batched in (("per-event commit", False), ("batched + WAL", True)):
+                db = ProductionSecureDatabase(os.path.join(tmp, f"audit_{batched}.db"),
+                                              pool_size=threads, batched_audit=batched)
+                
+                def failed_logins(worker: int):
+                    for i in range(n_events // threads):
+                        db._log_security_event("LOGIN_FAILED", f"Bad password for user{i}",
+                                               ip_address=f"203.0.113.{worker}")
+                
+                start = time.perf_counter()
+                with ThreadPoolExecutor(max_workers=threads) as executor:
+                    list(executor.map(failed_logins, range(threads)))
+                db.close()                      # includes the final flush
+                elapsed = time.perf_counter() - start
+                
+                check = sqlite3.connect(os.path.join(tmp, f"audit_{batched}.db"))
+                stored = check.execute("SELECT COUNT(*) FROM audit_log").fetchone()[0]
+                check.close()
+                results[label] = stored / elapsed
+                print(f"{label:17s}: {results[label]:9.0f} events/s ({stored} stored)")
+    finally:
+        logger.setLevel(level)
+    
+    speedup = results["batched + WAL"] / results["per-event commit"]
+    print(f"Speedup: {speedup:.1f}x")
+    return results
+
+# Step 9: Indexed user search
+# ===============================================================================
+
+# Explanation:
+# SecureDatabase.search_users() runs WHERE username LIKE '%term%'. A pattern
+# that starts with a wildcard cannot use any index, so every search scans the
+# whole users table. Two indexes cover the common cases:
+# - an FTS5 table with the trigram tokenizer, kept in sync with users by
+#   triggers. For terms of 3+ characters, LIKE '%term%' on that table is
+#   answered from the trigram index.
+# - a NOCASE index on username, so prefix searches ("autocomplete") become a
+#   range scan
+# Terms shorter than 3 characters, or SQLite builds without FTS5 trigram
+# support (older than 3.34), fall back to the table scan. Results are ordered
+# by id and can be paged with limit/after_id (keyset pagination), so a page
+# costs the same no matter how deep it is.
+
+class IndexedSecureDatabase(SecureDatabase):
+    """SecureDatabase with index-backed substring and prefix search."""
+    
+    MIN_TRIGRAM_LENGTH = 3
+    
+    SEARCH_INDEX_SQL = """
+        CREATE VIRTUAL TABLE users_search USING fts5(
+            username, content='users', content_rowid='id', tokenize='trigram'
+        );
+        CREATE TRIGGER users_search_insert AFTER INSERT ON users BEGIN
+            INSERT INTO users_search (rowid, username) VALUES (new.id, new.username);
+        END;
+        CREATE TRIGGER users_search_delete AFTER DELETE ON users BEGIN
+            INSERT INTO users_search (users_search, rowid, username)
+            VALUES ('delete', old.id, old.username);
+        END;
+        CREATE TRIGGER users_search_update AFTER UPDATE OF username ON users BEGIN
+            INSERT INTO users_search (users_search, rowid, username)
+            VALUES ('delete', old.id, old.username);
+            INSERT INTO users_search (rowid, username) VALUES (new.id, new.username);
+        END;
+        INSERT INTO users_search (users_search) VALUES ('rebuild');
+    """
+    
+    def _create_tables(self):
+        """Create the users table plus the prefix and trigram indexes."""
+        super()._create_tables()
+        cursor = self.connection.cursor()
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_users_username_nocase
+            ON users (username COLLATE NOCASE)
+        """)
+        exists = cursor.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'users_search'"
+        ).fetchone()
+        self.has_search_index = exists is not None
+        if not exists:
+            try:
+                # 'rebuild' indexes any users that already exist
+                cursor.executescript(self.SEARCH_INDEX_SQL)
+                self.has_search_index = True
+            except sqlite3.OperationalError:
+                # No FTS5 or no trigram tokenizer in this SQLite build
+                self.connection.rollback()
+        self.connection.commit()
+    
+    def search_users(self, search_term: str, limit: Optional[int] = None,
+                     after_id: int = 0, prefix: bool = False) -> List[User]:
+        """SECURE: Indexed search with the same sanitization as SecureDatabase.
+        
+        Matches are case-insensitive substrings (prefixes with prefix=True),
+        ordered by id. Pass the last id of one page as after_id to get the next.
+        """
+        sanitized_term = self.validator.sanitize_search_term(search_term)
+        if not sanitized_term:
+            return []
+        
+        # Sanitization removed % and _, so the term is matched literally
+        page = (after_id, -1 if limit is None else limit)
+        if prefix:
+            # Range on the NOCASE index; LIKE re-checks the exact semantics.
+            # "+id" stops the planner from walking the rowid instead.
+            low = sanitized_term.lower()
+            high = low[:-1] + chr(ord(low[-1]) + 1)
+            query = """
+                SELECT id, username, email, password_hash FROM users
+                WHERE username >= ? COLLATE NOCASE AND username < ? COLLATE NOCASE
+                  AND username LIKE ? AND +id > ?
+                ORDER BY id LIMIT ?
+            """
+            params = (low, high, f"{sanitized_term}%") + page
+        elif self.has_search_index and len(sanitized_term) >= self.MIN_TRIGRAM_LENGTH:
+            query = """
+                SELECT u.id, u.username, u.email, u.password_hash
+                FROM users_search s JOIN users u ON u.id = s.rowid
+                WHERE s.username LIKE ? AND s.rowid > ?
+                ORDER BY s.rowid LIMIT ?
+            """
+            params = (f"%{sanitized_term}%",) + page
+        else:
+            query = """
+                SELECT id, username, email, password_hash FROM users
+                WHERE username LIKE ? AND id > ?
+                ORDER BY id LIMIT ?
+            """
+            params = (f"%{sanitized_term}%",) + page
+        
+        cursor = self.connection.cursor()
+        try:
+            cursor.execute(query, params)
+            return [User(id=row['id'], username=row['username'],
+                         email=row['email'], password_hash=row['password_hash'])
+                    for row in cursor.fetchall()]
+        except sqlite3.Error as e:
+            raise RuntimeError(f"Database error: {e}")
+
+def _fill_users(db: SecureDatabase, count: int, batch: int = 50000):
+    """Insert synthetic users directly (skipping PBKDF2) for benchmarks."""
+    words = ["alpha", "bravo", "delta", "omega", "admin", "tester", "ops", "dev"]
+    for start in range(0, count, batch):
+        rows = ((f"{words[i % len(words)]}{i:08d}", f"user{i}@example.com", "0" * 64, "0" * 64)
+                for i in range(start, min(start + batch, count)))
+        db.connection.executemany(
+            "INSERT INTO users (username, email, password_hash, salt) VALUES (?, ?, ?, ?)", rows)
+        db.connection.commit()
+
+def benchmark_user_search(sizes=(10_000, 100_000, 1_000_000), repeats: int = 5):
+    """Compare LIKE '%term%' scans with the indexed search at several table sizes.
+    
+    Larger sizes (e.g. sizes=(10_000_000,)) work the same way; the index
+    build takes roughly a minute per few million rows.
+    
+    The index only pays off for selective terms. A term matching an eighth
+    of the table costs about the same either way, because building the
+    result rows dominates; page such searches with limit/after_id.
+    """
+    print("\n=== User Search Benchmark ===")
+    # Usernames look like "delta00001234": "4242" hits a few rows in ten
+    # thousand, "lta00" every delta user, "Delta000012" about a dozen
+    queries = [("selective", "4242", False), ("broad", "lta00", False),
+               ("prefix", "Delta000012", True), ("short", "ga", False)]
+    
+    def timed(func) -> tuple:
+        best, result = float('inf'), None
+        for _ in range(repeats):
+            start = time.perf_counter()
+            result = func()
+            best = min(best, time.perf_counter() - start)
+        return best, result
+    
+    for size in sizes:
+        db = IndexedSecureDatabase()
+        _fill_users(db, size)
+        print(f"{size:>10,} users:")
+        for label, term, prefix in queries:
+            scan_time, expected = timed(lambda: SecureDatabase.search_users(db, term))
+            if prefix:
+                expected = [u for u in expected if u.username.lower().startswith(term.lower())]
+            index_time, found = timed(lambda: db.search_users(term, prefix=prefix))
+            assert sorted(u.id for u in expected) == [u.id for u in found]
+            print(f"  {label:9s} {term!r:13s} LIKE scan {scan_time * 1000:8.2f} ms, "
+                  f"indexed {index_time * 1000:8.2f} ms ({scan_time / index_time:6.1f}x), "
+                  f"{len(found)} matches")
+        db.connection.close()
+
+def demonstrate_indexed_search():
+    """Show substring, prefix and paginated search on the indexed database."""
+    print("\n=== Indexed User Search ===")
+    db = IndexedSecureDatabase()
+    if not db.has_search_index:
+        print("FTS5 trigram tokenizer not available; substring search uses LIKE scans")
+    _fill_users(db, 1000)
+    db.create_user("Jane_Admin", "jane@example.com", "SecurePass123!")
+    
+    print(f"'ADMIN' matches: {len(db.search_users('ADMIN'))} users")
+    print(f"Prefix 'jane': {[u.username for u in db.search_users('jane', prefix=True)]}")
+    
+    pages, after_id = [], 0
+    while True:
+        page = db.search_users("admin", limit=50, after_id=after_id)
+        if not page:
+            break
+        pages.append(len(page))
+        after_id = page[-1].id
+    print(f"Paged through 'admin' in {len(pages)} pages of up to 50")
+    print(f"Malicious term still sanitized: "
+          f"{len(db.search_users(chr(39) + ' OR 1=1 --'))} results")
+    db.connection.close()
+    
+    benchmark_user_search(sizes=(10_000, 100_000))
+
 def main():
     """Main function to demonstrate all concepts."""
     print("SQL Injection Prevention Demonstration")
@@ -764,6 +1719,9 @@ def main():
     # Demonstrate secure implementation
     demonstrate_secure_implementation()
     
+    # Bulk import with parallel hashing
+    demonstrate_bulk_import()
+    
     # Show best practices
     print("\n=== Security Best Practices ===")
     practices = SecurityBestPractices()
@@ -776,6 +1734,13 @@ def main():
     for tip in practices.get_password_security_tips()[:5]:
         print(f"  {tip}")
     
+    # Production database with pooled connections
+    demonstrate_pooled_database()
+    benchmark_audit_logging()
+    
+    # Indexed search
+    demonstrate_indexed_search()
+    
     print("\n✅ Remember: Security is a continuous process, not a one-time implementation!")
 
 if __name__ == "__main__":